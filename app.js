@@ -4,6 +4,8 @@ const App = (function() {
   let previousDistribution = null;
   let lastEmotionsData = {};
   let accumEmotionsData = {};
+  let teamEvents = null;
+  let teamEventsName = null;
 
   /* ========================================================
      UTILITY FUNCTIONS
@@ -189,6 +191,32 @@ const App = (function() {
     clickedButton.classList.add("active");
   }
 
+  /* ========================================================
+     TEAM EVENTS FUNCTIONS
+  ======================================================== */
+
+  /**
+   * Subscribes to pushed team updates, replacing any previous subscription.
+   * Updates the stage UI while the team stage is displayed.
+   */
+  function subscribeToTeamEvents(teamName) {
+    if (teamEvents && teamEventsName === teamName) return;
+    if (teamEvents) teamEvents.close();
+
+    teamEventsName = teamName;
+    teamEvents = new EventSource(
+      `http://127.0.0.1:8000/teams/${encodeURIComponent(teamName)}/events`
+    );
+    teamEvents.addEventListener("team", (event) => {
+      const data = JSON.parse(event.data);
+      const teamStageBtn = document.getElementById("teamStageBtn");
+      const analysisVisible = !document.getElementById("analysisMode").classList.contains("hidden");
+      if (teamStageBtn.classList.contains("active") || analysisVisible) {
+        updateStageUI(data.distribution, data.final_stage, data.feedback);
+      }
+    });
+  }
+
   /* ========================================================
      STAGE DISTRIBUTION FUNCTIONS
   ======================================================== */
@@ -219,6 +247,7 @@ const App = (function() {
       const data = await resp.json();
 
       updateStageUI(data.distribution, data.final_stage, data.feedback);
+      subscribeToTeamEvents(teamName);
     } catch (err) {
       console.error("Error loading team stage distribution:", err);
       alert(err.message);
@@ -379,6 +408,7 @@ const App = (function() {
       if(!resp.ok) throw new Error("Could not load team info");
       const data = await resp.json();
       updateStageUI(data.distribution, data.final_stage, data.feedback);
+      subscribeToTeamEvents(teamName);
     } catch(err){
       console.error("Error loading team info", err);
       alert(err.message);
@@ -464,7 +494,9 @@ const App = (function() {
         showLastEmotions();
       }
 
-      await showTeamStageDistribution();
+      // Later changes by other members arrive through the team events stream
+      toggleButtonActiveState("stageToggle", document.getElementById("teamStageBtn"));
+      subscribeToTeamEvents(teamName);
     } catch (error) {
       console.error("Error sending message:", error);
       alert(error.message);
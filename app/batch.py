@@ -0,0 +1,310 @@
+# batch.py
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import mmap
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+# ========================================================
+# OFFLINE BULK ANALYSIS
+# ========================================================
+#
+# `python -m app.batch logs/` analyzes directories of chat-log files without
+# going through HTTP. Every file is one team, named after the file. Files
+# are sharded across a pool of worker processes; each worker loads the models
+# once and analyzes its files chunk by chunk, with the same steps as
+# analyze_conversation_db (/analyze-file): the chunk's messages are stored in
+# bulk, then every message runs through process_line in analysis mode.
+#
+# Lines are streamed from memory-mapped files, so archives larger than memory
+# work. After every chunk the byte offset reached is saved in a checkpoint
+# file per log; an interrupted run continues from there when started again,
+# and files that have grown since are analyzed from where the last run stopped.
+# Each chunk is written in one database transaction, committed just before
+# its checkpoint is saved: a chunk interrupted midway leaves no messages or
+# counters behind and is analyzed again in full. SQLite has a single writer,
+# which a chunk holds until it commits, so runs on SQLite use one worker.
+
+BATCH_CHUNK_LINES = int(os.environ.get("BATCH_CHUNK_LINES", 1000))
+BATCH_STATE_DIR = os.environ.get("BATCH_STATE_DIR", "./batch_state")
+# Each live worker holds its own copy of the models (about 1.6 GB for
+# bart-large-mnli) unless they are exported with app/model_cache.py, whose
+# memory-mapped weights all workers share.
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", 1))
+
+
+def find_log_files(paths: list, pattern: str = "*.txt") -> list:
+    """
+    Returns the log files in `paths` (files or directories, searched recursively),
+    largest first so the pool's workers finish at about the same time.
+    """
+    found = set()
+    for path in paths:
+        if os.path.isfile(path):
+            found.add(os.path.abspath(path))
+            continue
+        for root, _, names in os.walk(path):
+            found.update(os.path.abspath(os.path.join(root, name)) for name in fnmatch.filter(names, pattern))
+    return sorted(found, key=lambda p: (-os.path.getsize(p), p))
+
+
+def team_name_for(path: str) -> str:
+    """Names the team after the file, e.g. logs/TeamA.txt -> TeamA."""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def read_chunks(path: str, offset: int = 0, chunk_lines: int = BATCH_CHUNK_LINES):
+    """
+    Streams the lines of a file from a memory map.
+
+    Args:
+        path (str): The log file.
+        offset (int): Byte offset to start at.
+        chunk_lines (int): Lines per chunk.
+
+    Yields:
+        tuple: (lines without line breaks, byte offset after the chunk).
+    """
+    if os.path.getsize(path) <= offset:
+        return
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if hasattr(mm, "madvise"):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        mm.seek(offset)
+        lines = []
+        while True:
+            at_start = mm.tell() == 0
+            raw = mm.readline()
+            if not raw:
+                break
+            line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+            if at_start and line.startswith("\ufeff"):
+                # Only the byte order mark at the very start of the file is dropped
+                line = line[1:]
+            lines.append(line)
+            if len(lines) >= chunk_lines:
+                yield lines, mm.tell()
+                lines = []
+        if lines:
+            yield lines, mm.tell()
+
+
+class Checkpoint:
+    def __init__(self, state_dir: str, path: str):
+        """
+        Progress of one log file, stored as JSON in `state_dir`.
+
+        Args:
+            state_dir (str): Directory of the checkpoint files.
+            path (str): The log file.
+        """
+        digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+        self.file = os.path.join(state_dir, f"{team_name_for(path)}-{digest}.json")
+        self.state = {"path": os.path.abspath(path), "offset": 0, "lines": 0, "final_stage": None}
+        if os.path.exists(self.file):
+            with open(self.file) as f:
+                self.state.update(json.load(f))
+
+    def save(self, **fields):
+        """Updates and atomically rewrites the checkpoint."""
+        self.state.update(fields, updated_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        directory = os.path.dirname(self.file)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.file)
+
+
+def analyze_chunk(chatbot, db, team_name: str, lines: list):
+    """
+    Analyzes a chunk of log lines like analyze_conversation_db: stores the
+    messages in bulk, then processes them member by member in analysis mode.
+
+    Returns:
+        str or None: The last stage concluded in the chunk.
+    """
+    final_stage = None
+    chat_log = "\n".join(lines)
+    chatbot._process_chat_log(db, team_name, chat_log)
+    member_message_map = chatbot._extract_members_and_messages(chat_log)
+    for member_name, messages in member_message_map.items():
+        for text in messages:
+            _, concluded_stage, _, _, _, _, _ = chatbot.process_line(db, team_name, member_name, text, mode="analysis")
+            if concluded_stage:
+                final_stage = concluded_stage
+    return final_stage
+
+# ========================================================
+# WORKERS
+# ========================================================
+
+# State of the current worker process, set up once by _init_worker
+_worker = {}
+
+
+def _init_worker(engines: str, database_url: str, state_dir: str, chunk_lines: int):
+    from sqlalchemy.orm import sessionmaker
+    from app.storage import build_engine
+
+    if engines == "stub":
+        from app.stub_engines import create_stub_chatbot
+        chatbot = create_stub_chatbot()
+    else:
+        from app.chatbot_generative import ChatbotGenerative
+        chatbot = ChatbotGenerative()
+    _worker.update(
+        chatbot=chatbot,
+        engine=build_engine(database_url),
+        # Sessions join the transaction of their chunk; the chatbot's commits only flush into it
+        session_factory=sessionmaker(join_transaction_mode="rollback_only", autoflush=False),
+        state_dir=state_dir,
+        chunk_lines=chunk_lines,
+    )
+
+
+def _analyze_file(path: str) -> dict:
+    """Analyzes one log file from its checkpoint on; returns a summary for the report."""
+    team_name = team_name_for(path)
+    checkpoint = Checkpoint(_worker["state_dir"], path)
+    offset, total = checkpoint.state["offset"], checkpoint.state["lines"]
+    final_stage = checkpoint.state["final_stage"]
+    result = {"file": path, "team_name": team_name, "lines": 0, "total_lines": total, "seconds": 0.0,
+              "final_stage": final_stage, "resumed": offset > 0, "error": None}
+
+    size = os.path.getsize(path)
+    if size < offset:
+        result["error"] = f"the file shrank below the checkpoint ({offset} bytes); remove {checkpoint.file} to analyze it again"
+        return result
+
+    start = time.perf_counter()
+    try:
+        for lines, end in read_chunks(path, offset, _worker["chunk_lines"]):
+            with _worker["engine"].connect() as conn, conn.begin():
+                with _worker["session_factory"](bind=conn) as db:
+                    concluded_stage = analyze_chunk(_worker["chatbot"], db, team_name, lines)
+            final_stage = concluded_stage or final_stage
+            result["lines"] += len(lines)
+            total += len(lines)
+            checkpoint.save(offset=end, lines=total, final_stage=final_stage, team_name=team_name)
+    except Exception as e:
+        result["error"] = str(e)
+        print(f"[ERROR in batch] {team_name}: {e}")
+    result.update(seconds=round(time.perf_counter() - start, 2), total_lines=total, final_stage=final_stage)
+    return result
+
+
+def _print_result(result: dict):
+    if result["error"]:
+        print(f"[batch] {result['team_name']}: FAILED after {result['lines']} new lines: {result['error']}", flush=True)
+    elif not result["lines"]:
+        print(f"[batch] {result['team_name']}: up to date ({result['total_lines']} lines)", flush=True)
+    else:
+        rate = result["lines"] / result["seconds"] if result["seconds"] else 0.0
+        resumed = ", resumed" if result["resumed"] else ""
+        print(f"[batch] {result['team_name']}: {result['lines']} lines in {result['seconds']:.1f} s "
+              f"({rate:.0f} lines/s{resumed}), stage {result['final_stage'] or 'Uncertain'}", flush=True)
+
+
+def run_batch(paths: list, workers: int = 1, engines: str = "live", database_url: str = None,
+              state_dir: str = BATCH_STATE_DIR, chunk_lines: int = BATCH_CHUNK_LINES, pattern: str = "*.txt") -> list:
+    """
+    Analyzes all log files in `paths`.
+
+    Args:
+        paths (list): Files and directories.
+        workers (int): Worker processes; 1 analyzes in this process. Always 1 on SQLite.
+        engines (str): 'live' for the real models, 'stub' for app/stub_engines.py.
+        database_url (str): Target database; DATABASE_URL if omitted.
+        state_dir (str): Directory of the checkpoints.
+        chunk_lines (int): Lines per chunk and checkpoint.
+        pattern (str): File name pattern within directories.
+
+    Returns:
+        list: One summary per file.
+
+    Raises:
+        ValueError: If two files would be analyzed as the same team.
+    """
+    files = find_log_files(paths, pattern)
+    by_team = {}
+    for path in files:
+        by_team.setdefault(team_name_for(path), []).append(path)
+    collisions = {team: team_files for team, team_files in by_team.items() if len(team_files) > 1}
+    if collisions:
+        details = "; ".join(f"{team}: {', '.join(sorted(team_files))}" for team, team_files in sorted(collisions.items()))
+        raise ValueError(f"Files with the same name would be analyzed as one team ({details}). Rename them.")
+
+    from app.db import Base
+    from app.migrations import run_migrations
+    from sqlalchemy.engine import make_url
+    from app.storage import build_engine, get_database_url
+
+    database_url = database_url or get_database_url()
+    if workers > 1 and make_url(database_url).get_backend_name() == "sqlite":
+        print(f"[batch] SQLite allows one writer at a time; using 1 worker instead of {workers}.", flush=True)
+        workers = 1
+    # Create the schema once, before workers start writing to it
+    engine = build_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    engine.dispose()
+
+    init_args = (engines, database_url, state_dir, chunk_lines)
+    results = []
+    if workers <= 1 or len(files) <= 1:
+        _init_worker(*init_args)
+        for path in files:
+            results.append(_analyze_file(path))
+            _print_result(results[-1])
+        return results
+
+    # Fresh interpreters: no model, engine or connection is inherited from this process
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(min(workers, len(files)), initializer=_init_worker, initargs=init_args) as pool:
+        for result in pool.imap_unordered(_analyze_file, files):
+            results.append(result)
+            _print_result(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze directories of chat logs without the API.")
+    parser.add_argument("paths", nargs="+", help="Log files or directories; every file is one team.")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS,
+                        help="Worker processes; without an exported model (app.model_cache) each live worker "
+                             "loads its own ~1.6 GB copy of the models. "
+                             "Runs on SQLite use one worker.")
+    parser.add_argument("--engines", choices=["live", "stub"], default=os.environ.get("ENGINES", "live"))
+    parser.add_argument("--database-url", help="Defaults to DATABASE_URL.")
+    parser.add_argument("--state-dir", default=BATCH_STATE_DIR, help="Checkpoints for resuming.")
+    parser.add_argument("--chunk-lines", type=int, default=BATCH_CHUNK_LINES)
+    parser.add_argument("--pattern", default="*.txt", help="File name pattern within directories.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        results = run_batch(args.paths, args.workers, args.engines, args.database_url, args.state_dir,
+                            args.chunk_lines, args.pattern)
+    except ValueError as e:
+        parser.error(str(e))
+    except KeyboardInterrupt:
+        print("Interrupted. Run the same command again to resume.", file=sys.stderr)
+        sys.exit(130)
+
+    lines = sum(r["lines"] for r in results)
+    failed = [r for r in results if r["error"]]
+    seconds = time.perf_counter() - start
+    print(f"{len(results)} files, {lines} new lines in {seconds:.1f} s ({lines / seconds if seconds else 0:.0f} lines/s), "
+          f"{len(failed)} failed.")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
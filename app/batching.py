@@ -0,0 +1,117 @@
+# batching.py
+
+import asyncio
+import os
+import time
+
+# Requests arriving within this window after the first one share a batch
+BATCH_WINDOW_MS = float(os.environ.get("EMOTION_BATCH_WINDOW_MS", 10))
+# Number of items that closes a batch before the window ends
+MAX_BATCH_SIZE = int(os.environ.get("EMOTION_MAX_BATCH_SIZE", 32))
+
+
+class MicroBatcher:
+    def __init__(self, batch_fn, executor=None, window_ms: float = BATCH_WINDOW_MS,
+                 max_batch_size: int = MAX_BATCH_SIZE):
+        """
+        Collects items submitted by concurrent callers and processes them with one
+        call of `batch_fn`, so throughput scales with the batch size instead of
+        with the number of calls.
+
+        Args:
+            batch_fn (callable): Takes a list of items and returns one result per item.
+            executor (Executor): Executor running `batch_fn`; the loop's default executor if None.
+            window_ms (float): How long to wait for more items after the first one.
+            max_batch_size (int): Number of items that closes a batch early.
+        """
+        self.batch_fn = batch_fn
+        self.executor = executor
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.items = 0
+        self._loop = None
+        self._queue = None
+        self._task = None
+
+    def _ensure_started(self):
+        """Starts the batching task in the running event loop, if it is not running there yet."""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+
+    async def submit(self, item):
+        """
+        Queues an item for the next batch and waits for its result.
+
+        Args:
+            item: One input of `batch_fn`.
+
+        Returns:
+            The result of `batch_fn` for this item.
+        """
+        self._ensure_started()
+        future = self._loop.create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    @property
+    def pending(self) -> int:
+        """Number of items waiting for the next batch."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def close(self):
+        """Stops the batching task. Pending callers are cancelled."""
+        if self._task is not None:
+            # The task cancels the callers of the batch it is collecting or running
+            self._task.cancel()
+            self._task = None
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                future.cancel()
+
+    async def _collect(self, batch: list):
+        """Waits for an item, then gathers more into `batch` until the window ends or the batch is full."""
+        batch.append(await self._queue.get())
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch_size:
+            # Take everything already queued without waiting
+            while not self._queue.empty() and len(batch) < self.max_batch_size:
+                batch.append(self._queue.get_nowait())
+            remaining = deadline - time.monotonic()
+            if len(batch) >= self.max_batch_size or remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        """Processes batches until cancelled."""
+        batch = []
+        try:
+            while True:
+                batch = []
+                await self._collect(batch)
+                items = [item for item, _ in batch]
+                try:
+                    results = await self._loop.run_in_executor(self.executor, self.batch_fn, items)
+                except Exception as e:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                self.batches += 1
+                self.items += len(items)
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
@@ -1,21 +1,95 @@
 # chatbot_generative.py
 
 import re
+from contextlib import nullcontext
 
-from langchain_ollama import OllamaLLM
-from app.emotion_analysis import EmotionDetector
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from app.emotion_analysis import create_emotion_detector
 from app.stage_mapping import StageMapper
+from app.state_cache import StateCache
+from app.events import TeamEventBroker
+from app.metrics import FEEDBACK_TRIGGERS, RELEVANCE_DECISIONS, STEP_SECONDS, Stopwatch, measure, timed
+from app.tracing import traced
+from app.profiling import profiled, settings as profiling_settings
 from app.db import Team, Member, Message
+from app.purge import reset_team_generation
+
+class LineState:
+    def __init__(self, team, member, user_msg, accum_dist, accum_emotions,
+                 final_stage, team_feedback, personal_feedback):
+        """
+        Holds the state of a single line while it moves through the processing steps.
+
+        Args:
+            team (Team): The team instance.
+            member (Member): The member instance.
+            user_msg (Message): The stored user message.
+            accum_dist (dict): The member's stage distribution before this line.
+            accum_emotions (dict): The member's accumulated emotions.
+            final_stage (str): The team stage reported for this line.
+            team_feedback (str): The team feedback reported for this line.
+            personal_feedback (str): The personal feedback reported for this line.
+        """
+        self.team = team
+        self.member = member
+        self.user_msg = user_msg
+        self.accum_dist = accum_dist
+        self.accum_emotions = accum_emotions
+        self.final_stage = final_stage
+        self.team_feedback = team_feedback
+        self.personal_feedback = personal_feedback
+        self.last_emotion_dist = {}
+        self.is_valuable = False
+
+    def as_result(self, bot_response):
+        """
+        Returns the tuple returned by `process_line`.
+
+        Args:
+            bot_response (str or None): The assistant reply, None in analysis mode.
+
+        Returns:
+            tuple: bot_response, final_stage, team_feedback, accum_dist,
+                   last_emotion_dist, accum_emotions, personal_feedback.
+        """
+        return (
+            bot_response,
+            self.final_stage,
+            self.team_feedback,
+            self.accum_dist,
+            self.last_emotion_dist,
+            self.accum_emotions,
+            self.personal_feedback
+        )
+
 
 class ChatbotGenerative:
-    def __init__(self):
+    def __init__(self, state_cache=None, event_broker=None, model=None, emotion_detector=None):
         """
         Initializes the ChatbotGenerative with necessary components like the language model,
         emotion detector, and stage mapper. Also sets up system instructions and tracking for stages.
+
+        Args:
+            state_cache (StateCache): Cache of team/member identities and hot state.
+                                      A private cache is created if omitted.
+            event_broker (TeamEventBroker): Receives team state changes for push updates.
+                                            A private broker is created if omitted.
+            model (OllamaLLM): Language model for responses, relevance and feedback.
+                               llama3.2 through Ollama is used if omitted.
+            emotion_detector (EmotionDetector): Emotion detector. The one configured by
+                                                EMOTION_SERVER_URL is used if omitted.
         """
-        self.model = OllamaLLM(model="llama3.2")
-        self.emotion_detector = EmotionDetector()
-        self.stage_mapper = StageMapper()
+        if model is None:
+            # Imported here so importing the app does not load langchain
+            from langchain_ollama import OllamaLLM
+            model = OllamaLLM(model="llama3.2")
+        self.model = model
+        self.emotion_detector = emotion_detector if emotion_detector is not None else create_emotion_detector()
+        self.stage_mapper = StageMapper(llama_model=self.model)
+        self.state_cache = state_cache if state_cache is not None else StateCache()
+        self.event_broker = event_broker if event_broker is not None else TeamEventBroker()
 
         self.system_instructions = (
             "You are a helpful assistant analyzing a team's emotional climate and mapping it to Tuckman's stages. "
@@ -26,9 +100,6 @@ class ChatbotGenerative:
             "Focus on emotional cues and team dynamics, and maintain a polite, clear, and context-aware dialogue."
         )
 
-        # Tracks the number of lines since the final stage was set for each team-member
-        self.lines_since_final_stage = {}
-
     # ========================================================
     #   STAGE MAPPER PROPERTY
     # ========================================================
@@ -56,12 +127,24 @@ class ChatbotGenerative:
         Returns:
             Team: The team instance.
         """
+        team_id = self.state_cache.get_team_id(team_name)
+        if team_id is not None:
+            team = db.get(Team, team_id)
+            if team is not None and team.name == team_name:
+                return team
+
         team = db.query(Team).filter(Team.name == team_name).first()
         if not team:
             team = Team(name=team_name, current_stage="Uncertain")
             db.add(team)
-            db.commit()
+            try:
+                db.commit()
+            except IntegrityError:
+                # Created concurrently by another request
+                db.rollback()
+                team = db.query(Team).filter(Team.name == team_name).one()
             db.refresh(team)
+        self.state_cache.set_team_id(team_name, team.id)
         return team
 
     def _load_member(self, db, team, member_name: str):
@@ -76,15 +159,36 @@ class ChatbotGenerative:
         Returns:
             Member: The member instance.
         """
-        member = db.query(Member).filter(
-            Member.name == member_name,
-            Member.team_id == team.id
-        ).first()
-        if not member:
-            member = Member(name=member_name, team_id=team.id, current_stage="Uncertain")
-            db.add(member)
+        member = None
+        member_id = self.state_cache.get_member_id(team.id, member_name)
+        if member_id is not None:
+            member = db.get(Member, member_id)
+            if member is not None and (member.team_id != team.id or member.name != member_name):
+                member = None
+
+        if member is None:
+            member_query = db.query(Member).filter(
+                Member.name == member_name,
+                Member.team_id == team.id
+            )
+            member = member_query.first()
+            if not member:
+                member = Member(name=member_name, team_id=team.id, current_stage="Uncertain",
+                                generation=team.generation)
+                db.add(member)
+                try:
+                    db.commit()
+                except IntegrityError:
+                    # Created concurrently by another request
+                    db.rollback()
+                    member = member_query.one()
+                db.refresh(member)
+            self.state_cache.set_member_id(team.id, member_name, member.id)
+
+        if member.generation != team.generation:
+            # First activity of the member since the team was reset
+            member.reset_state(team.generation)
             db.commit()
-            db.refresh(member)
         return member
 
     # ========================================================
@@ -167,7 +271,8 @@ class ChatbotGenerative:
             member = self._load_member(db, team, member_name)
 
             for message in messages:
-                user_msg = Message(member_id=member.id, role="User", text=message)
+                user_msg = Message(member_id=member.id, team_id=team.id, generation=team.generation,
+                                   role="User", text=message)
                 db.add(user_msg)
             db.commit()
 
@@ -197,6 +302,7 @@ class ChatbotGenerative:
         )
         return prompt
 
+    @timed("chat_generation")
     def _generate_response(self, conversation_str: str, user_message: str) -> str:
         """
         Generates a response from the language model based on the conversation and user message.
@@ -212,19 +318,35 @@ class ChatbotGenerative:
         response = self.model.invoke(input=prompt)
         return response.strip()
 
+    @timed("chat_generation")
+    async def _agenerate_response(self, conversation_str: str, user_message: str) -> str:
+        """
+        Async variant of `_generate_response` using `OllamaLLM.ainvoke`.
+
+        Args:
+            conversation_str (str): The existing conversation history.
+            user_message (str): The latest message from the user.
+
+        Returns:
+            str: The generated response from the assistant.
+        """
+        prompt = self._build_prompt(conversation_str, user_message)
+        response = await self.model.ainvoke(input=prompt)
+        return response.strip()
+
     # ========================================================
     #   MESSAGE RELEVANCE CLASSIFICATION
     # ========================================================
 
-    def _classify_message_relevance(self, text: str) -> bool:
+    def _build_relevance_prompt(self, text: str) -> str:
         """
-        Classifies whether a user message is 'Valuable' or should be 'Skipped', if it does not have any emotional value.
+        Builds the prompt asking the language model whether a message is 'Valuable' or should be 'Skipped'.
 
         Args:
             text (str): The user message text.
 
         Returns:
-            bool: True if the message is valuable, False otherwise.
+            str: The classification prompt.
         """
         classification_prompt = (
             "Classify the following user message as either 'Valuable' or 'Skip'. "
@@ -235,10 +357,41 @@ class ChatbotGenerative:
             "2. If it is only a greeting, small talk, or not about the team's emotional state, output 'Skip'.\n"
             "3. Output exactly one word: 'Valuable' or 'Skip'."
         )
+        return classification_prompt
+
+    @timed("relevance")
+    def _classify_message_relevance(self, text: str) -> bool:
+        """
+        Classifies whether a user message is 'Valuable' or should be 'Skipped', if it does not have any emotional value.
+
+        Args:
+            text (str): The user message text.
+
+        Returns:
+            bool: True if the message is valuable, False otherwise.
+        """
+        response = self.model.invoke(input=self._build_relevance_prompt(text)).strip()
+        return self._record_relevance(response)
+
+    @timed("relevance")
+    async def _aclassify_message_relevance(self, text: str) -> bool:
+        """
+        Async variant of `_classify_message_relevance` using `OllamaLLM.ainvoke`.
+
+        Args:
+            text (str): The user message text.
+
+        Returns:
+            bool: True if the message is valuable, False otherwise.
+        """
+        response = (await self.model.ainvoke(input=self._build_relevance_prompt(text))).strip()
+        return self._record_relevance(response)
 
-        response = self.model.invoke(input=classification_prompt).strip()
-        print("[DEBUG classify_message_relevance] =>", response)
-        return response.lower().startswith("valuable")
+    def _record_relevance(self, response: str) -> bool:
+        """Parses a relevance classification and counts the decision."""
+        is_valuable = response.lower().startswith("valuable")
+        RELEVANCE_DECISIONS.labels("Valuable" if is_valuable else "Skip").inc()
+        return is_valuable
 
     # ========================================================
     #   TEAM STAGE COMPUTATION
@@ -257,8 +410,13 @@ class ChatbotGenerative:
         combined = {s: 0.0 for s in stage_names}
         num_members = 0
 
-        for mem in team.members:
-            dist = mem.load_accum_distrib()
+        # Only the distributions are needed, so skip loading whole Member rows
+        distributions = db.query(Member.accum_distribution).filter(
+            Member.team_id == team.id,
+            Member.generation == team.generation
+        ).all()
+        for (raw_dist,) in distributions:
+            dist = Member.parse_accum_distrib(raw_dist)
             if dist:
                 num_members += 1
                 for stg, val in dist.items():
@@ -272,159 +430,346 @@ class ChatbotGenerative:
             combined = {}
 
         team.save_team_distribution(combined)
-        db.commit()
-
         if not combined or all(v == 0.0 for v in combined.values()):
             team.current_stage = "Uncertain"
-            db.commit()
-            return
+        else:
+            team.current_stage = max(combined, key=combined.get)
+        db.commit()
 
-        best_stage = max(combined, key=combined.get)
-        best_val = combined[best_stage]
+    @traced("update_team_state")
+    def _update_team_state(self, db, state):
+        """
+        Recomputes the team stage after a line, writes the new hot state
+        of the team and member through to the state cache and publishes
+        the team state to its subscribers if it changed.
 
-        team.current_stage = best_stage
-        db.commit()
+        Args:
+            db (Session): Database session.
+            state (LineState): The state of the line being processed.
+        """
+        self._compute_team_stage(db, state.team)
+        team_state = state.team.snapshot_state()
+        self.state_cache.set_team_state(state.team.id, team_state)
+        self.event_broker.publish(state.team.name, team_state)
+        self.state_cache.set_member_state(state.member.id, state.member.snapshot_state(team_version=state.team.version))
 
     # ========================================================
-    #   MAIN PROCESSING FUNCTION
+    #   LINE PROCESSING STEPS
     # ========================================================
-
-    def process_line(self, db, team_name: str, member_name: str, text: str, mode: str = "conversation"):
+    #
+    # process_line is split into database steps and model steps. The sync
+    # pipeline runs them in sequence on a Session; the async pipeline runs the
+    # database steps through AsyncSession.run_sync and awaits the model steps,
+    # so both share the same state handling.
+
+    @traced("begin_line")
+    def _begin_line(self, db, team_name: str, member_name: str, text: str):
         """
-        Processes a single line of conversation, either in conversation or analysis mode.
+        Loads (or creates) the team and member, stores the user message and
+        snapshots the state the line is processed against.
 
         Args:
             db (Session): Database session.
             team_name (str): Name of the team.
             member_name (str): Name of the member.
             text (str): The message text.
-            mode (str): 'conversation' or 'analysis'. Determines whether to generate assistant responses.
 
         Returns:
-            tuple: Contains bot_response, final_stage, team_feedback, accum_dist,
-                   last_emotion_dist, accum_emotions, personal_feedback.
+            LineState: The state of the line being processed.
         """
         team = self._load_team(db, team_name)
         member = self._load_member(db, team, member_name)
 
-        user_msg = Message(member_id=member.id, role="User", text=text)
+        user_msg = Message(member_id=member.id, team_id=team.id, generation=team.generation,
+                           role="User", text=text)
         db.add(user_msg)
         db.commit()
         db.refresh(user_msg)
 
         accum_dist = member.load_accum_distrib()
         accum_emotions = member.load_accum_emotions()
-        final_stage = team.load_current_stage()
-        team_feedback = team.load_feedback()
-        personal_feedback = member.load_personal_feedback()
 
         if not accum_dist:
             accum_dist = {stg: 0.0 for stg in self.stage_mapper.stage_emotion_map.keys()}
         if not accum_emotions:
             accum_emotions = {}
 
-        last_emotion_dist = {}
+        return LineState(
+            team=team,
+            member=member,
+            user_msg=user_msg,
+            accum_dist=accum_dist,
+            accum_emotions=accum_emotions,
+            final_stage=team.load_current_stage(),
+            team_feedback=team.load_feedback(),
+            personal_feedback=member.load_personal_feedback()
+        )
 
-        is_valuable = self._classify_message_relevance(text)
-        if is_valuable:
-            emotion_results = self.emotion_detector.detect_emotion(text, top_n=5)
-            top5_emotions = emotion_results["top_emotions"]
+    @traced("apply_emotions")
+    def _apply_emotions(self, db, state, top5_emotions):
+        """
+        Stores the detected emotions of a valuable message and updates the member's
+        accumulated emotions, stage distribution and current stage.
 
-            dist_for_message = {emo["label"]: emo["score"] for emo in top5_emotions}
-            user_msg.save_top_emotion_distribution(dist_for_message)
-            db.commit()
+        Args:
+            db (Session): Database session.
+            state (LineState): The state of the line being processed.
+            top5_emotions (list): The top emotions detected in the message.
 
-            last_emotion_dist = dist_for_message
+        Returns:
+            str or None: The stage to generate feedback for, or None if no feedback is due.
+        """
+        member = state.member
+        accum_emotions = state.accum_emotions
 
-            for e_dict in top5_emotions:
-                lbl = e_dict["label"]
-                conf = e_dict["score"]
-                accum_emotions[lbl] = accum_emotions.get(lbl, 0.0) + conf
+        dist_for_message = {emo["label"]: emo["score"] for emo in top5_emotions}
+        state.user_msg.save_top_emotion_distribution(dist_for_message)
 
-            sum_emotions = sum(accum_emotions.values())
-            if sum_emotions > 0.0:
-                for e_lbl in accum_emotions:
-                    accum_emotions[e_lbl] = accum_emotions[e_lbl] / sum_emotions
+        state.last_emotion_dist = dist_for_message
 
-            member.save_accum_emotions(accum_emotions)
-            db.commit()
+        for e_dict in top5_emotions:
+            lbl = e_dict["label"]
+            conf = e_dict["score"]
+            accum_emotions[lbl] = accum_emotions.get(lbl, 0.0) + conf
 
-            entire_dist = self.stage_mapper.get_stage_distribution_from_entire_emotions(accum_emotions)
-            member.save_accum_distrib(entire_dist)
+        sum_emotions = sum(accum_emotions.values())
+        if sum_emotions > 0.0:
+            for e_lbl in accum_emotions:
+                accum_emotions[e_lbl] = accum_emotions[e_lbl] / sum_emotions
 
-            member.num_lines += 1
-            db.commit()
+        member.save_accum_emotions(accum_emotions)
+
+        entire_dist = self.stage_mapper.get_stage_distribution_from_entire_emotions(accum_emotions)
+        member.save_accum_distrib(entire_dist)
 
-            key_for_ephemeral = (team_name, member_name)
-            if key_for_ephemeral not in self.lines_since_final_stage:
-                self.lines_since_final_stage[key_for_ephemeral] = 0
-            self.lines_since_final_stage[key_for_ephemeral] += 1
+        # Increment in SQL so concurrent workers never lose a line. One commit
+        # stores the message distribution and all member updates together.
+        member.num_lines = Member.num_lines + 1
+        member.lines_since_final_stage = Member.lines_since_final_stage + 1
+        db.commit()
 
-            if member.num_lines >= 3:
-                best_stage = max(entire_dist, key=entire_dist.get)
-                best_val = entire_dist[best_stage]
+        if member.num_lines >= 3:
+            best_stage = max(entire_dist, key=entire_dist.get)
+            best_val = entire_dist[best_stage]
 
-                if best_val > 0.5:
+            if best_val > 0.5:
+                if member.current_stage != best_stage:
                     member.current_stage = best_stage
                     db.commit()
 
-                    if self.lines_since_final_stage[key_for_ephemeral] >= 3:
-                        personal_feedback = self.stage_mapper.get_personal_feedback(db, member.id, best_stage)
-                        member.personal_feedback = personal_feedback
-                        db.commit()
+                if member.lines_since_final_stage >= 3 and self._claim_feedback(db, member):
+                    FEEDBACK_TRIGGERS.inc()
+                    return best_stage
+        return None
 
-                        team_feedback = self.stage_mapper.get_team_feedback(db, team.id, best_stage)
-                        team.feedback = team_feedback
-                        db.commit()
+    @traced("save_feedback")
+    def _save_feedback(self, db, state, stage: str, personal_feedback: str, team_feedback: str):
+        """
+        Stores freshly generated personal and team feedback.
+
+        Args:
+            db (Session): Database session.
+            state (LineState): The state of the line being processed.
+            stage (str): The stage the feedback was generated for.
+            personal_feedback (str): The member's personal feedback.
+            team_feedback (str): The team feedback.
+        """
+        state.member.personal_feedback = personal_feedback
+        state.team.feedback = team_feedback
+        db.commit()
 
-                        final_stage = best_stage
-                        self.lines_since_final_stage[key_for_ephemeral] = 0
+        state.personal_feedback = personal_feedback
+        state.team_feedback = team_feedback
+        state.final_stage = stage
 
-        self._compute_team_stage(db, team)
+    def _claim_feedback(self, db, member) -> bool:
+        """
+        Resets the member's feedback counter if it is still due. The conditional
+        update lets exactly one worker generate feedback when several processes
+        handle lines of the same member.
 
-        if mode == "conversation":
-            all_msgs = db.query(Message).join(Member).filter(Member.id == member.id).all()
-            all_msgs.sort(key=lambda x: x.id)
+        Args:
+            db (Session): Database session.
+            member (Member): The member instance.
+
+        Returns:
+            bool: True if this call claimed the feedback.
+        """
+        result = db.execute(
+            update(Member)
+            .where(Member.id == member.id, Member.lines_since_final_stage >= 3)
+            .values(lines_since_final_stage=0)
+        )
+        db.commit()
+        return result.rowcount == 1
+
+    @traced("history")
+    def _build_conversation_history(self, db, member) -> str:
+        """
+        Builds the conversation history of a member for the chat prompt.
+
+        Args:
+            db (Session): Database session.
+            member (Member): The member instance.
+
+        Returns:
+            str: The conversation history, one message per line.
+        """
+        # Every message belongs to `member`, so its name is not loaded per message
+        rows = db.query(Message.role, Message.text).filter(
+            Message.member_id == member.id,
+            Message.generation == member.generation
+        ).order_by(Message.id).all()
+
+        lines_for_prompt = []
+        for role, text in rows:
+            if role.lower() == "assistant":
+                lines_for_prompt.append(f"Assistant: {text}")
+            else:
+                lines_for_prompt.append(f"User ({member.name}): {text}")
+        return "\n".join(lines_for_prompt)
+
+    @traced("save_reply")
+    def _save_assistant_message(self, db, state, bot_response: str):
+        """
+        Stores the assistant's reply to the processed line.
+
+        Args:
+            db (Session): Database session.
+            state (LineState): The state of the line being processed.
+            bot_response (str): The generated reply.
+        """
+        assistant_msg = Message(
+            member_id=state.member.id,
+            team_id=state.team.id,
+            generation=state.team.generation,
+            role="Assistant",
+            text=bot_response,
+            detected_emotion="(Top-5 used)" if state.is_valuable else "(Skipped)",
+            stage_at_time=state.final_stage if state.final_stage else "Uncertain"
+        )
+        db.add(assistant_msg)
+        db.commit()
+
+    def _load_member_texts(self, db, team_name: str, member_name: str):
+        """
+        Returns the texts of all stored messages of a member.
+
+        Args:
+            db (Session): Database session.
+            team_name (str): Name of the team.
+            member_name (str): Name of the member.
+
+        Returns:
+            list: The message texts, in insertion order.
+        """
+        team = self._load_team(db, team_name)
+        member = self._load_member(db, team, member_name)
+
+        messages = db.query(Message).filter(
+            Message.member_id == member.id,
+            Message.generation == member.generation
+        ).all()
+        return [message.text for message in messages]
+
+    # ========================================================
+    #   MAIN PROCESSING FUNCTION
+    # ========================================================
+
+    @traced("process_line")
+    def process_line(self, db, team_name: str, member_name: str, text: str, mode: str = "conversation"):
+        """
+        Processes a single line of conversation, either in conversation or analysis mode.
 
-            lines_for_prompt = []
-            for msg in all_msgs:
-                if msg.role.lower() == "assistant":
-                    lines_for_prompt.append(f"Assistant: {msg.text}")
-                else:
-                    lines_for_prompt.append(f"User ({msg.member.name}): {msg.text}")
-            conversation_str = "\n".join(lines_for_prompt)
+        Args:
+            db (Session): Database session.
+            team_name (str): Name of the team.
+            member_name (str): Name of the member.
+            text (str): The message text.
+            mode (str): 'conversation' or 'analysis'. Determines whether to generate assistant responses.
 
+        Returns:
+            tuple: Contains bot_response, final_stage, team_feedback, accum_dist,
+                   last_emotion_dist, accum_emotions, personal_feedback.
+        """
+        db_time = Stopwatch()
+        with db_time:
+            state = self._begin_line(db, team_name, member_name, text)
+
+        state.is_valuable = self._classify_message_relevance(text)
+        if state.is_valuable:
+            with measure("emotion_inference"):
+                emotion_results = self.emotion_detector.detect_emotion(text, top_n=5)
+            with db_time:
+                feedback_stage = self._apply_emotions(db, state, emotion_results["top_emotions"])
+
+            if feedback_stage:
+                personal_feedback = self.stage_mapper.get_personal_feedback(db, state.member.id, feedback_stage)
+                team_feedback = self.stage_mapper.get_team_feedback(db, state.team.id, feedback_stage)
+                with db_time:
+                    self._save_feedback(db, state, feedback_stage, personal_feedback, team_feedback)
+
+        with db_time:
+            self._update_team_state(db, state)
+
+        bot_response = None
+        if mode == "conversation":
+            with db_time:
+                conversation_str = self._build_conversation_history(db, state.member)
             bot_response = self._generate_response(conversation_str, text)
-            assistant_msg = Message(
-                member_id=member.id,
-                role="Assistant",
-                text=bot_response,
-                detected_emotion="(Top-5 used)" if is_valuable else "(Skipped)",
-                stage_at_time=final_stage if final_stage else "Uncertain"
-            )
-            db.add(assistant_msg)
-            db.commit()
+            with db_time:
+                self._save_assistant_message(db, state, bot_response)
+        # In analysis mode, skip generating assistant responses
 
-            return (
-                bot_response,
-                final_stage,
-                team_feedback,
-                accum_dist,
-                last_emotion_dist,
-                accum_emotions,
-                personal_feedback
-            )
-        else:
-            # In analysis mode, skip generating assistant responses
-            return (
-                None,
-                final_stage,
-                team_feedback,
-                accum_dist,
-                last_emotion_dist,
-                accum_emotions,
-                personal_feedback
-            )
+        STEP_SECONDS.labels("db").observe(db_time.total)
+        return state.as_result(bot_response)
+
+    @traced("process_line")
+    async def aprocess_line(self, db, team_name: str, member_name: str, text: str, mode: str = "conversation"):
+        """
+        Async variant of `process_line`. Database steps run on the async session,
+        LLM calls use `ainvoke` and emotion detection runs on the inference executor.
+
+        Args:
+            db (AsyncSession): Async database session.
+            team_name (str): Name of the team.
+            member_name (str): Name of the member.
+            text (str): The message text.
+            mode (str): 'conversation' or 'analysis'. Determines whether to generate assistant responses.
+
+        Returns:
+            tuple: Same as `process_line`.
+        """
+        db_time = Stopwatch()
+        with db_time:
+            state = await db.run_sync(self._begin_line, team_name, member_name, text)
+
+        state.is_valuable = await self._aclassify_message_relevance(text)
+        if state.is_valuable:
+            with measure("emotion_inference"):
+                emotion_results = await self.emotion_detector.adetect_emotion(text, top_n=5)
+            with db_time:
+                feedback_stage = await db.run_sync(self._apply_emotions, state, emotion_results["top_emotions"])
+
+            if feedback_stage:
+                personal_feedback = await self.stage_mapper.aget_personal_feedback(db, state.member.id, feedback_stage)
+                team_feedback = await self.stage_mapper.aget_team_feedback(db, state.team.id, feedback_stage)
+                with db_time:
+                    await db.run_sync(self._save_feedback, state, feedback_stage, personal_feedback, team_feedback)
+
+        with db_time:
+            await db.run_sync(self._update_team_state, state)
+
+        bot_response = None
+        if mode == "conversation":
+            with db_time:
+                conversation_str = await db.run_sync(self._build_conversation_history, state.member)
+            bot_response = await self._agenerate_response(conversation_str, text)
+            with db_time:
+                await db.run_sync(self._save_assistant_message, state, bot_response)
+
+        STEP_SECONDS.labels("db").observe(db_time.total)
+        return state.as_result(bot_response)
 
     def analyze_conversation_db(self, db, team_name: str, chat_log: str):
         """
@@ -441,26 +786,54 @@ class ChatbotGenerative:
         Returns:
             tuple: Contains final_stage, feedback, and distribution.
         """
-        members = self._process_chat_log(db, team_name, chat_log)
         final_stage = None
         feedback = None
         distribution = {}
 
-        for member_name in members:
+        with profiled() if profiling_settings.analysis_runs else nullcontext():
+            members = self._process_chat_log(db, team_name, chat_log)
+            for member_name in members:
+                for text in self._load_member_texts(db, team_name, member_name):
+                    _, concluded_stage, concluded_feedback, _, _, _, _ = self.process_line(
+                        db, team_name, member_name, text, mode="analysis"
+                    )
+                    if concluded_stage:
+                        final_stage = concluded_stage
+                        feedback = concluded_feedback
+
             team = self._load_team(db, team_name)
-            member = self._load_member(db, team, member_name)
+            distribution = team.load_team_distribution()
 
-            messages = db.query(Message).filter(Message.member_id == member.id).all()
-            for message in messages:
-                _, concluded_stage, concluded_feedback, _, _, _, _ = self.process_line(
-                    db, team_name, member_name, message.text, mode="analysis"
-                )
-                if concluded_stage:
-                    final_stage = concluded_stage
-                    feedback = concluded_feedback
+        return final_stage, feedback, distribution
 
-        team = self._load_team(db, team_name)
-        distribution = team.load_team_distribution()
+    async def aanalyze_conversation_db(self, db, team_name: str, chat_log: str):
+        """
+        Async variant of `analyze_conversation_db`.
+
+        Args:
+            db (AsyncSession): Async database session.
+            team_name (str): Name of the team.
+            chat_log (str): The raw chat log text.
+
+        Returns:
+            tuple: Contains final_stage, feedback, and distribution.
+        """
+        final_stage = None
+        feedback = None
+
+        with profiled() if profiling_settings.analysis_runs else nullcontext():
+            members = await db.run_sync(self._process_chat_log, team_name, chat_log)
+            for member_name in members:
+                for text in await db.run_sync(self._load_member_texts, team_name, member_name):
+                    _, concluded_stage, concluded_feedback, _, _, _, _ = await self.aprocess_line(
+                        db, team_name, member_name, text, mode="analysis"
+                    )
+                    if concluded_stage:
+                        final_stage = concluded_stage
+                        feedback = concluded_feedback
+
+            team = await db.run_sync(self._load_team, team_name)
+            distribution = team.load_team_distribution()
 
         return final_stage, feedback, distribution
 
@@ -471,28 +844,15 @@ class ChatbotGenerative:
     def reset_team(self, db, team_name: str):
         """
         Resets the team's stage and clears all associated member data.
+        The reset only starts a new team generation: members clear their state on
+        their next activity and messages of older generations become invisible.
+        The old messages are deleted afterwards with `app.purge`.
 
         Args:
             db (Session): Database session.
             team_name (str): Name of the team to reset.
-        """
-        team = db.query(Team).filter(Team.name == team_name).first()
-        if team:
-            team.current_stage = "Uncertain"
-            team.feedback = ""
-            for member in team.members:
-                member.current_stage = "Uncertain"
-                member.save_accum_distrib({})
-                member.num_lines = 0
-                member.save_accum_emotions({})
-                member.personal_feedback = ""
-                db.query(Message).filter(Message.member_id == member.id).delete()
-                db.commit()
-            db.commit()
 
-        keys_to_delete = []
-        for (t_name, m_name) in self.lines_since_final_stage:
-            if t_name == team_name:
-                keys_to_delete.append((t_name, m_name))
-        for k in keys_to_delete:
-            del self.lines_since_final_stage[k]
+        Returns:
+            tuple or None: (team_id, new generation) to purge, or None if the team does not exist.
+        """
+        return reset_team_generation(db, team_name, self.event_broker)
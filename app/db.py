@@ -1,14 +1,30 @@
 # db.py
 
 import json
-from sqlalchemy import create_engine, Column, Integer, String, ForeignKey
-from sqlalchemy.orm import sessionmaker, declarative_base, relationship
+from datetime import datetime, timezone
 
-DATABASE_URL = "sqlite:///./database.db"
-engine = create_engine(DATABASE_URL, echo=False)
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, event, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker, declarative_base, relationship
+from sqlalchemy.orm.util import identity_key
+
+from app.storage import build_engine, build_async_engine, get_database_url
+
+DATABASE_URL = get_database_url()
+engine = build_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine used by the API routes. Objects are not expired on commit so that
+# their attributes can be read from the event loop without implicit lazy loads.
+async_engine = build_async_engine(DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
+
+def utcnow():
+    """Returns the current UTC time as a naive datetime, as stored in the database."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 # ========================================================
 # DATABASE MODELS
 # ========================================================
@@ -21,6 +37,8 @@ class Team(Base):
     current_stage = Column(String, default="Uncertain")
     stage_distribution = Column(String, default="{}")
     feedback = Column(String, default="")
+    generation = Column(Integer, nullable=False, default=0, server_default="0")  # Incremented on every reset
+    version = Column(Integer, nullable=False, default=0, server_default="0")     # Incremented on every change of the team or its members
 
     members = relationship("Member", back_populates="team")
 
@@ -48,9 +66,21 @@ class Team(Base):
         """Returns the feedback for the team."""
         return self.feedback or ""
 
+    def snapshot_state(self):
+        """Returns the team's hot state as served by /teaminfo."""
+        return {
+            "distribution": self.load_team_distribution(),
+            "final_stage": self.load_current_stage(),
+            "feedback": self.load_feedback(),
+            "version": self.version or 0
+        }
+
 
 class Member(Base):
     __tablename__ = "members"
+    __table_args__ = (
+        Index("ix_members_team_id_name", "team_id", "name", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
@@ -62,7 +92,9 @@ class Member(Base):
     accum_distribution = Column(String, default="{}")  # Tuckman stage distribution
     accum_emotions = Column(String, default="{}")      # Overall emotional distribution
     num_lines = Column(Integer, default=0)
+    lines_since_final_stage = Column(Integer, nullable=False, default=0, server_default="0")  # Lines since the last feedback
     personal_feedback = Column(String, default="")      # Personal feedback for the member
+    generation = Column(Integer, nullable=False, default=0, server_default="0")  # Team generation the state belongs to
 
     messages = relationship("Message", back_populates="member")
 
@@ -72,8 +104,13 @@ class Member(Base):
 
     def load_accum_distrib(self):
         """Loads the accumulated Tuckman stage distribution from JSON to a dictionary."""
+        return Member.parse_accum_distrib(self.accum_distribution)
+
+    @staticmethod
+    def parse_accum_distrib(raw):
+        """Parses a stored accum_distribution value, e.g. one selected as a single column."""
         try:
-            dist = json.loads(self.accum_distribution)
+            dist = json.loads(raw)
             return dist if isinstance(dist, dict) else {}
         except:
             return {}
@@ -102,18 +139,52 @@ class Member(Base):
         """Returns the current stage of the member."""
         return self.current_stage or "Uncertain"
 
+    def reset_state(self, generation):
+        """Clears the accumulated state and moves the member to the given team generation."""
+        self.current_stage = "Uncertain"
+        self.save_accum_distrib({})
+        self.num_lines = 0
+        self.lines_since_final_stage = 0
+        self.save_accum_emotions({})
+        self.personal_feedback = ""
+        self.generation = generation
+
+    def snapshot_state(self, team_generation=None, team_version=0):
+        """
+        Returns the member's hot state as served by /memberinfo, tagged with the team version.
+        A member whose state predates the team's last reset reports an empty state.
+        """
+        if team_generation is not None and self.generation != team_generation:
+            return {"distribution": {}, "final_stage": "Uncertain", "accum_emotions": {},
+                    "personal_feedback": "", "version": team_version}
+        return {
+            "distribution": self.load_accum_distrib(),
+            "final_stage": self.load_current_stage(),
+            "accum_emotions": self.load_accum_emotions(),
+            "personal_feedback": self.load_personal_feedback(),
+            "version": team_version
+        }
+
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("ix_messages_member_id_id", "member_id", "id"),
+        Index("ix_messages_team_id_id", "team_id", "id"),
+        Index("ix_messages_team_id_generation", "team_id", "generation"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     member_id = Column(Integer, ForeignKey("members.id"))
+    team_id = Column(Integer, ForeignKey("teams.id"), nullable=True)  # Denormalized from member for team scans
     role = Column(String)
     text = Column(String)
     detected_emotion = Column(String, nullable=True)
     stage_at_time = Column(String, nullable=True)
 
     top_emotion_distribution = Column(String, default="{}")
+    generation = Column(Integer, nullable=False, default=0, server_default="0")  # Team generation the message belongs to
+    created_at = Column(DateTime, default=utcnow, nullable=True)
 
     member = relationship("Member", back_populates="messages")
 
@@ -134,11 +205,89 @@ class Message(Base):
         self.top_emotion_distribution = json.dumps(dist_dict)
 
 
+class MessageSummary(Base):
+    __tablename__ = "message_summaries"
+    __table_args__ = (
+        Index("ix_message_summaries_member_id_generation", "member_id", "generation", unique=True),
+        Index("ix_message_summaries_team_id_generation", "team_id", "generation"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    member_id = Column(Integer, ForeignKey("members.id"))
+    team_id = Column(Integer, ForeignKey("teams.id"))
+    generation = Column(Integer, nullable=False, default=0, server_default="0")
+
+    num_messages = Column(Integer, default=0)          # Compacted messages (user and assistant)
+    num_valuable = Column(Integer, default=0)          # Compacted user messages with detected emotions
+    first_message_id = Column(Integer, nullable=True)
+    last_message_id = Column(Integer, nullable=True)
+    first_created_at = Column(DateTime, nullable=True)
+    last_created_at = Column(DateTime, nullable=True)
+    emotion_totals = Column(String, default="{}")      # Sum of the top emotion distributions
+
+    # ====================================================
+    #   SUMMARY DATA HANDLING FUNCTIONS
+    # ====================================================
+
+    def load_emotion_totals(self):
+        """Loads the aggregated emotion vector from JSON to a dictionary."""
+        try:
+            dist = json.loads(self.emotion_totals)
+            return dist if isinstance(dist, dict) else {}
+        except:
+            return {}
+
+    def save_emotion_totals(self, dist_dict):
+        """Saves the aggregated emotion vector as a JSON string."""
+        self.emotion_totals = json.dumps(dist_dict)
+
+    def top_emotions(self, top_n: int = 5):
+        """Returns the strongest aggregated emotions as (label, share) pairs."""
+        totals = self.load_emotion_totals()
+        total_sum = sum(totals.values())
+        if total_sum <= 0:
+            return []
+        ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top_n]
+        return [(label, value / total_sum) for label, value in ranked]
+
+
+# ========================================================
+# TEAM VERSION TRACKING
+# ========================================================
+#
+# Every flush that changes a team or one of its members increments the team's
+# version with an atomic `version = version + 1`, so the counter stays exact
+# across worker processes. The version is used for ETags on /teaminfo and /memberinfo.
+# Teams bumped with a plain UPDATE are not in the session, so their ids are
+# left in session.info["bumped_team_ids"] for the state cache hooks.
+
+@event.listens_for(Session, "before_flush")
+def _bump_team_versions(session, flush_context, instances):
+    team_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Team) and obj.id is not None and session.is_modified(obj):
+            team_ids.add(obj.id)
+        elif isinstance(obj, Member) and obj.team_id is not None and session.is_modified(obj):
+            team_ids.add(obj.team_id)
+
+    for team_id in team_ids:
+        team = session.identity_map.get(identity_key(Team, team_id))
+        if team is not None:
+            team.version = Team.version + 1
+        else:
+            session.execute(update(Team).where(Team.id == team_id).values(version=Team.version + 1))
+            session.info.setdefault("bumped_team_ids", set()).add(team_id)
+
+
 # ========================================================
 # DATABASE INITIALIZATION FUNCTION
 # ========================================================
 def init_db():
     """
-    Initializes the database by creating all tables.
+    Initializes the database by creating all tables and applying
+    pending schema migrations (indexes, new columns) to existing databases.
     """
+    from app.migrations import run_migrations
+
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
@@ -1,14 +1,64 @@
 # emotion_analysis.py
 
-from transformers import pipeline
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from app.batching import MicroBatcher
+from app.metrics import EMOTION_BATCH_SIZE
+from app.profiling import torch_profiled
+
+# Dedicated executor for model inference, so long forward passes neither block the
+# event loop nor occupy the threadpool that serves the sync parts of the API.
+INFERENCE_THREADS = int(os.environ.get("INFERENCE_THREADS", 1))
+inference_executor = ThreadPoolExecutor(max_workers=INFERENCE_THREADS, thread_name_prefix="inference")
+
+# Premise/hypothesis pairs per forward pass. Zero-shot classification scores every
+# candidate emotion as a separate pair, so one message alone fills a batch.
+PIPELINE_BATCH_SIZE = int(os.environ.get("EMOTION_PIPELINE_BATCH_SIZE", 32))
+
+# URL of a shared inference server (see app/inference_server.py), e.g.
+# http://127.0.0.1:8001 or unix:///tmp/emotion.sock. The model runs in-process if unset.
+EMOTION_SERVER_URL = os.environ.get("EMOTION_SERVER_URL", "")
+
+def create_emotion_detector():
+    """
+    Returns the emotion detector configured by EMOTION_SERVER_URL: a client of the
+    shared inference server if it is set, otherwise an in-process EmotionDetector.
+    """
+    if EMOTION_SERVER_URL:
+        from app.inference_client import RemoteEmotionDetector
+        return RemoteEmotionDetector(EMOTION_SERVER_URL)
+    return EmotionDetector()
+
+def _load_classifier():
+    """
+    Loads the zero-shot classifier offline from EMOTION_MODEL_DIR
+    if the model was exported there, otherwise from the Hugging Face cache.
+    """
+    # Imported here so API workers using a remote detector never load torch
+    from transformers import pipeline
+    from app.model_cache import EMOTION_MODEL, has_local_model, load_zero_shot_pipeline
+
+    if has_local_model():
+        return load_zero_shot_pipeline()
+    return pipeline("zero-shot-classification", model=EMOTION_MODEL)
 
 class EmotionDetector:
-    def __init__(self):
+    def __init__(self, classifier=None):
         """
         Initializes the EmotionDetector with a zero-shot classification pipeline
         and defines a list of candidate emotions mapped to Tuckman's stages.
+
+        Args:
+            classifier (callable): Zero-shot classifier to use instead of loading bart-large-mnli.
         """
-        self.zero_shot_classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
+        if classifier is None:
+            classifier = _load_classifier()
+        self.zero_shot_classifier = classifier
+
+        # Merges concurrent async detections into batched forward passes
+        self.batcher = MicroBatcher(self._detect_batch, executor=inference_executor)
 
         # Candidate emotions categorized by Tuckman's stages
         self.candidate_emotions = [
@@ -53,15 +103,39 @@ class EmotionDetector:
         Returns:
             dict: Contains the dominant emotion, its confidence score, and a list of top emotions with scores.
         """
-        if not text.strip():
-            return {
-                "label": "uncertainty",
-                "score": 1.0,
-                "top_emotions": [{"label": "uncertainty", "score": 1.0}]
-            }
+        return self.detect_emotions([text], top_n)[0]
+
+    def detect_emotions(self, texts: list, top_n: int = 5):
+        """
+        Detects the top emotions of several texts with one batched pipeline call.
+
+        Args:
+            texts (list): The texts to analyze.
+            top_n (int): The number of top emotions to return per text.
+
+        Returns:
+            list: One result per text, each with the structure returned by `detect_emotion`.
+        """
+        # Empty texts are uncertain and never reach the model
+        results = [
+            {"label": "uncertainty", "score": 1.0, "top_emotions": [{"label": "uncertainty", "score": 1.0}]}
+            for _ in texts
+        ]
+        pending = [i for i, text in enumerate(texts) if text.strip()]
 
-        result = self.zero_shot_classifier(text, self.candidate_emotions)
+        if pending:
+            with torch_profiled("emotion"):
+                outputs = self.zero_shot_classifier(
+                    [texts[i] for i in pending], self.candidate_emotions, batch_size=PIPELINE_BATCH_SIZE
+                )
+            if isinstance(outputs, dict):
+                outputs = [outputs]
+            for i, output in zip(pending, outputs):
+                results[i] = self._format_result(output, top_n)
+        return results
 
+    def _format_result(self, result: dict, top_n: int):
+        """Converts a zero-shot pipeline output into the result of `detect_emotion`."""
         top_emotions = [
             {"label": label, "score": score}
             for label, score in zip(result["labels"], result["scores"])
@@ -76,3 +150,36 @@ class EmotionDetector:
             "score": confidence,
             "top_emotions": top_emotions
         }
+
+    def _detect_batch(self, items: list):
+        """
+        Runs a micro-batch of (text, top_n) items as one `detect_emotions` call.
+
+        Returns:
+            list: One `detect_emotion` result per item.
+        """
+        EMOTION_BATCH_SIZE.observe(len(items))
+        results = self.detect_emotions([text for text, _ in items], max(top_n for _, top_n in items))
+        for result, (_, top_n) in zip(results, items):
+            result["top_emotions"] = result["top_emotions"][:top_n]
+        return results
+
+    async def adetect_emotion(self, text: str, top_n: int = 5):
+        """
+        Async variant of `detect_emotion`. Concurrent calls are merged into one batched
+        forward pass on the dedicated inference executor.
+
+        Args:
+            text (str): The text to analyze.
+            top_n (int): The number of top emotions to return.
+
+        Returns:
+            dict: Same structure as `detect_emotion`.
+        """
+        return await self.batcher.submit((text, top_n))
+
+    async def adetect_emotions(self, texts: list, top_n: int = 5):
+        """
+        Async variant of `detect_emotions`, batched together with other concurrent calls.
+        """
+        return list(await asyncio.gather(*(self.adetect_emotion(text, top_n) for text in texts)))
@@ -0,0 +1,109 @@
+# events.py
+
+import asyncio
+import json
+import threading
+
+# Events buffered per subscriber. A slow client only needs the newest team
+# state, so when its queue is full the oldest pending event is dropped.
+SUBSCRIBER_QUEUE_SIZE = 16
+
+
+class TeamEventBroker:
+    def __init__(self):
+        """
+        Initializes an in-process publish/subscribe hub for team state changes.
+        Each event is serialized once and fanned out to every subscriber of the team.
+        Publishing is thread-safe, so the sync pipeline can publish from worker threads.
+        """
+        self._lock = threading.Lock()
+        self._subscribers = {}   # team_name -> set of (loop, queue)
+        # team_name -> last published payload (JSON string), kept only while the team
+        # has subscribers so the dict does not grow with every team ever seen
+        self._last_events = {}
+
+    # ========================================================
+    #   SUBSCRIPTION FUNCTIONS
+    # ========================================================
+
+    def subscribe(self, team_name: str):
+        """
+        Registers a subscriber for a team. Must be called from the subscriber's event loop.
+
+        Args:
+            team_name (str): Name of the team.
+
+        Returns:
+            asyncio.Queue: Queue receiving the JSON payload of every change.
+        """
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(team_name, set()).add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, team_name: str, queue):
+        """
+        Removes a subscriber registered with `subscribe`.
+
+        Args:
+            team_name (str): Name of the team.
+            queue (asyncio.Queue): The subscriber's queue.
+        """
+        with self._lock:
+            subscribers = self._subscribers.get(team_name, set())
+            for entry in [entry for entry in subscribers if entry[1] is queue]:
+                subscribers.discard(entry)
+            if not subscribers:
+                self._subscribers.pop(team_name, None)
+                self._last_events.pop(team_name, None)
+
+    def subscriber_count(self, team_name: str = None) -> int:
+        """Returns the number of subscribers of a team, or of all teams."""
+        with self._lock:
+            if team_name is not None:
+                return len(self._subscribers.get(team_name, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    # ========================================================
+    #   PUBLISHING FUNCTIONS
+    # ========================================================
+
+    def publish(self, team_name: str, state: dict) -> bool:
+        """
+        Publishes a team's stage, distribution and feedback to its subscribers
+        if they changed since the last published event.
+
+        Args:
+            team_name (str): Name of the team.
+            state (dict): Contains distribution, final_stage and feedback.
+
+        Returns:
+            bool: True if an event was published; False if unchanged or the team has no subscribers.
+        """
+        payload = json.dumps({
+            "team_name": team_name,
+            "distribution": state.get("distribution", {}),
+            "final_stage": state.get("final_stage", "Uncertain"),
+            "feedback": state.get("feedback", "")
+        }, sort_keys=True)
+
+        with self._lock:
+            subscribers = list(self._subscribers.get(team_name, ()))
+            if not subscribers or self._last_events.get(team_name) == payload:
+                return False
+            self._last_events[team_name] = payload
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, payload)
+            except RuntimeError:
+                # The subscriber's loop is closed; it will never read again.
+                self.unsubscribe(team_name, queue)
+        return True
+
+    @staticmethod
+    def _offer(queue, payload: str):
+        """Puts a payload on a subscriber queue, dropping the oldest event if it is full."""
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(payload)
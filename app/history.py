@@ -0,0 +1,101 @@
+# history.py
+
+from datetime import timezone
+
+from sqlalchemy import func, select
+
+from app.db import Member, Message
+
+MAX_PAGE_SIZE = 1000
+
+# ========================================================
+#   KEYSET PAGINATION FUNCTIONS
+# ========================================================
+#
+# Pages are selected with `Message.id > after_id ORDER BY Message.id LIMIT n`,
+# which walks the (team_id, id) / (member_id, id) indexes directly. Unlike
+# OFFSET pagination, reading page 1000 costs the same as reading page 1.
+
+def _to_utc_naive(value):
+    """Converts an aware datetime to naive UTC, as stored in the database."""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def message_page_query(team_id: int, generation: int, member_id: int = None, role: str = None,
+                       since=None, until=None, after_id: int = 0, limit: int = 100):
+    """
+    Builds the query for one page of a team's (or member's) message history.
+
+    Args:
+        team_id (int): The ID of the team.
+        generation (int): The team generation to read.
+        member_id (int): Restrict to one member, if given.
+        role (str): Restrict to 'User' or 'Assistant' messages, if given.
+        since (datetime): Only messages created at or after this time.
+        until (datetime): Only messages created before this time.
+        after_id (int): Keyset cursor; only messages with a larger id are returned.
+        limit (int): Page size, capped at MAX_PAGE_SIZE.
+
+    Returns:
+        Select: A query yielding (Message, member name) rows ordered by id.
+    """
+    query = (
+        select(Message, Member.name)
+        .join(Member, Message.member_id == Member.id)
+        .where(Message.generation == generation, Message.id > after_id)
+    )
+    if member_id is not None:
+        query = query.where(Message.member_id == member_id)
+    else:
+        query = query.where(Message.team_id == team_id)
+    if role:
+        query = query.where(func.lower(Message.role) == role.lower())
+    if since is not None:
+        query = query.where(Message.created_at >= _to_utc_naive(since))
+    if until is not None:
+        query = query.where(Message.created_at < _to_utc_naive(until))
+    return query.order_by(Message.id).limit(max(1, min(limit, MAX_PAGE_SIZE)))
+
+
+def message_to_dict(msg, member_name: str) -> dict:
+    """
+    Serializes a message row for the history API.
+
+    Args:
+        msg (Message): The message instance.
+        member_name (str): Name of the member the message belongs to.
+
+    Returns:
+        dict: The message fields, including its stored emotion distribution.
+    """
+    return {
+        "id": msg.id,
+        "member_name": member_name,
+        "role": msg.role,
+        "text": msg.text,
+        "detected_emotion": msg.detected_emotion,
+        "stage_at_time": msg.stage_at_time,
+        "emotion_distribution": msg.load_top_emotion_distribution(),
+        "created_at": msg.created_at.isoformat() if msg.created_at else None
+    }
+
+
+def page_to_response(rows, limit: int) -> dict:
+    """
+    Builds the response of a page request, including the cursor of the next page.
+
+    Args:
+        rows (list): (Message, member name) rows of the page.
+        limit (int): Requested page size.
+
+    Returns:
+        dict: Contains messages and next_after_id (None on the last page).
+    """
+    messages = [message_to_dict(msg, member_name) for msg, member_name in rows]
+    full_page = len(messages) >= max(1, min(limit, MAX_PAGE_SIZE))
+    return {
+        "messages": messages,
+        "next_after_id": messages[-1]["id"] if messages and full_page else None
+    }
@@ -0,0 +1,75 @@
+# inference_client.py
+
+import os
+
+import httpx
+
+# Seconds to wait for the inference server, including time spent queued behind other batches
+EMOTION_SERVER_TIMEOUT = float(os.environ.get("EMOTION_SERVER_TIMEOUT", 60))
+
+
+class RemoteEmotionDetector:
+    def __init__(self, url: str, timeout: float = EMOTION_SERVER_TIMEOUT):
+        """
+        Initializes a client of the shared inference server (`app.inference_server`).
+        It exposes the same detection methods as EmotionDetector without loading the model.
+
+        Args:
+            url (str): Server URL, e.g. http://127.0.0.1:8001 or unix:///tmp/emotion.sock.
+            timeout (float): Request timeout in seconds.
+        """
+        if url.startswith("unix://"):
+            self._uds = url[len("unix://"):]
+            self._base_url = "http://inference"
+        else:
+            self._uds = None
+            self._base_url = url.rstrip("/")
+        self._timeout = timeout
+        self._client = httpx.Client(base_url=self._base_url, timeout=timeout,
+                                    transport=httpx.HTTPTransport(uds=self._uds))
+        self._async_client = None
+
+    def _get_async_client(self):
+        """Creates the async client on first use, inside the event loop that uses it."""
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(base_url=self._base_url, timeout=self._timeout,
+                                                   transport=httpx.AsyncHTTPTransport(uds=self._uds))
+        return self._async_client
+
+    # ========================================================
+    #   EMOTION DETECTION FUNCTIONS
+    # ========================================================
+
+    def detect_emotions(self, texts: list, top_n: int = 5):
+        """
+        Detects the top emotions of several texts on the inference server.
+
+        Returns:
+            list: One result per text, with the structure returned by `EmotionDetector.detect_emotion`.
+        """
+        response = self._client.post("/detect", json={"texts": texts, "top_n": top_n})
+        response.raise_for_status()
+        return response.json()["results"]
+
+    def detect_emotion(self, text: str, top_n: int = 5):
+        """
+        Detects the top emotions in the given text on the inference server.
+
+        Returns:
+            dict: Contains the dominant emotion, its confidence score, and a list of top emotions with scores.
+        """
+        return self.detect_emotions([text], top_n)[0]
+
+    async def adetect_emotions(self, texts: list, top_n: int = 5):
+        """
+        Async variant of `detect_emotions`.
+        """
+        response = await self._get_async_client().post("/detect", json={"texts": texts, "top_n": top_n})
+        response.raise_for_status()
+        return response.json()["results"]
+
+    async def adetect_emotion(self, text: str, top_n: int = 5):
+        """
+        Async variant of `detect_emotion`.
+        """
+        return (await self.adetect_emotions([text], top_n))[0]
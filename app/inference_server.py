@@ -0,0 +1,78 @@
+# inference_server.py
+
+import argparse
+import asyncio
+from typing import List
+
+import uvicorn
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+from app.emotion_analysis import EmotionDetector
+
+# ========================================================
+# SHARED INFERENCE SERVER
+# ========================================================
+#
+# Runs one EmotionDetector for all API workers, so N workers do not hold N
+# copies of the model. Workers reach it through `app.inference_client` when
+# EMOTION_SERVER_URL is set. Texts arriving within a short window, from any
+# worker, are merged into one batched pipeline call by the detector's
+# MicroBatcher (EMOTION_BATCH_WINDOW_MS, EMOTION_MAX_BATCH_SIZE).
+#
+#   python -m app.inference_server --uds /tmp/emotion.sock
+#   EMOTION_SERVER_URL=unix:///tmp/emotion.sock uvicorn app.main:app --workers 4
+
+
+class DetectRequest(BaseModel):
+    texts: List[str]
+    top_n: int = 5
+
+
+app = FastAPI()
+
+@app.on_event("startup")
+async def on_startup():
+    if getattr(app.state, "detector", None) is None:
+        app.state.detector = await asyncio.to_thread(EmotionDetector)
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    app.state.detector.batcher.close()
+
+@app.post("/detect")
+async def detect(req: DetectRequest):
+    """
+    Detects the top emotions of the given texts.
+
+    Args:
+        req (DetectRequest): Contains texts and top_n.
+
+    Returns:
+        dict: Contains results, one `detect_emotion` result per text.
+    """
+    results = await app.state.detector.adetect_emotions(req.texts, req.top_n)
+    return {"results": results}
+
+@app.get("/health")
+async def health():
+    """
+    Reports how many batches and texts the server has processed.
+    """
+    batcher = app.state.detector.batcher
+    return {"status": "ok", "batches": batcher.batches, "texts": batcher.items}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve emotion detection to the API workers.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--uds", default=None, help="Listen on this Unix socket instead of host/port.")
+    args = parser.parse_args()
+
+    # A single process: the point of the server is to hold one copy of the model
+    uvicorn.run(app, host=args.host, port=args.port, uds=args.uds, workers=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,35 @@
 # app/main.py
 
+import asyncio
+import hashlib
+import json
 import os
+from contextlib import asynccontextmanager
+from datetime import datetime
 from typing import List, Optional
 
-from fastapi import FastAPI, Depends, Query, UploadFile, File, HTTPException
+from fastapi import FastAPI, BackgroundTasks, Depends, Query, Request, Response, UploadFile, File, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import init_db, SessionLocal, Team, Member, Message
+from app.db import init_db, AsyncSessionLocal, Team, Member
 from app.chatbot_generative import ChatbotGenerative
+from app.events import TeamEventBroker
+from app.history import MAX_PAGE_SIZE, message_page_query, message_to_dict, page_to_response
+from app.metrics import DB_QUERIES, register_runtime_collector
+from app.profiling import ProfilingMiddleware, settings as profiling_settings
+from app.purge import apurge_old_generations, apurge_stale_generations, reset_team_generation
+from app.query_log import count_queries, slow_queries
+from app.retention import run_retention_once
+from app.scheduler import BULK, INTERACTIVE, AdmissionScheduler, Overloaded
+from app.state_cache import StateCache
+from app.stub_engines import create_stub_chatbot
+from app.tracing import TRACE_EXPORT, end_trace, export_trace, span, start_trace
 
 app = FastAPI()
 
@@ -22,29 +40,211 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Inside the tracing middleware below, so profiles are named after the trace id
+app.add_middleware(ProfilingMiddleware)
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """
+    Traces every request and returns its phase breakdown (relevance, emotion
+    inference, SQL, generation, ...) in the Server-Timing header and its
+    number of SQL statements in the X-DB-Queries header.
+    """
+    trace, token = start_trace(f"{request.method} {request.url.path}", request.headers.get("traceparent"))
+    try:
+        with count_queries() as queries:
+            response = await call_next(request)
+    finally:
+        end_trace(trace, token)
+    route = request.scope.get("route")
+    DB_QUERIES.labels(route.path if route is not None else "unmatched").observe(queries.count)
+    response.headers["X-DB-Queries"] = str(queries.count)
+    if trace is not None:
+        response.headers["Server-Timing"] = trace.server_timing()
+        response.headers["traceparent"] = trace.traceparent
+        if TRACE_EXPORT:
+            asyncio.get_running_loop().run_in_executor(None, export_trace, trace)
+    return response
 
 # ========================================================
 # DATABASE INITIALIZATION
 # ========================================================
 @app.on_event("startup")
-def on_startup():
-    init_db()
+async def on_startup():
+    await asyncio.to_thread(init_db)
+    # Finish purges interrupted by a previous shutdown, on the same sessions as the routes
+    session_factory = app.dependency_overrides.get(get_session_factory, get_session_factory)()
+    app.state.purge_task = asyncio.create_task(apurge_stale_generations(session_factory=session_factory))
+    interval = float(os.environ.get("RETENTION_INTERVAL_SECONDS", 0))
+    if interval > 0:
+        app.state.retention_task = asyncio.create_task(_run_retention_periodically(interval))
+    # Models load after the server binds; /readyz reports when they are warm
+    app.state.model_task = asyncio.create_task(_load_models())
+
+async def _load_models():
+    """
+    Builds the chatbot and runs one warm-up inference per model, so the first
+    request does not pay for loading weights. Routes needing the models answer
+    503 until this finishes.
+    """
+    global chatbot
+    try:
+        if ENGINES == "stub":
+            bot = create_stub_chatbot(state_cache=state_cache, event_broker=team_events,
+                                      llm_latency=STUB_LLM_LATENCY_MS / 1000, nli_latency=STUB_NLI_LATENCY_MS / 1000)
+        else:
+            bot = await asyncio.to_thread(ChatbotGenerative, state_cache=state_cache, event_broker=team_events)
+        await bot.emotion_detector.adetect_emotion("We are getting to know each other.")
+        await bot.model.ainvoke(input="Reply with OK.")
+        chatbot = bot
+        print("[startup] models ready")
+    except Exception as e:
+        app.state.model_error = str(e)
+        print(f"[ERROR loading models] {e}")
 
-def get_db():
+async def _run_retention_periodically(interval: float):
     """
-    Dependency that provides a database session.
+    Applies the retention policy from the environment every `interval` seconds.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            stats = await asyncio.to_thread(run_retention_once)
+            print(f"[retention] compacted {stats['messages']} messages")
+        except Exception as e:
+            print(f"[ERROR in retention] {e}")
+
+async def get_db():
+    """
+    Dependency that provides an async database session.
     Ensures the session is closed after use.
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+def get_session_factory():
+    """
+    Dependency that provides the async session factory, for work that outlives
+    the request's session (background purges, streamed responses).
+    """
+    return AsyncSessionLocal
+
+async def _find_team(db: AsyncSession, team_name: str):
+    """
+    Returns the team with the given name, or None.
+    """
+    result = await db.execute(select(Team).where(Team.name == team_name))
+    return result.scalars().first()
+
+async def _team_state(db: AsyncSession, team_name: str):
+    """
+    Returns the hot state of a team, served from the state cache when possible.
+
+    Returns:
+        dict or None: The team state, or None if the team does not exist.
+    """
+    team_id = state_cache.get_team_id(team_name)
+    if team_id is not None:
+        state = state_cache.get_team_state(team_id)
+        if state is not None:
+            return state
+
+    team = await _find_team(db, team_name)
+    if not team:
+        return None
+    state = team.snapshot_state()
+    state_cache.set_team_id(team_name, team.id)
+    state_cache.set_team_state(team.id, state)
+    return state
+
+async def _member_state(db: AsyncSession, team_name: str, member_name: str):
+    """
+    Returns the hot state of a member, served from the state cache when possible.
+
+    Raises:
+        HTTPException: 404 if the team or the member does not exist.
+    """
+    team_id = state_cache.get_team_id(team_name)
+    if team_id is None:
+        team = await _find_team(db, team_name)
+        if not team:
+            raise HTTPException(status_code=404, detail="Team not found.")
+        team_id = team.id
+        state_cache.set_team_id(team_name, team_id)
+
+    member_id = state_cache.get_member_id(team_id, member_name)
+    if member_id is not None:
+        state = state_cache.get_member_state(member_id)
+        if state is not None:
+            return state
+
+    result = await db.execute(select(Member, Team.generation, Team.version).join(Member.team).where(
+        Member.team_id == team_id,
+        Member.name == member_name
+    ))
+    row = result.first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Member not found in this team.")
+
+    member, team_generation, team_version = row
+    state = member.snapshot_state(team_generation, team_version)
+    state_cache.set_member_id(team_id, member_name, member.id)
+    state_cache.set_member_state(member.id, state)
+    return state
 
 static_path = os.path.join(os.path.dirname(__file__), "..")
 app.mount("/static", StaticFiles(directory=static_path), name="static")
 
-chatbot = ChatbotGenerative()
+state_cache = StateCache()
+team_events = TeamEventBroker()
+# "stub" replaces the models with app/stub_engines.py, e.g. for load tests of the
+# server itself; the STUB_*_LATENCY_MS variables simulate the time of a model call
+ENGINES = os.environ.get("ENGINES", "live")
+STUB_LLM_LATENCY_MS = float(os.environ.get("STUB_LLM_LATENCY_MS", 0))
+STUB_NLI_LATENCY_MS = float(os.environ.get("STUB_NLI_LATENCY_MS", 0))
+
+# Built in the background after startup, see _load_models
+chatbot = None
+app.state.model_error = None
+
+scheduler = AdmissionScheduler()
+
+register_runtime_collector(
+    state_cache, scheduler,
+    emotion_batcher=lambda: getattr(getattr(chatbot, "emotion_detector", None), "batcher", None)
+)
+
+@asynccontextmanager
+async def _admitted(lane: str):
+    """
+    Runs the enclosed work in a scheduler slot of the given lane.
+
+    Raises:
+        HTTPException: 429 with Retry-After if the lane's queue is full.
+    """
+    try:
+        with span("queue", lane=lane):
+            ticket = await scheduler.acquire(lane)
+    except Overloaded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    try:
+        yield
+    finally:
+        scheduler.release(ticket)
+
+def get_chatbot():
+    """
+    Dependency that provides the chatbot once its models are warm.
+
+    Raises:
+        HTTPException: 503 while the models are loading or if loading failed.
+    """
+    if chatbot is None:
+        raise HTTPException(status_code=503, detail="Models are not ready yet.", headers={"Retry-After": "5"})
+    return chatbot
+
+# Seconds without events after which an SSE comment is sent to keep proxies from closing the stream
+SSE_KEEPALIVE_SECONDS = float(os.environ.get("SSE_KEEPALIVE_SECONDS", 15))
 
 class AnalyzeRequest(BaseModel):
     team_name: str
@@ -56,6 +256,27 @@ class ChatRequest(BaseModel):
     team_name: str
     member_name: str
 
+class ProfilingUpdate(BaseModel):
+    sample_rate: Optional[float] = None
+    next_requests: Optional[int] = None
+    paths: Optional[List[str]] = None
+    interval_ms: Optional[float] = None
+    analysis_runs: Optional[bool] = None
+    torch_batches: Optional[int] = None
+
+# Token required by the /admin endpoints; they are disabled when unset
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+def require_admin(request: Request):
+    """
+    Dependency guarding the /admin endpoints with the X-Admin-Token header.
+
+    Raises:
+        HTTPException: 403 if ADMIN_TOKEN is unset or the header does not match.
+    """
+    if not ADMIN_TOKEN or request.headers.get("X-Admin-Token") != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints require a valid X-Admin-Token.")
+
 # ========================================================
 # ROUTES
 # ========================================================
@@ -73,92 +294,350 @@ def root_page():
     else:
         return HTMLResponse(content="<h1>index.html not found</h1>", status_code=404)
 
+@app.get("/healthz")
+async def healthz():
+    """
+    Liveness probe: the process is up and serving requests.
+    """
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """
+    Readiness probe: answers 200 once the models are loaded and warm, 503 before.
+    """
+    if chatbot is not None:
+        return {"status": "ready"}
+    if app.state.model_error:
+        return JSONResponse(status_code=503, content={"status": "failed", "error": app.state.model_error})
+    return JSONResponse(status_code=503, content={"status": "loading"})
+
+@app.get("/scheduler")
+async def get_scheduler_stats():
+    """
+    Reports, per lane (interactive, bulk), running and queued requests,
+    rejections and queue wait times.
+    """
+    return scheduler.stats()
+
+@app.get("/admin/profiling", dependencies=[Depends(require_admin)])
+async def get_profiling():
+    """
+    Returns the current profiling settings.
+    """
+    return profiling_settings.as_dict()
+
+@app.post("/admin/profiling", dependencies=[Depends(require_admin)])
+async def update_profiling(update: ProfilingUpdate):
+    """
+    Changes profiling at runtime, e.g. {"next_requests": 5} profiles the next
+    five selected requests and {"torch_batches": 3} records the next three
+    emotion model calls with torch.profiler.
+
+    Returns:
+        dict: The new profiling settings.
+    """
+    if update.sample_rate is not None and not 0 <= update.sample_rate <= 1:
+        raise HTTPException(status_code=422, detail="sample_rate must be between 0 and 1.")
+    if update.interval_ms is not None and update.interval_ms <= 0:
+        raise HTTPException(status_code=422, detail="interval_ms must be positive.")
+    profiling_settings.update(**update.model_dump())
+    return profiling_settings.as_dict()
+
+@app.get("/admin/slow-queries", dependencies=[Depends(require_admin)])
+async def get_slow_queries():
+    """
+    Returns the most recent statements slower than SLOW_QUERY_MS, newest first,
+    with their query plans.
+    """
+    return list(reversed(slow_queries))
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Prometheus metrics: per-step latency histograms, relevance decisions,
+    feedback triggers, cache hits and scheduler and batcher queue depths.
+    """
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 @app.get("/teaminfo")
-def get_team_info(team_name: str = Query(...), db: Session = Depends(get_db)):
+async def get_team_info(request: Request, response: Response, team_name: str = Query(...),
+                        db: AsyncSession = Depends(get_db)):
     """
     Retrieves team information, including stage distribution and feedback.
+    Supports conditional requests: the ETag changes whenever the team or one of its members changes.
 
     Args:
+        request (Request): The HTTP request, checked for If-None-Match.
+        response (Response): The HTTP response, receiving the ETag.
         team_name (str): The name of the team.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
 
     Returns:
-        dict: Contains distribution, final_stage, and feedback.
+        dict: Contains distribution, final_stage, feedback and version (or a 304 response).
     """
-    team = db.query(Team).filter(Team.name == team_name).first()
-    if not team:
+    state = await _team_state(db, team_name)
+    if state is None:
         team = Team(name=team_name, current_stage="Uncertain", feedback="")
         db.add(team)
-        db.commit()
-        db.refresh(team)
-        return {"distribution": {}, "final_stage": "Uncertain", "feedback": ""}
+        await db.commit()
+        state = {"distribution": {}, "final_stage": "Uncertain", "feedback": "", "version": 0}
 
-    distribution = team.load_team_distribution()
-    final_stage = team.current_stage
-    feedback = team.feedback if team.feedback else ""
+    return _conditional_response(request, response, state)
 
-    return {
-        "distribution": distribution,
-        "final_stage": final_stage,
-        "feedback": feedback
-    }
+@app.get("/teams/summary")
+async def get_teams_summary(request: Request, response: Response, team_names: List[str] = Query(...),
+                            db: AsyncSession = Depends(get_db)):
+    """
+    Retrieves the state of many teams with a single query, e.g. for dashboards.
+
+    Args:
+        request (Request): The HTTP request, checked for If-None-Match.
+        response (Response): The HTTP response, receiving the ETag.
+        team_names (List[str]): Names of the teams (repeat the query parameter).
+        db (AsyncSession): Database session.
+
+    Returns:
+        dict: Maps each existing team name to its distribution, final_stage, feedback and version.
+    """
+    result = await db.execute(select(Team).where(Team.name.in_(team_names)).order_by(Team.name))
+    teams = {team.name: team.snapshot_state() for team in result.scalars()}
+
+    # The combined ETag changes whenever any listed team changes or appears. Team names
+    # may contain any character, so the (name, version) pairs are hashed.
+    pairs = json.dumps([[name, state["version"]] for name, state in teams.items()])
+    etag = '"' + hashlib.sha256(pairs.encode("utf-8")).hexdigest()[:32] + '"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return {"teams": teams}
 
 @app.get("/memberinfo")
-def get_member_info(team_name: str = Query(...), member_name: str = Query(...), db: Session = Depends(get_db)):
+async def get_member_info(request: Request, response: Response, team_name: str = Query(...),
+                          member_name: str = Query(...), db: AsyncSession = Depends(get_db)):
     """
     Retrieves member information, including stage distribution and personal feedback.
+    Supports conditional requests with ETags derived from the team's change counter.
 
     Args:
+        request (Request): The HTTP request, checked for If-None-Match.
+        response (Response): The HTTP response, receiving the ETag.
         team_name (str): The name of the team.
         member_name (str): The name of the member.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
+
+    Returns:
+        dict: Contains distribution, final_stage, accum_emotions, personal_feedback and version (or a 304 response).
+    """
+    state = await _member_state(db, team_name, member_name)
+    return _conditional_response(request, response, state)
+
+@app.get("/teams/{team_name}/events")
+async def stream_team_events(request: Request, team_name: str, db: AsyncSession = Depends(get_db)):
+    """
+    Pushes a team's stage, distribution and feedback as Server-Sent Events.
+    The current state is sent first, then one `team` event per change, so
+    clients no longer need to poll /teaminfo.
+
+    Args:
+        request (Request): The HTTP request, checked for client disconnects.
+        team_name (str): The name of the team.
+        db (AsyncSession): Database session.
+
+    Returns:
+        StreamingResponse: A text/event-stream of team states.
+    """
+    # Subscribe before reading the current state so no change is missed in between
+    queue = team_events.subscribe(team_name)
+    try:
+        state = await _team_state(db, team_name)
+    except Exception:
+        team_events.unsubscribe(team_name, queue)
+        raise
+    if state is None:
+        team_events.unsubscribe(team_name, queue)
+        raise HTTPException(status_code=404, detail="Team not found.")
+
+    initial = json.dumps({
+        "team_name": team_name,
+        "distribution": state["distribution"],
+        "final_stage": state["final_stage"],
+        "feedback": state["feedback"]
+    }, sort_keys=True)
+
+    async def events():
+        try:
+            yield f"event: team\ndata: {initial}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    payload = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: team\ndata: {payload}\n\n"
+        finally:
+            team_events.unsubscribe(team_name, queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+def _etag(state: dict) -> str:
+    """Returns the ETag of a team or member state, derived from the team's change counter."""
+    return f'"v{state.get("version", 0)}"'
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """Returns True if the request's If-None-Match header matches the ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+def _conditional_response(request: Request, response: Response, state: dict):
+    """
+    Answers 304 Not Modified if the client already has the current state,
+    otherwise returns the state with its ETag. `no-cache` makes browsers
+    revalidate every poll instead of reusing a stale copy.
+    """
+    etag = _etag(state)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return state
+
+async def _history_scope(db: AsyncSession, team_name: str, member_name: Optional[str]):
+    """
+    Resolves the team (and optional member) a history request reads.
 
     Returns:
-        dict: Contains distribution, final_stage, accum_emotions, and personal_feedback.
+        tuple: (team_id, generation, member_id or None).
+
+    Raises:
+        HTTPException: 404 if the team or the member does not exist.
     """
-    team = db.query(Team).filter(Team.name == team_name).first()
+    team = await _find_team(db, team_name)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found.")
 
-    member = db.query(Member).filter(
-        Member.team_id == team.id,
-        Member.name == member_name
-    ).first()
+    member_id = None
+    if member_name:
+        result = await db.execute(select(Member.id).where(
+            Member.team_id == team.id,
+            Member.name == member_name
+        ))
+        member_id = result.scalar()
+        if member_id is None:
+            raise HTTPException(status_code=404, detail="Member not found in this team.")
+    return team.id, team.generation, member_id
+
+@app.get("/messages")
+async def get_messages(
+    team_name: str = Query(...),
+    member_name: Optional[str] = Query(None),
+    role: Optional[str] = Query(None),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Returns one page of a team's or member's message history (keyset pagination on the message id).
 
-    if not member:
-        raise HTTPException(status_code=404, detail="Member not found in this team.")
+    Args:
+        team_name (str): The name of the team.
+        member_name (str): Restrict to one member, if given.
+        role (str): Restrict to 'User' or 'Assistant' messages, if given.
+        since (datetime): Only messages created at or after this time.
+        until (datetime): Only messages created before this time.
+        after_id (int): Cursor returned as next_after_id by the previous page.
+        limit (int): Page size.
+        db (AsyncSession): Database session.
 
-    personal_dist = member.load_accum_distrib()
-    personal_stage = member.current_stage
-    personal_emotions = member.load_accum_emotions()
-    personal_feedback = member.personal_feedback if member.personal_feedback else ""
+    Returns:
+        dict: Contains messages (with their emotion distributions) and next_after_id.
+    """
+    team_id, generation, member_id = await _history_scope(db, team_name, member_name)
+    result = await db.execute(message_page_query(
+        team_id, generation, member_id, role, since, until, after_id, limit
+    ))
+    return page_to_response(result.all(), limit)
+
+@app.get("/messages/stream")
+async def stream_messages(
+    team_name: str = Query(...),
+    member_name: Optional[str] = Query(None),
+    role: Optional[str] = Query(None),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+    after_id: int = Query(0, ge=0),
+    page_size: int = Query(500, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+    session_factory=Depends(get_session_factory)
+):
+    """
+    Streams a whole message history as newline-delimited JSON.
+    Rows are read page by page, so memory stays bounded by `page_size`.
 
-    return {
-        "distribution": personal_dist,
-        "final_stage": personal_stage,
-        "accum_emotions": personal_emotions,
-        "personal_feedback": personal_feedback
-    }
+    Args:
+        team_name (str): The name of the team.
+        member_name (str): Restrict to one member, if given.
+        role (str): Restrict to 'User' or 'Assistant' messages, if given.
+        since (datetime): Only messages created at or after this time.
+        until (datetime): Only messages created before this time.
+        after_id (int): Start after this message id.
+        page_size (int): Rows fetched per query.
+        db (AsyncSession): Database session.
+        session_factory (async_sessionmaker): Opens the stream's own session.
+
+    Returns:
+        StreamingResponse: One JSON message per line.
+    """
+    team_id, generation, member_id = await _history_scope(db, team_name, member_name)
+
+    async def generate():
+        cursor = after_id
+        # The request session is closed once the response starts; the stream uses its own.
+        async with session_factory() as stream_db:
+            while True:
+                result = await stream_db.execute(message_page_query(
+                    team_id, generation, member_id, role, since, until, cursor, page_size
+                ))
+                rows = result.all()
+                for msg, member_name_row in rows:
+                    yield json.dumps(message_to_dict(msg, member_name_row)) + "\n"
+                if len(rows) < page_size:
+                    return
+                cursor = rows[-1][0].id
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
 @app.post("/chat")
-def chat_with_bot(req: ChatRequest, db: Session = Depends(get_db)):
+async def chat_with_bot(req: ChatRequest, db: AsyncSession = Depends(get_db),
+                        chatbot: ChatbotGenerative = Depends(get_chatbot)):
     """
     Handles chat messages sent by users in Conversation Mode.
 
     Args:
         req (ChatRequest): The chat request containing text, team_name, and member_name.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
+        chatbot (ChatbotGenerative): The chatbot with warm models.
 
     Returns:
         dict: Contains bot_message, stage information, and emotions data.
     """
-    bot_msg, final_stage, feedback, accum_dist, last_emotion_dist, accum_emotions, personal_feedback = chatbot.process_line(
-        db, req.team_name, req.member_name, req.text
-    )
+    async with _admitted(INTERACTIVE):
+        bot_msg, final_stage, feedback, accum_dist, last_emotion_dist, accum_emotions, personal_feedback = await chatbot.aprocess_line(
+            db, req.team_name, req.member_name, req.text
+        )
 
-    the_team = db.query(Team).filter(Team.name == req.team_name).first()
-    team_distribution = the_team.load_team_distribution()
-    team_feedback = the_team.feedback
+    team_state = await _team_state(db, req.team_name)
+    team_distribution = team_state["distribution"]
+    team_feedback = team_state["feedback"]
 
     return {
         "bot_message": bot_msg,
@@ -172,25 +651,28 @@ def chat_with_bot(req: ChatRequest, db: Session = Depends(get_db)):
     }
 
 @app.post("/analyze")
-def analyze_conversation(req: AnalyzeRequest, db: Session = Depends(get_db)):
+async def analyze_conversation(req: AnalyzeRequest, db: AsyncSession = Depends(get_db),
+                               chatbot: ChatbotGenerative = Depends(get_chatbot)):
     """
     Analyzes a bulk conversation input in Analysis Mode.
 
     Args:
         req (AnalyzeRequest): The analysis request containing team_name, member_name, and lines of conversation.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
+        chatbot (ChatbotGenerative): The chatbot with warm models.
 
     Returns:
         dict: Contains final_stage, feedback, distribution, and team_feedback.
     """
-    try:
-        final_stage, feedback, _ = chatbot.analyze_conversation_db(
-            db, req.team_name, req.lines
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error analyzing conversation: {str(e)}")
-
-    the_team = db.query(Team).filter(Team.name == req.team_name).first()
+    async with _admitted(BULK):
+        try:
+            final_stage, feedback, _ = await chatbot.aanalyze_conversation_db(
+                db, req.team_name, req.lines
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error analyzing conversation: {str(e)}")
+
+    the_team = await _find_team(db, req.team_name)
     if not the_team:
         raise HTTPException(status_code=404, detail="Team not found.")
 
@@ -208,7 +690,8 @@ def analyze_conversation(req: AnalyzeRequest, db: Session = Depends(get_db)):
 async def analyze_file(
     team_name: str = Query(...),
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    chatbot: ChatbotGenerative = Depends(get_chatbot)
 ):
     """
     Analyzes a chat log file uploaded by the user.
@@ -216,7 +699,8 @@ async def analyze_file(
     Args:
         team_name (str): The name of the team.
         file (UploadFile): The uploaded text file containing the chat log.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
+        chatbot (ChatbotGenerative): The chatbot with warm models.
 
     Returns:
         dict: Contains final_stage, feedback, and distribution.
@@ -231,12 +715,13 @@ async def analyze_file(
 
     lines = file_contents.splitlines()
 
-    try:
-        final_stage, feedback, distribution = chatbot.analyze_conversation_db(
-            db, team_name, lines
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error analyzing conversation: {str(e)}")
+    async with _admitted(BULK):
+        try:
+            final_stage, feedback, distribution = await chatbot.aanalyze_conversation_db(
+                db, team_name, lines
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error analyzing conversation: {str(e)}")
 
     return {
         "final_stage": final_stage,
@@ -245,30 +730,26 @@ async def analyze_file(
     }
 
 @app.post("/reset")
-def reset_team(req: ChatRequest, db: Session = Depends(get_db)):
+async def reset_team(req: ChatRequest, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db),
+                     session_factory=Depends(get_session_factory)):
     """
     Resets a team's stage and clears all associated member data.
+    Returns as soon as the team's generation is incremented; the old messages
+    are deleted in batches in the background.
 
     Args:
         req (ChatRequest): The reset request containing team_name.
-        db (Session): Database session.
+        background_tasks (BackgroundTasks): Tasks run after the response is sent.
+        db (AsyncSession): Database session.
+        session_factory (async_sessionmaker): Opens the background purge's session.
 
     Returns:
         dict: Confirmation message about the reset action.
     """
-    team = db.query(Team).filter(Team.name == req.team_name).first()
-    if team:
-        team.current_stage = "Uncertain"
-        team.feedback = ""  # Clear team feedback
-        for member in team.members:
-            member.current_stage = "Uncertain"
-            member.save_accum_distrib({})
-            member.num_lines = 0
-            member.save_accum_emotions({})
-            member.personal_feedback = ""  # Clear personal feedback
-            db.query(Message).filter(Message.member_id == member.id).delete()
-            db.commit()
-        db.commit()
+    # Database only, so resets work while the models are still loading
+    reset = await db.run_sync(reset_team_generation, req.team_name, team_events)
+    if reset:
+        background_tasks.add_task(apurge_old_generations, *reset, session_factory=session_factory)
 
     return {"message": f"Team '{req.team_name}' has been reset."}
 
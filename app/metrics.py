@@ -0,0 +1,145 @@
+# metrics.py
+
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, REGISTRY
+
+from app.tracing import span
+
+# ========================================================
+# PROMETHEUS METRICS
+# ========================================================
+#
+# Served by GET /metrics. Per-step latencies share one histogram labelled by
+# step: relevance, emotion_inference, db (summed over one process_line),
+# chat_generation, team_feedback and personal_feedback.
+
+# Model calls take from milliseconds (cached NLI batches) to tens of seconds (Ollama)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+STEP_SECONDS = Histogram(
+    "chatbot_step_seconds", "Time spent in each step of processing a line.",
+    ["step"], buckets=LATENCY_BUCKETS
+)
+RELEVANCE_DECISIONS = Counter(
+    "chatbot_relevance_decisions_total", "Messages classified as Valuable or Skip.", ["decision"]
+)
+FEEDBACK_TRIGGERS = Counter(
+    "chatbot_feedback_triggers_total", "Lines that triggered personal and team feedback generation."
+)
+SCHEDULER_WAIT_SECONDS = Histogram(
+    "scheduler_wait_seconds", "Time requests waited for an admission slot.",
+    ["lane"], buckets=LATENCY_BUCKETS
+)
+DB_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements run per request.",
+    ["route"], buckets=(1, 2, 5, 10, 20, 50, 100, 200)
+)
+EMOTION_BATCH_SIZE = Histogram(
+    "emotion_batch_size", "Number of texts per batched emotion detection.",
+    buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+
+
+@contextmanager
+def measure(step: str):
+    """
+    Observes the duration of the enclosed block in STEP_SECONDS and records it
+    as a span of the current request trace.
+
+    Args:
+        step (str): Value of the `step` label and name of the span.
+    """
+    start = time.perf_counter()
+    try:
+        with span(step):
+            yield
+    finally:
+        STEP_SECONDS.labels(step).observe(time.perf_counter() - start)
+
+
+def timed(step: str):
+    """
+    Decorator running a sync or async function inside `measure(step)`.
+
+    Args:
+        step (str): Value of the `step` label.
+    """
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with measure(step):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with measure(step):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class Stopwatch:
+    def __init__(self):
+        """Accumulates the time spent inside `with` blocks, e.g. the database steps of one line."""
+        self.total = 0.0
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.total += time.perf_counter() - self._start
+        return False
+
+
+class RuntimeCollector:
+    def __init__(self, state_cache, scheduler, emotion_batcher=None):
+        """
+        Exposes counters and queue depths kept by the application objects at scrape time.
+
+        Args:
+            state_cache (StateCache): Source of cache hit and miss counts.
+            scheduler (AdmissionScheduler): Source of per-lane running and queued requests.
+            emotion_batcher (callable): Returns the MicroBatcher of the emotion detector, or None.
+        """
+        self.state_cache = state_cache
+        self.scheduler = scheduler
+        self.emotion_batcher = emotion_batcher
+
+    def collect(self):
+        cache = CounterMetricFamily("state_cache_requests", "State cache lookups.", labels=["result"])
+        cache.add_metric(["hit"], self.state_cache.hits)
+        cache.add_metric(["miss"], self.state_cache.misses)
+        yield cache
+
+        stats = self.scheduler.stats()
+        queued = GaugeMetricFamily("scheduler_queued_requests", "Requests waiting for a slot.", labels=["lane"])
+        running = GaugeMetricFamily("scheduler_running_requests", "Requests holding a slot.", labels=["lane"])
+        rejected = CounterMetricFamily("scheduler_rejected_requests", "Requests rejected with 429.", labels=["lane"])
+        for lane, lane_stats in stats.items():
+            queued.add_metric([lane], lane_stats["queued"])
+            running.add_metric([lane], lane_stats["running"])
+            rejected.add_metric([lane], lane_stats["rejected"])
+        yield queued
+        yield running
+        yield rejected
+
+        batcher = self.emotion_batcher() if self.emotion_batcher else None
+        if batcher is not None:
+            yield GaugeMetricFamily("emotion_batcher_queued_texts", "Texts waiting for the next emotion batch.",
+                                    value=batcher.pending)
+
+
+def register_runtime_collector(state_cache, scheduler, emotion_batcher=None):
+    """Registers a RuntimeCollector with the default Prometheus registry and returns it."""
+    collector = RuntimeCollector(state_cache, scheduler, emotion_batcher)
+    REGISTRY.register(collector)
+    return collector
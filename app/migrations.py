@@ -0,0 +1,269 @@
+# migrations.py
+
+import json
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, inspect, select, text
+
+# ========================================================
+# MIGRATION REGISTRY
+# ========================================================
+#
+# Each migration is registered with a strictly increasing version number.
+# Migrations are applied in order, each one in its own transaction, and the
+# applied version is recorded in the `schema_version` table. Migrations must be
+# idempotent: fresh databases are created by `create_all` with the latest schema
+# and still run through the full list once.
+
+MIGRATIONS = []
+
+schema_meta = MetaData()
+schema_version = Table(
+    "schema_version",
+    schema_meta,
+    Column("version", Integer, primary_key=True),
+    Column("description", String),
+)
+
+
+def migration(version: int, description: str):
+    """
+    Registers a migration function under the given version.
+
+    Args:
+        version (int): The schema version the migration brings the database to.
+        description (str): Short human-readable description of the migration.
+
+    Returns:
+        function: Decorator registering the wrapped function.
+    """
+    def decorator(fn):
+        if MIGRATIONS and MIGRATIONS[-1][0] >= version:
+            raise ValueError(f"Migration {version} registered out of order.")
+        MIGRATIONS.append((version, description, fn))
+        return fn
+    return decorator
+
+# ========================================================
+# HELPERS
+# ========================================================
+
+def _column_names(conn, table_name: str):
+    """Returns the set of column names of a table."""
+    return {col["name"] for col in inspect(conn).get_columns(table_name)}
+
+
+def _index_names(conn, table_name: str):
+    """Returns the set of index names of a table."""
+    return {idx["name"] for idx in inspect(conn).get_indexes(table_name)}
+
+
+def _create_model_index(conn, table, index_name: str):
+    """
+    Creates an index declared on a model table, unless it already exists.
+
+    Args:
+        conn (Connection): Active database connection.
+        table (Table): The SQLAlchemy table the index is declared on.
+        index_name (str): Name of the declared index.
+    """
+    if index_name in _index_names(conn, table.name):
+        return
+    for idx in table.indexes:
+        if idx.name == index_name:
+            idx.create(conn)
+            return
+    raise LookupError(f"Index {index_name} is not declared on table {table.name}.")
+
+
+def _parse_json_dict(raw) -> dict:
+    """Parses a JSON object column; anything else counts as empty."""
+    try:
+        value = json.loads(raw) if raw else {}
+    except ValueError:
+        return {}
+    return value if isinstance(value, dict) else {}
+
+
+def _weighted_average(dists: list, weights: list) -> dict:
+    """Averages distributions with the given weights and normalizes the result to sum to 1."""
+    merged = {}
+    for dist, weight in zip(dists, weights):
+        for label, value in dist.items():
+            merged[label] = merged.get(label, 0.0) + weight * value
+    total = sum(merged.values())
+    return {label: value / total for label, value in merged.items()} if total > 0 else {}
+
+
+def _merge_member_state(rows: list) -> dict:
+    """
+    Combines the accumulated state of duplicate member rows into one.
+
+    Line counts are added up. Accumulated emotions are normalized after every
+    line, so the rows' emotions and stage distributions are averaged, weighted
+    by their line counts. The current stage follows the merged distribution
+    under the same rule as in ChatbotGenerative._apply_emotions.
+
+    Args:
+        rows (list): (num_lines, accum_emotions, accum_distribution, current_stage,
+                     personal_feedback) of every duplicate, the kept row first.
+
+    Returns:
+        dict: The merged column values.
+    """
+    weights = [num_lines or 0 for num_lines, *_ in rows]
+    num_lines = sum(weights)
+    kept_stage = rows[0][3]
+    merged = {
+        "num_lines": num_lines,
+        "accum_emotions": rows[0][1],
+        "accum_distribution": rows[0][2],
+        "current_stage": kept_stage,
+        # The kept row's feedback, or the first duplicate that has any
+        "personal_feedback": next((row[4] for row in rows if row[4]), rows[0][4]),
+    }
+    if num_lines == 0:
+        return merged
+
+    emotions = _weighted_average([_parse_json_dict(row[1]) for row in rows], weights)
+    distribution = _weighted_average([_parse_json_dict(row[2]) for row in rows], weights)
+    merged["accum_emotions"] = json.dumps(emotions)
+    merged["accum_distribution"] = json.dumps(distribution)
+    if distribution and num_lines >= 3:
+        best_stage = max(distribution, key=distribution.get)
+        if distribution[best_stage] > 0.5:
+            merged["current_stage"] = best_stage
+    return merged
+
+# ========================================================
+# MIGRATIONS
+# ========================================================
+
+@migration(1, "Add denormalized team_id to messages")
+def _add_message_team_id(conn):
+    if "team_id" not in _column_names(conn, "messages"):
+        conn.execute(text("ALTER TABLE messages ADD COLUMN team_id INTEGER REFERENCES teams(id)"))
+    conn.execute(text(
+        "UPDATE messages SET team_id = "
+        "(SELECT members.team_id FROM members WHERE members.id = messages.member_id) "
+        "WHERE team_id IS NULL"
+    ))
+
+
+@migration(2, "Unique index on members(team_id, name)")
+def _unique_member_per_team(conn):
+    from app.db import Member
+
+    # Older databases may contain duplicated members created by concurrent
+    # requests. Keep the oldest row, merge the state of the duplicates into it
+    # and move their messages to it.
+    duplicates = conn.execute(text(
+        "SELECT team_id, name, MIN(id) FROM members "
+        "GROUP BY team_id, name HAVING COUNT(*) > 1"
+    )).all()
+    for team_id, name, keep_id in duplicates:
+        rows = conn.execute(
+            text(
+                "SELECT num_lines, accum_emotions, accum_distribution, current_stage, personal_feedback "
+                "FROM members WHERE team_id = :team_id AND name = :name ORDER BY id"
+            ),
+            {"team_id": team_id, "name": name},
+        ).all()
+        conn.execute(
+            text(
+                "UPDATE members SET num_lines = :num_lines, accum_emotions = :accum_emotions, "
+                "accum_distribution = :accum_distribution, current_stage = :current_stage, "
+                "personal_feedback = :personal_feedback WHERE id = :keep_id"
+            ),
+            {"keep_id": keep_id, **_merge_member_state([tuple(row) for row in rows])},
+        )
+        conn.execute(
+            text(
+                "UPDATE messages SET member_id = :keep_id WHERE member_id IN "
+                "(SELECT id FROM members WHERE team_id = :team_id AND name = :name AND id != :keep_id)"
+            ),
+            {"keep_id": keep_id, "team_id": team_id, "name": name},
+        )
+        conn.execute(
+            text("DELETE FROM members WHERE team_id = :team_id AND name = :name AND id != :keep_id"),
+            {"keep_id": keep_id, "team_id": team_id, "name": name},
+        )
+
+    _create_model_index(conn, Member.__table__, "ix_members_team_id_name")
+
+
+@migration(3, "Indexes on messages(member_id, id) and messages(team_id, id)")
+def _message_lookup_indexes(conn):
+    from app.db import Message
+
+    _create_model_index(conn, Message.__table__, "ix_messages_member_id_id")
+    _create_model_index(conn, Message.__table__, "ix_messages_team_id_id")
+
+@migration(4, "Generation counters on teams, members and messages")
+def _add_generations(conn):
+    from app.db import Message
+
+    for table_name in ("teams", "members", "messages"):
+        if "generation" not in _column_names(conn, table_name):
+            conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN generation INTEGER NOT NULL DEFAULT 0"))
+    _create_model_index(conn, Message.__table__, "ix_messages_team_id_generation")
+
+@migration(5, "Creation time on messages for retention")
+def _add_message_created_at(conn):
+    if "created_at" not in _column_names(conn, "messages"):
+        conn.execute(text("ALTER TABLE messages ADD COLUMN created_at TIMESTAMP"))
+    # Age of legacy rows is unknown; retention counts it from the upgrade.
+    conn.execute(text("UPDATE messages SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL"))
+
+@migration(6, "Change counter on teams")
+def _add_team_version(conn):
+    if "version" not in _column_names(conn, "teams"):
+        conn.execute(text("ALTER TABLE teams ADD COLUMN version INTEGER NOT NULL DEFAULT 0"))
+
+@migration(7, "Feedback counter on members")
+def _add_member_lines_since_final_stage(conn):
+    if "lines_since_final_stage" not in _column_names(conn, "members"):
+        conn.execute(text("ALTER TABLE members ADD COLUMN lines_since_final_stage INTEGER NOT NULL DEFAULT 0"))
+
+# ========================================================
+# MIGRATION RUNNER
+# ========================================================
+
+def current_version(engine) -> int:
+    """
+    Returns the schema version recorded in the database.
+
+    Args:
+        engine (Engine): The database engine.
+
+    Returns:
+        int: The latest applied migration version, 0 if none was applied.
+    """
+    with engine.connect() as conn:
+        if not inspect(conn).has_table("schema_version"):
+            return 0
+        versions = conn.execute(select(schema_version.c.version)).scalars().all()
+        return max(versions, default=0)
+
+
+def run_migrations(engine) -> list:
+    """
+    Applies all pending migrations to the database.
+
+    Args:
+        engine (Engine): The database engine.
+
+    Returns:
+        list: Versions of the migrations applied during this call.
+    """
+    schema_meta.create_all(bind=engine)
+    applied_version = current_version(engine)
+
+    applied = []
+    for version, description, fn in MIGRATIONS:
+        if version <= applied_version:
+            continue
+        with engine.begin() as conn:
+            fn(conn)
+            conn.execute(schema_version.insert().values(version=version, description=description))
+        applied.append(version)
+    return applied
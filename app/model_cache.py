@@ -0,0 +1,147 @@
+# model_cache.py
+
+import argparse
+import json
+import mmap
+import os
+import struct
+
+# ========================================================
+# LOCAL MODEL CACHE
+# ========================================================
+#
+# `python -m app.model_cache export` saves bart-large-mnli and its tokenizer
+# to EMOTION_MODEL_DIR with the weights in a single safetensors file.
+# EmotionDetector then loads from that directory without network access.
+#
+# The weights are not copied into the model: the safetensors file is memory-
+# mapped copy-on-write and the model's parameters are views of the mapping.
+# The pages come from the OS page cache, so every worker process loading the
+# same file shares one copy of the weights; a worker only gets private pages
+# for weights it writes to, which inference never does. Measure the memory
+# per worker with benchmarks/bench_model_load.py.
+
+EMOTION_MODEL = "facebook/bart-large-mnli"
+EMOTION_MODEL_DIR = os.environ.get("EMOTION_MODEL_DIR", "./models/bart-large-mnli")
+WEIGHTS_FILE = "model.safetensors"
+
+# safetensors dtype codes -> torch dtype names
+SAFETENSORS_DTYPES = {
+    "F64": "float64", "F32": "float32", "F16": "float16", "BF16": "bfloat16",
+    "I64": "int64", "I32": "int32", "I16": "int16", "I8": "int8", "U8": "uint8", "BOOL": "bool",
+}
+
+
+def has_local_model(model_dir: str = EMOTION_MODEL_DIR) -> bool:
+    """Returns True if `model_dir` holds an exported model with single-file safetensors weights."""
+    return (os.path.isfile(os.path.join(model_dir, WEIGHTS_FILE))
+            and os.path.isfile(os.path.join(model_dir, "config.json")))
+
+
+def export_model(model_name: str = EMOTION_MODEL, model_dir: str = EMOTION_MODEL_DIR):
+    """
+    Downloads a model and its tokenizer and saves them to `model_dir` with the
+    weights in one safetensors file, ready for offline loading.
+
+    Args:
+        model_name (str): Hugging Face model id.
+        model_dir (str): Target directory.
+    """
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.save_pretrained(model_dir, safe_serialization=True, max_shard_size="100GB")
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(model_dir)
+
+
+def map_safetensors(path: str) -> dict:
+    """
+    Memory-maps a safetensors file and returns its tensors as views of the
+    mapping, without reading or copying the weights.
+
+    Args:
+        path (str): The safetensors file.
+
+    Returns:
+        dict: Tensor name -> tensor backed by the mapped file.
+    """
+    import torch
+
+    with open(path, "rb") as f:
+        # Copy-on-write: pages are shared through the page cache until a tensor is written to
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    header_size = struct.unpack("<Q", mapped[:8])[0]
+    header = json.loads(mapped[8:8 + header_size])
+    header.pop("__metadata__", None)
+
+    tensors = {}
+    for name, info in header.items():
+        dtype = getattr(torch, SAFETENSORS_DTYPES[info["dtype"]])
+        start, end = info["data_offsets"]
+        count = (end - start) // dtype.itemsize
+        if count:
+            tensor = torch.frombuffer(mapped, dtype=dtype, count=count, offset=8 + header_size + start)
+        else:
+            tensor = torch.empty(0, dtype=dtype)
+        tensors[name] = tensor.reshape(info["shape"])
+    return tensors
+
+
+def load_local_model(model_dir: str = EMOTION_MODEL_DIR):
+    """
+    Loads a sequence classification model from a local directory, offline,
+    with its parameters backed by the memory-mapped safetensors file.
+
+    Args:
+        model_dir (str): Directory written by `export_model`.
+
+    Returns:
+        PreTrainedModel: The model in eval mode.
+
+    Raises:
+        ValueError: If the weights file does not cover every parameter of the model.
+    """
+    import torch
+    from transformers import AutoConfig, AutoModelForSequenceClassification
+
+    config = AutoConfig.from_pretrained(model_dir, local_files_only=True)
+    # Built without allocating weights; load_state_dict(assign=True) then uses the mapped tensors as they are
+    with torch.device("meta"):
+        model = AutoModelForSequenceClassification.from_config(config)
+    model.load_state_dict(map_safetensors(os.path.join(model_dir, WEIGHTS_FILE)), strict=False, assign=True)
+    # Tied weights (e.g. BART's shared embeddings) are stored once
+    model.tie_weights()
+
+    missing = [name for name, tensor in [*model.named_parameters(), *model.named_buffers()] if tensor.is_meta]
+    if missing:
+        raise ValueError(f"{model_dir}/{WEIGHTS_FILE} has no weights for {', '.join(missing)}.")
+    return model.eval()
+
+
+def load_zero_shot_pipeline(model_dir: str = EMOTION_MODEL_DIR):
+    """
+    Returns a zero-shot classification pipeline over the local model.
+
+    Args:
+        model_dir (str): Directory written by `export_model`.
+    """
+    from transformers import AutoTokenizer, pipeline
+
+    model = load_local_model(model_dir)
+    tokenizer = AutoTokenizer.from_pretrained(model_dir, local_files_only=True)
+    return pipeline("zero-shot-classification", model=model, tokenizer=tokenizer)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the emotion model for offline loading.")
+    parser.add_argument("command", choices=["export"])
+    parser.add_argument("--model", default=EMOTION_MODEL)
+    parser.add_argument("--model-dir", default=EMOTION_MODEL_DIR)
+    args = parser.parse_args()
+
+    export_model(args.model, args.model_dir)
+    print(f"Saved {args.model} to {args.model_dir}.")
+
+
+if __name__ == "__main__":
+    main()
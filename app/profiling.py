@@ -0,0 +1,265 @@
+# profiling.py
+
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+from app.tracing import current_trace
+
+# ========================================================
+# ON-DEMAND PROFILING
+# ========================================================
+#
+# A sampling profiler for production traffic, off by default. A sampler
+# thread looks at the profiled work every PROFILE_INTERVAL_MS:
+#
+# - For a request (an asyncio task), it records the task's stack while the
+#   task runs on the event loop, and the chain of awaits, ending in
+#   "(await)", while the task waits for the LLM, the NLI executor or the
+#   database. The profile therefore shows wall-clock time per code path.
+# - For a sync run, e.g. `analyze_conversation_db`, it records the stack of
+#   the calling thread.
+#
+# Profiles are written to PROFILE_DIR/<request id>.folded in the folded
+# stack format read by flamegraph.pl, speedscope and inferno. The request
+# id is the trace id of the request (see app/tracing.py).
+#
+# `torch.profiler` traces of the emotion model are recorded separately for
+# the next `torch_batches` zero-shot calls, as Chrome traces in PROFILE_DIR.
+#
+# Everything can be changed at runtime through /admin/profiling.
+
+
+def _env_list(name: str, default: str) -> list:
+    return [item.strip() for item in os.environ.get(name, default).split(",") if item.strip()]
+
+
+class ProfilingSettings:
+    def __init__(self):
+        """Runtime profiling switches, initialized from the environment."""
+        self.sample_rate = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))   # Fraction of requests to profile
+        self.next_requests = 0                                              # Profile the next N requests regardless
+        self.paths = _env_list("PROFILE_PATHS", "/chat,/analyze,/analyze-file")
+        self.interval_ms = float(os.environ.get("PROFILE_INTERVAL_MS", 5))
+        self.output_dir = os.environ.get("PROFILE_DIR", "./profiles")
+        self.analysis_runs = os.environ.get("PROFILE_ANALYSIS", "0") == "1"
+        self.torch_batches = int(os.environ.get("PROFILE_TORCH_BATCHES", 0))
+        self._lock = threading.Lock()
+
+    def should_profile(self, path: str) -> bool:
+        """Decides whether a request to `path` is profiled, consuming one of `next_requests`."""
+        if path not in self.paths:
+            return False
+        with self._lock:
+            if self.next_requests > 0:
+                self.next_requests -= 1
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def take_torch_batch(self) -> bool:
+        """Consumes one of `torch_batches`; True if the current batch should be profiled."""
+        if self.torch_batches <= 0:
+            return False
+        with self._lock:
+            if self.torch_batches <= 0:
+                return False
+            self.torch_batches -= 1
+            return True
+
+    def update(self, **changes):
+        for key, value in changes.items():
+            if value is not None:
+                setattr(self, key, value)
+
+    def as_dict(self) -> dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "next_requests": self.next_requests,
+            "paths": self.paths,
+            "interval_ms": self.interval_ms,
+            "output_dir": self.output_dir,
+            "analysis_runs": self.analysis_runs,
+            "torch_batches": self.torch_batches,
+        }
+
+
+settings = ProfilingSettings()
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _stack_from(leaf, stop=None) -> list:
+    """Returns frame names from the outermost frame, or `stop`, down to `leaf`."""
+    names = []
+    frame = leaf
+    while frame is not None:
+        names.append(_frame_name(frame))
+        if frame is stop:
+            break
+        frame = frame.f_back
+    names.reverse()
+    return names
+
+
+def _await_chain(coro) -> list:
+    """Returns the frame names of a suspended coroutine and everything it awaits."""
+    names = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        names.append(_frame_name(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    names.append("(await)")
+    return names
+
+
+class SamplingProfiler:
+    def __init__(self, name: str, interval_ms: float = None, output_dir: str = None):
+        """
+        Samples the stacks of one asyncio task or one thread until stopped.
+
+        Args:
+            name (str): Profile name, used as the file name.
+            interval_ms (float): Milliseconds between samples. Defaults to `settings.interval_ms`.
+            output_dir (str): Directory for the folded output. Defaults to `settings.output_dir`.
+        """
+        self.name = name
+        self.interval = (interval_ms or settings.interval_ms) / 1000.0
+        self.output_dir = output_dir or settings.output_dir
+        self.samples = Counter()
+        self._task = None
+        self._loop = None
+        self._thread_id = None
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        """Starts sampling the current asyncio task, or the current thread outside of one."""
+        try:
+            self._loop = asyncio.get_running_loop()
+            self._task = asyncio.current_task()
+        except RuntimeError:
+            self._task = None
+        self._thread_id = threading.get_ident()
+        self._sampler = threading.Thread(target=self._sample_loop, name=f"profiler-{self.name}", daemon=True)
+        self._sampler.start()
+        return self
+
+    def stop(self) -> str:
+        """Stops sampling and writes the folded stacks. Returns the output path."""
+        self._stop.set()
+        self._sampler.join()
+        return self.write()
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            stack = self._sample()
+            if stack:
+                self.samples[";".join(stack)] += 1
+
+    def _sample(self) -> list:
+        frame = sys._current_frames().get(self._thread_id)
+        if self._task is None:
+            return _stack_from(frame) if frame is not None else []
+        if self._task.done():
+            return []
+        coro = self._task.get_coro()
+        if asyncio.current_task(self._loop) is self._task and frame is not None:
+            # Running: cut the event loop machinery above the task's coroutine
+            return _stack_from(frame, stop=coro.cr_frame)
+        return _await_chain(coro)
+
+    def write(self) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{self.name}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+@contextmanager
+def profiled(name: str = None):
+    """
+    Profiles the enclosed block with a SamplingProfiler.
+
+    Args:
+        name (str): Profile name; the current trace id, or a random id, if None.
+
+    Yields:
+        SamplingProfiler: The running profiler.
+    """
+    if name is None:
+        trace = current_trace()
+        name = trace.trace_id if trace is not None else uuid.uuid4().hex
+    profiler = SamplingProfiler(name).start()
+    try:
+        yield profiler
+    finally:
+        path = profiler.stop()
+        print(f"[profiling] {sum(profiler.samples.values())} samples written to {path}")
+
+
+@contextmanager
+def torch_profiled(name: str):
+    """
+    Records the enclosed model call with `torch.profiler` if a torch batch was
+    requested through `settings.torch_batches`, and writes a Chrome trace.
+
+    Args:
+        name (str): Prefix of the trace file name.
+    """
+    if not settings.take_torch_batch():
+        yield
+        return
+
+    import torch
+    from torch.profiler import ProfilerActivity, profile
+
+    activities = [ProfilerActivity.CPU]
+    if torch.cuda.is_available():
+        activities.append(ProfilerActivity.CUDA)
+    with profile(activities=activities, record_shapes=True) as prof:
+        yield
+    os.makedirs(settings.output_dir, exist_ok=True)
+    path = os.path.join(settings.output_dir, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.json")
+    prof.export_chrome_trace(path)
+    print(f"[profiling] torch profile written to {path}")
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        """
+        ASGI middleware profiling the requests selected by `settings`. It must run
+        in the same task as the endpoint, so it is added as plain ASGI middleware
+        and inside any BaseHTTPMiddleware. Profiled responses carry an
+        X-Profile-Id header naming the output file.
+        """
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.should_profile(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        trace = current_trace()
+        name = trace.trace_id if trace is not None else uuid.uuid4().hex
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-profile-id", name.encode())]
+            await send(message)
+
+        with profiled(name):
+            await self.app(scope, receive, send_with_id)
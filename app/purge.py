@@ -0,0 +1,165 @@
+# purge.py
+
+import asyncio
+import os
+
+from sqlalchemy import delete, select
+
+from app.db import AsyncSessionLocal, Team, Message, MessageSummary
+
+# Rows deleted per transaction, so a purge never holds the write lock for long.
+PURGE_BATCH_SIZE = int(os.environ.get("PURGE_BATCH_SIZE", 1000))
+
+# ========================================================
+#   GENERATION PURGE FUNCTIONS
+# ========================================================
+#
+# Resetting a team only increments its generation. Messages of older
+# generations are invisible to all queries and are deleted here in small
+# batches, in the background, after the reset request has returned.
+
+def reset_team_generation(db, team_name: str, event_broker=None):
+    """
+    Resets the team's stage and starts a new team generation: members clear their
+    state on their next activity and messages of older generations become invisible.
+    Needs only the database, so resets work before the models are loaded.
+
+    Args:
+        db (Session): Database session.
+        team_name (str): Name of the team to reset.
+        event_broker (TeamEventBroker): Receives the reset team state, if given.
+
+    Returns:
+        tuple or None: (team_id, new generation) to purge, or None if the team does not exist.
+    """
+    team = db.query(Team).filter(Team.name == team_name).first()
+    if not team:
+        return None
+    team.current_stage = "Uncertain"
+    team.feedback = ""
+    team.save_team_distribution({})
+    team.generation += 1
+    db.commit()
+    if event_broker is not None:
+        event_broker.publish(team.name, team.snapshot_state())
+    return team.id, team.generation
+
+
+def purge_batch(db, team_id: int, generation: int, batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """
+    Deletes one batch of a team's messages from generations older than `generation`.
+    Once no message is left, the retention summaries of those generations are deleted too.
+
+    Args:
+        db (Session): Database session.
+        team_id (int): The ID of the team.
+        generation (int): The team's current generation.
+        batch_size (int): Maximum number of rows deleted.
+
+    Returns:
+        int: Number of deleted messages.
+    """
+    ids = db.execute(
+        select(Message.id)
+        .where(Message.team_id == team_id, Message.generation < generation)
+        .limit(batch_size)
+    ).scalars().all()
+    if not ids:
+        db.execute(delete(MessageSummary).where(
+            MessageSummary.team_id == team_id,
+            MessageSummary.generation < generation
+        ))
+        db.commit()
+        return 0
+    db.execute(delete(Message).where(Message.id.in_(ids)))
+    db.commit()
+    return len(ids)
+
+
+def purge_old_generations(db, team_id: int, generation: int, batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """
+    Deletes all of a team's messages from generations older than `generation`.
+
+    Args:
+        db (Session): Database session.
+        team_id (int): The ID of the team.
+        generation (int): The team's current generation.
+        batch_size (int): Rows deleted per transaction.
+
+    Returns:
+        int: Total number of deleted messages.
+    """
+    total = 0
+    while True:
+        deleted = purge_batch(db, team_id, generation, batch_size)
+        total += deleted
+        if deleted < batch_size:
+            return total
+
+
+def find_stale_generations(db):
+    """
+    Finds teams that still have messages from older generations, e.g. because
+    the server stopped before a background purge completed.
+
+    Args:
+        db (Session): Database session.
+
+    Returns:
+        list: (team_id, generation) pairs to purge.
+    """
+    rows = db.execute(
+        select(Team.id, Team.generation)
+        .join(Message, Message.team_id == Team.id)
+        .where(Message.generation < Team.generation)
+        .distinct()
+    ).all()
+    return [(team_id, generation) for team_id, generation in rows]
+
+# ========================================================
+#   BACKGROUND PURGE
+# ========================================================
+
+async def apurge_old_generations(team_id: int, generation: int, batch_size: int = PURGE_BATCH_SIZE,
+                                 session_factory=AsyncSessionLocal) -> int:
+    """
+    Background variant of `purge_old_generations` on its own async session.
+    Yields to the event loop between batches so live requests keep being served.
+
+    Args:
+        team_id (int): The ID of the team.
+        generation (int): The team's current generation.
+        batch_size (int): Rows deleted per transaction.
+        session_factory (async_sessionmaker): Opens the purge's session.
+
+    Returns:
+        int: Total number of deleted messages.
+    """
+    total = 0
+    async with session_factory() as db:
+        while True:
+            deleted = await db.run_sync(purge_batch, team_id, generation, batch_size)
+            total += deleted
+            if deleted < batch_size:
+                return total
+            await asyncio.sleep(0)
+
+
+async def apurge_stale_generations(batch_size: int = PURGE_BATCH_SIZE, session_factory=AsyncSessionLocal) -> int:
+    """
+    Purges the leftovers of every unfinished purge. Run once at startup.
+
+    Args:
+        batch_size (int): Rows deleted per transaction.
+        session_factory (async_sessionmaker): Opens the purge's sessions.
+
+    Returns:
+        int: Total number of deleted messages.
+    """
+    async with session_factory() as db:
+        stale = await db.run_sync(find_stale_generations)
+
+    total = 0
+    for team_id, generation in stale:
+        total += await apurge_old_generations(team_id, generation, batch_size, session_factory)
+    return total
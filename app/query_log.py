@@ -0,0 +1,134 @@
+# query_log.py
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# ========================================================
+# QUERY INSTRUMENTATION
+# ========================================================
+#
+# Called by the engine hooks in storage.py for every SQL statement:
+#
+# - `count_queries()` counts the statements run by the enclosed code, also
+#   through AsyncSession.run_sync and the threadpool. The API counts every
+#   request (X-DB-Queries header, db_queries_per_request histogram) and the
+#   tests use `assert_max_queries` to keep query counts from regressing.
+# - Statements slower than SLOW_QUERY_MS are printed with their query plan
+#   (EXPLAIN QUERY PLAN on SQLite, EXPLAIN on PostgreSQL) and kept in
+#   `slow_queries` for /admin/slow-queries.
+
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 200))
+SLOW_QUERY_EXPLAIN = os.environ.get("SLOW_QUERY_EXPLAIN", "1") != "0"
+SLOW_QUERY_HISTORY = 100
+
+_current_stats = ContextVar("query_stats", default=None)
+
+slow_queries = deque(maxlen=SLOW_QUERY_HISTORY)
+_slow_lock = threading.Lock()
+
+
+class QueryStats:
+    def __init__(self):
+        """Statements run inside one `count_queries` block."""
+        self.count = 0
+        self.duration_ms = 0.0
+        self.statements = []
+        self._lock = threading.Lock()
+
+    def add(self, statement: str, duration_ms: float):
+        with self._lock:
+            self.count += 1
+            self.duration_ms += duration_ms
+            self.statements.append(statement)
+
+
+@contextmanager
+def count_queries():
+    """
+    Counts the SQL statements run by the enclosed block. Blocks may be nested;
+    every enclosing block counts the statement.
+
+    Yields:
+        QueryStats: Updated as statements run.
+    """
+    stats = QueryStats()
+    parent = _current_stats.get()
+    token = _current_stats.set((stats, parent))
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """
+    Test helper failing if the enclosed block runs more than `limit` statements.
+
+    Raises:
+        AssertionError: Listing the statements that were run.
+    """
+    with count_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        listing = "\n".join(f"  {i + 1}. {s}" for i, s in enumerate(stats.statements))
+        raise AssertionError(f"{stats.count} queries run, at most {limit} expected:\n{listing}")
+
+
+def _explain(conn, statement: str, parameters) -> list:
+    """Returns the query plan of a statement as text rows, using a separate cursor."""
+    if conn.dialect.name == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    elif conn.dialect.name == "postgresql":
+        prefix = "EXPLAIN "
+    else:
+        return []
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return [" ".join(str(col) for col in row) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def record_statement(conn, statement: str, parameters, executemany: bool, duration_ms: float):
+    """
+    Counts a finished statement and logs it if it was slow.
+
+    Args:
+        conn (Connection): The SQLAlchemy connection that ran it.
+        statement (str): The SQL text.
+        parameters: The DBAPI parameters.
+        executemany (bool): Whether the statement ran once per parameter set.
+        duration_ms (float): Execution time.
+    """
+    entry = _current_stats.get()
+    while entry is not None:
+        stats, entry = entry
+        stats.add(statement, duration_ms)
+
+    if duration_ms < SLOW_QUERY_MS:
+        return
+
+    plan = []
+    is_query = statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH"))
+    if SLOW_QUERY_EXPLAIN and is_query and not executemany:
+        try:
+            plan = _explain(conn, statement, parameters)
+        except Exception as e:
+            plan = [f"EXPLAIN failed: {e}"]
+
+    with _slow_lock:
+        slow_queries.append({
+            "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "duration_ms": round(duration_ms, 1),
+            "statement": statement,
+            "plan": plan,
+        })
+    print(f"[slow query] {duration_ms:.1f} ms: {' '.join(statement.split())}")
+    for row in plan:
+        print(f"[slow query]   {row}")
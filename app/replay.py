@@ -0,0 +1,224 @@
+# replay.py
+
+import atexit
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+# ========================================================
+# RECORD / REPLAY OF MODEL CALLS
+# ========================================================
+#
+# Wraps the language model (OllamaLLM.invoke/ainvoke) and the zero-shot
+# classifier so their outputs can be recorded into a JSON fixture and served
+# from it later:
+#
+# - "record": recorded outputs are served, missing ones come from the real
+#   models and are added to the fixture, which is written at exit.
+# - "replay": outputs are served from the fixture only; no model is loaded.
+#   A call that was never recorded raises MissingRecordingError.
+# - "off": the real models are used directly.
+#
+# Entries are keyed by a hash of the call's input: the prompt for the
+# language model, and text plus candidate labels for the classifier (one entry
+# per text, so batching does not change the keys). Everything else in
+# ChatbotGenerative runs unchanged, which lets the scenario tests run on CI in
+# seconds without Ollama or bart-large-mnli.
+
+REPLAY_MODES = ("off", "record", "replay")
+FIXTURE_VERSION = 1
+
+# Characters of the input kept next to each entry to make fixture diffs readable
+_PREVIEW_CHARS = 120
+
+
+class MissingRecordingError(LookupError):
+    """Raised in replay mode for a model call that is not in the fixture."""
+
+
+def replay_mode() -> str:
+    """
+    Returns the mode set by REPLAY_MODE, "replay" if unset. The live models
+    are only used when "off" or "record" is set explicitly.
+    """
+    mode = os.environ.get("REPLAY_MODE", "") or "replay"
+    if mode not in REPLAY_MODES:
+        raise ValueError(f"REPLAY_MODE must be one of {', '.join(REPLAY_MODES)}, not '{mode}'.")
+    return mode
+
+
+def call_key(kind: str, payload) -> str:
+    """SHA-256 of the call kind and its JSON-encoded input."""
+    data = json.dumps([kind, payload], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class ReplayStore:
+    def __init__(self, path: str, mode: str = "replay"):
+        """
+        Fixture of recorded model outputs.
+
+        Args:
+            path (str): JSON fixture file. It is created on the first save in record mode.
+            mode (str): "record" or "replay".
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"ReplayStore mode must be 'record' or 'replay', not '{mode}'.")
+        self.path = path
+        self.mode = mode
+        self.entries = {}
+        self.hits = 0
+        self.recorded = 0
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f).get("entries", {})
+        elif mode == "replay":
+            raise FileNotFoundError(f"Replay fixture {path} does not exist; record it with REPLAY_MODE=record.")
+
+        if mode == "record":
+            atexit.register(self.save)
+
+    def get(self, kind: str, payload):
+        """
+        Returns the recorded output of a call, or None in record mode if it was never recorded.
+
+        Raises:
+            MissingRecordingError: In replay mode, for a call that was never recorded.
+        """
+        key = call_key(kind, payload)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry["output"]
+        if self.mode == "replay":
+            preview = json.dumps(payload, ensure_ascii=False)[:_PREVIEW_CHARS]
+            raise MissingRecordingError(
+                f"No recorded {kind} output for {preview} in {self.path}. Re-record with REPLAY_MODE=record."
+            )
+        return None
+
+    def put(self, kind: str, payload, output):
+        """Records the output of a call."""
+        key = call_key(kind, payload)
+        preview = payload if isinstance(payload, str) else payload.get("text", "")
+        with self._lock:
+            self.entries[key] = {"kind": kind, "input": preview[:_PREVIEW_CHARS], "output": output}
+            self.recorded += 1
+
+    def save(self):
+        """Writes the fixture atomically, with sorted keys so re-recordings diff cleanly."""
+        if self.mode != "record" or not self.recorded:
+            return
+        with self._lock:
+            data = {"version": FIXTURE_VERSION, "entries": self.entries}
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1, sort_keys=True, ensure_ascii=False)
+                f.write("\n")
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.path)
+            recorded, self.recorded = self.recorded, 0
+        print(f"[replay] Saved {recorded} new recordings to {self.path} ({len(self.entries)} total).")
+
+
+class ReplayLLM:
+    def __init__(self, store: ReplayStore, model=None):
+        """
+        Language model serving recorded outputs.
+
+        Args:
+            store (ReplayStore): The fixture.
+            model (OllamaLLM): The real model, called for unrecorded prompts in record mode.
+                               llama3.2 through Ollama is used if omitted.
+        """
+        if model is None and store.mode == "record":
+            from langchain_ollama import OllamaLLM
+            model = OllamaLLM(model="llama3.2")
+        self.store = store
+        self.model = model
+
+    def invoke(self, input: str, **kwargs) -> str:
+        output = self.store.get("llm", input)
+        if output is None:
+            output = self.model.invoke(input=input, **kwargs)
+            self.store.put("llm", input, output)
+        return output
+
+    async def ainvoke(self, input: str, **kwargs) -> str:
+        output = self.store.get("llm", input)
+        if output is None:
+            output = await self.model.ainvoke(input=input, **kwargs)
+            self.store.put("llm", input, output)
+        return output
+
+
+class ReplayClassifier:
+    def __init__(self, store: ReplayStore, classifier=None):
+        """
+        Zero-shot classifier serving recorded outputs, with the pipeline's call
+        signature and output format.
+
+        Args:
+            store (ReplayStore): The fixture.
+            classifier (callable): The real pipeline, called for unrecorded texts in
+                                   record mode. bart-large-mnli is loaded if omitted.
+        """
+        if classifier is None and store.mode == "record":
+            from app.emotion_analysis import _load_classifier
+            classifier = _load_classifier()
+        self.store = store
+        self.classifier = classifier
+
+    @staticmethod
+    def _payload(text: str, candidate_labels, kwargs: dict) -> dict:
+        # batch_size changes how the model is run, not its output
+        options = {k: v for k, v in kwargs.items() if k != "batch_size"}
+        return {"text": text, "labels": list(candidate_labels), "options": options}
+
+    def __call__(self, sequences, candidate_labels, **kwargs):
+        single = isinstance(sequences, str)
+        texts = [sequences] if single else list(sequences)
+        payloads = [self._payload(text, candidate_labels, kwargs) for text in texts]
+        outputs = [self.store.get("zero_shot", payload) for payload in payloads]
+
+        missing = [i for i, output in enumerate(outputs) if output is None]
+        if missing:
+            computed = self.classifier([texts[i] for i in missing], candidate_labels, **kwargs)
+            if isinstance(computed, dict):
+                computed = [computed]
+            for i, output in zip(missing, computed):
+                output = {"sequence": output["sequence"], "labels": list(output["labels"]),
+                          "scores": [float(score) for score in output["scores"]]}
+                self.store.put("zero_shot", payloads[i], output)
+                outputs[i] = output
+        return outputs[0] if single else outputs
+
+
+def create_replay_chatbot(fixture_path: str, mode: str = "replay", model=None, classifier=None, **kwargs):
+    """
+    Returns a ChatbotGenerative whose language model and emotion classifier go
+    through a record/replay fixture.
+
+    Args:
+        fixture_path (str): JSON fixture file.
+        mode (str): "record" or "replay".
+        model (OllamaLLM): Language model to record from; llama3.2 if omitted.
+        classifier (callable): Zero-shot classifier to record from; bart-large-mnli if omitted.
+        **kwargs: Passed to ChatbotGenerative, e.g. state_cache.
+    """
+    from app.chatbot_generative import ChatbotGenerative
+    from app.emotion_analysis import EmotionDetector
+
+    store = ReplayStore(fixture_path, mode)
+    return ChatbotGenerative(
+        model=ReplayLLM(store, model),
+        emotion_detector=EmotionDetector(classifier=ReplayClassifier(store, classifier)),
+        **kwargs,
+    )
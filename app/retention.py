@@ -0,0 +1,270 @@
+# retention.py
+
+import argparse
+import gzip
+import json
+import os
+from datetime import timedelta
+
+from sqlalchemy import delete, func, or_, select
+
+from app.db import SessionLocal, Member, Message, MessageSummary, init_db, utcnow
+
+# ========================================================
+# RETENTION POLICY
+# ========================================================
+#
+# Messages older than `max_age_days`, or beyond the last `keep_last` messages
+# of a member, are compacted: their emotion distributions are added to the
+# member's summary row, the raw rows are written to a gzip-compressed JSON
+# Lines archive and then deleted, one batch per transaction. Feedback prompts
+# read the summary instead of the compacted history.
+
+
+class RetentionPolicy:
+    def __init__(self, max_age_days=None, keep_last=None, archive_dir="./archive", batch_size=500):
+        """
+        Initializes a retention policy. A policy with neither limit set compacts nothing.
+
+        Args:
+            max_age_days (float or None): Compact messages older than this many days.
+            keep_last (int or None): Compact everything beyond a member's last `keep_last` messages.
+            archive_dir (str): Directory receiving the compressed archives.
+            batch_size (int): Messages compacted per transaction.
+        """
+        self.max_age_days = max_age_days
+        self.keep_last = keep_last
+        self.archive_dir = archive_dir
+        self.batch_size = batch_size
+
+    @classmethod
+    def from_env(cls):
+        """
+        Builds the policy from RETENTION_MAX_AGE_DAYS, RETENTION_KEEP_LAST,
+        RETENTION_ARCHIVE_DIR and RETENTION_BATCH_SIZE.
+
+        Returns:
+            RetentionPolicy: The configured policy.
+        """
+        max_age_days = os.environ.get("RETENTION_MAX_AGE_DAYS")
+        keep_last = os.environ.get("RETENTION_KEEP_LAST")
+        return cls(
+            max_age_days=float(max_age_days) if max_age_days else None,
+            keep_last=int(keep_last) if keep_last else None,
+            archive_dir=os.environ.get("RETENTION_ARCHIVE_DIR", "./archive"),
+            batch_size=int(os.environ.get("RETENTION_BATCH_SIZE", 500))
+        )
+
+    @property
+    def enabled(self):
+        return self.max_age_days is not None or self.keep_last is not None
+
+# ========================================================
+# COMPACTION FUNCTIONS
+# ========================================================
+
+def _compaction_filter(db, policy, member, now):
+    """
+    Builds the WHERE clause selecting a member's compactable messages.
+
+    Returns:
+        ClauseElement or None: The filter, or None if nothing is compactable.
+    """
+    conditions = []
+    if policy.keep_last is not None:
+        # Id of the newest message beyond the last `keep_last`; messages only get larger ids.
+        threshold = db.execute(
+            select(Message.id)
+            .where(Message.member_id == member.id, Message.generation == member.generation)
+            .order_by(Message.id.desc())
+            .offset(policy.keep_last)
+            .limit(1)
+        ).scalar()
+        if threshold is not None:
+            conditions.append(Message.id <= threshold)
+    if policy.max_age_days is not None:
+        conditions.append(Message.created_at < now - timedelta(days=policy.max_age_days))
+    if not conditions:
+        return None
+    return (Message.member_id == member.id) & (Message.generation == member.generation) & or_(*conditions)
+
+
+def _load_summary(db, member):
+    """Returns the member's summary row for its current generation, creating it if needed."""
+    summary = db.query(MessageSummary).filter(
+        MessageSummary.member_id == member.id,
+        MessageSummary.generation == member.generation
+    ).first()
+    if not summary:
+        summary = MessageSummary(member_id=member.id, team_id=member.team_id, generation=member.generation,
+                                 num_messages=0, num_valuable=0)
+        db.add(summary)
+    return summary
+
+
+def _summarize(summary, messages):
+    """Adds a batch of messages to the summary's counters and emotion vector."""
+    totals = summary.load_emotion_totals()
+    for msg in messages:
+        summary.num_messages = (summary.num_messages or 0) + 1
+        dist = msg.load_top_emotion_distribution()
+        if dist:
+            summary.num_valuable = (summary.num_valuable or 0) + 1
+            for label, score in dist.items():
+                totals[label] = totals.get(label, 0.0) + score
+    summary.save_emotion_totals(totals)
+
+    first, last = messages[0], messages[-1]
+    if summary.first_message_id is None or first.id < summary.first_message_id:
+        summary.first_message_id = first.id
+        summary.first_created_at = first.created_at
+    if summary.last_message_id is None or last.id > summary.last_message_id:
+        summary.last_message_id = last.id
+        summary.last_created_at = last.created_at
+
+
+def _archive(policy, member, messages) -> str:
+    """
+    Writes a batch of raw messages to a gzip-compressed JSON Lines file.
+    The file is written under a temporary name and renamed once complete.
+
+    Returns:
+        str: Path of the archive file.
+    """
+    directory = os.path.join(policy.archive_dir, f"team_{member.team_id}", f"member_{member.id}")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{messages[0].id}-{messages[-1].id}.jsonl.gz")
+
+    with gzip.open(path + ".tmp", "wt", encoding="utf-8") as f:
+        for msg in messages:
+            f.write(json.dumps({
+                "id": msg.id,
+                "member_id": msg.member_id,
+                "team_id": msg.team_id,
+                "generation": msg.generation,
+                "role": msg.role,
+                "text": msg.text,
+                "detected_emotion": msg.detected_emotion,
+                "stage_at_time": msg.stage_at_time,
+                "top_emotion_distribution": msg.load_top_emotion_distribution(),
+                "created_at": msg.created_at.isoformat() if msg.created_at else None
+            }) + "\n")
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def compact_member(db, policy, member, now=None) -> int:
+    """
+    Compacts, archives and deletes a member's messages selected by the policy.
+
+    Args:
+        db (Session): Database session.
+        policy (RetentionPolicy): The retention policy.
+        member (Member): The member instance.
+        now (datetime): Reference time for the age limit. Defaults to the current UTC time.
+
+    Returns:
+        int: Number of compacted messages.
+    """
+    compactable = _compaction_filter(db, policy, member, now or utcnow())
+    if compactable is None:
+        return 0
+
+    total = 0
+    while True:
+        messages = db.execute(
+            select(Message).where(compactable).order_by(Message.id).limit(policy.batch_size)
+        ).scalars().all()
+        if not messages:
+            return total
+
+        summary = _load_summary(db, member)
+        _summarize(summary, messages)
+        _archive(policy, member, messages)
+        db.execute(delete(Message).where(Message.id.in_([msg.id for msg in messages])))
+        db.commit()
+        total += len(messages)
+
+
+def count_compactable(db, policy, member, now=None) -> int:
+    """
+    Counts the messages of a member the policy would compact.
+
+    Returns:
+        int: Number of compactable messages.
+    """
+    compactable = _compaction_filter(db, policy, member, now or utcnow())
+    if compactable is None:
+        return 0
+    return db.execute(select(func.count(Message.id)).where(compactable)).scalar()
+
+
+def run_retention(db, policy, now=None, dry_run: bool = False) -> dict:
+    """
+    Applies the retention policy to every member.
+
+    Args:
+        db (Session): Database session.
+        policy (RetentionPolicy): The retention policy.
+        now (datetime): Reference time for the age limit.
+        dry_run (bool): Only count compactable messages.
+
+    Returns:
+        dict: Number of members visited and of messages compacted (or compactable).
+    """
+    stats = {"members": 0, "messages": 0}
+    if not policy.enabled:
+        return stats
+
+    now = now or utcnow()
+    member_ids = db.execute(select(Member.id).order_by(Member.id)).scalars().all()
+    for member_id in member_ids:
+        member = db.get(Member, member_id)
+        if dry_run:
+            stats["messages"] += count_compactable(db, policy, member, now)
+        else:
+            stats["messages"] += compact_member(db, policy, member, now)
+        stats["members"] += 1
+    return stats
+
+
+def run_retention_once(policy=None) -> dict:
+    """
+    Runs the retention policy on a new database session. Used by the periodic background job.
+
+    Args:
+        policy (RetentionPolicy): The retention policy. Defaults to `RetentionPolicy.from_env()`.
+
+    Returns:
+        dict: See `run_retention`.
+    """
+    with SessionLocal() as db:
+        return run_retention(db, policy or RetentionPolicy.from_env())
+
+# ========================================================
+# COMMAND LINE
+# ========================================================
+
+def main():
+    env_policy = RetentionPolicy.from_env()
+    parser = argparse.ArgumentParser(description="Compact, archive and delete old chat messages.")
+    parser.add_argument("--max-age-days", type=float, default=env_policy.max_age_days)
+    parser.add_argument("--keep-last", type=int, default=env_policy.keep_last)
+    parser.add_argument("--archive-dir", default=env_policy.archive_dir)
+    parser.add_argument("--batch-size", type=int, default=env_policy.batch_size)
+    parser.add_argument("--dry-run", action="store_true", help="Only count the messages that would be compacted.")
+    args = parser.parse_args()
+
+    policy = RetentionPolicy(args.max_age_days, args.keep_last, args.archive_dir, args.batch_size)
+    if not policy.enabled:
+        parser.error("Set --max-age-days and/or --keep-last (or RETENTION_MAX_AGE_DAYS / RETENTION_KEEP_LAST).")
+
+    init_db()
+    with SessionLocal() as db:
+        stats = run_retention(db, policy, dry_run=args.dry_run)
+    action = "compactable" if args.dry_run else "compacted"
+    print(f"{stats['messages']} messages {action} across {stats['members']} members.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+# scheduler.py
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+
+from app.metrics import SCHEDULER_WAIT_SECONDS
+
+# ========================================================
+# ADMISSION CONTROL
+# ========================================================
+#
+# Interactive requests (/chat) and bulk analyses (/analyze, /analyze-file)
+# share the NLI model and the Ollama host. Every request takes one of
+# MAX_CONCURRENCY slots, and at most BULK_CONCURRENCY analyses run at once,
+# so the remaining slots always stay free for chats. Waiting interactive
+# requests are served before waiting bulk ones, but a bulk request that has
+# been passed over by BULK_MAX_SKIPS interactive starts, or has waited
+# BULK_MAX_WAIT seconds, takes the next slot its lane may use. Steady chat
+# traffic therefore slows analyses down without starving them. Requests
+# beyond a lane's queue limit are rejected.
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+LANES = (INTERACTIVE, BULK)
+
+MAX_CONCURRENCY = int(os.environ.get("SCHEDULER_MAX_CONCURRENCY", 4))
+BULK_CONCURRENCY = int(os.environ.get("SCHEDULER_BULK_CONCURRENCY", 1))
+INTERACTIVE_QUEUE = int(os.environ.get("SCHEDULER_INTERACTIVE_QUEUE", 32))
+BULK_QUEUE = int(os.environ.get("SCHEDULER_BULK_QUEUE", 4))
+BULK_MAX_SKIPS = int(os.environ.get("SCHEDULER_BULK_MAX_SKIPS", 8))
+BULK_MAX_WAIT = float(os.environ.get("SCHEDULER_BULK_MAX_WAIT", 2.0))
+
+
+class Overloaded(Exception):
+    def __init__(self, lane: str, retry_after: int):
+        """
+        Raised when a lane's queue is full.
+
+        Args:
+            lane (str): The lane that rejected the request.
+            retry_after (int): Suggested seconds to wait before retrying.
+        """
+        super().__init__(f"The {lane} queue is full.")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class LaneStats:
+    def __init__(self):
+        """Counters of one lane, exposed through `AdmissionScheduler.stats`."""
+        self.running = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.service_avg = 1.0  # Exponential moving average of seconds per request
+
+    def as_dict(self, queued: int) -> dict:
+        return {
+            "running": self.running,
+            "queued": queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "wait_avg_seconds": round(self.wait_total / self.admitted, 4) if self.admitted else 0.0,
+            "wait_max_seconds": round(self.wait_max, 4),
+            "service_avg_seconds": round(self.service_avg, 4)
+        }
+
+
+class AdmissionScheduler:
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, bulk_concurrency: int = BULK_CONCURRENCY,
+                 interactive_queue: int = INTERACTIVE_QUEUE, bulk_queue: int = BULK_QUEUE,
+                 bulk_max_skips: int = BULK_MAX_SKIPS, bulk_max_wait: float = BULK_MAX_WAIT):
+        """
+        Initializes a two-lane priority scheduler. All methods must be called from the event loop.
+
+        Args:
+            max_concurrency (int): Requests running at once across both lanes.
+            bulk_concurrency (int): Bulk requests running at once.
+            interactive_queue (int): Interactive requests allowed to wait.
+            bulk_queue (int): Bulk requests allowed to wait.
+            bulk_max_skips (int): Interactive starts after which a waiting bulk request goes first.
+            bulk_max_wait (float): Seconds after which a waiting bulk request goes first.
+        """
+        self.max_concurrency = max_concurrency
+        self.limits = {INTERACTIVE: max_concurrency, BULK: min(bulk_concurrency, max_concurrency)}
+        self.queue_limits = {INTERACTIVE: interactive_queue, BULK: bulk_queue}
+        self.bulk_max_skips = bulk_max_skips
+        self.bulk_max_wait = bulk_max_wait
+        self._waiters = {lane: deque() for lane in LANES}
+        self._queued_at = {}      # Waiting future -> time it was queued
+        self._bulk_skips = 0      # Interactive starts since the last bulk start while bulk work waited
+        self._stats = {lane: LaneStats() for lane in LANES}
+
+    def _running_total(self) -> int:
+        return sum(stats.running for stats in self._stats.values())
+
+    def _bulk_due(self) -> bool:
+        """True if the oldest waiting bulk request has been passed over long enough to go next."""
+        waiters = self._waiters[BULK]
+        if not waiters or self._stats[BULK].running >= self.limits[BULK]:
+            return False
+        waited = time.monotonic() - self._queued_at.get(waiters[0], time.monotonic())
+        return self._bulk_skips >= self.bulk_max_skips or waited >= self.bulk_max_wait
+
+    def _can_start(self, lane: str) -> bool:
+        if self._running_total() >= self.max_concurrency:
+            return False
+        if self._stats[lane].running >= self.limits[lane]:
+            return False
+        if lane == INTERACTIVE:
+            # An aged bulk request takes the next free slot
+            return not self._bulk_due()
+        # Otherwise bulk work does not overtake waiting interactive work
+        return not self._waiters[INTERACTIVE] or self._bulk_due()
+
+    def _start(self, lane: str):
+        self._stats[lane].running += 1
+        if lane == BULK:
+            self._bulk_skips = 0
+        elif self._waiters[BULK]:
+            self._bulk_skips += 1
+
+    def _retry_after(self, lane: str) -> int:
+        """Estimates when a slot frees up from the queue length and the average service time."""
+        stats = self._stats[lane]
+        waiting = len(self._waiters[lane]) + 1
+        return max(1, math.ceil(stats.service_avg * waiting / max(1, self.limits[lane])))
+
+    async def acquire(self, lane: str):
+        """
+        Waits for a slot in the given lane.
+
+        Args:
+            lane (str): INTERACTIVE or BULK.
+
+        Returns:
+            tuple: Ticket to pass to `release`.
+
+        Raises:
+            Overloaded: If the lane's queue is full.
+        """
+        stats = self._stats[lane]
+        queued_at = time.monotonic()
+        if not self._waiters[lane] and self._can_start(lane):
+            self._start(lane)
+        else:
+            if len(self._waiters[lane]) >= self.queue_limits[lane]:
+                stats.rejected += 1
+                raise Overloaded(lane, self._retry_after(lane))
+            future = asyncio.get_running_loop().create_future()
+            self._waiters[lane].append(future)
+            self._queued_at[future] = queued_at
+            # A free slot may be held back for an aged bulk request; hand it out now
+            self._dispatch()
+            try:
+                await future
+            except asyncio.CancelledError:
+                self._queued_at.pop(future, None)
+                if future.done() and not future.cancelled():
+                    # The slot was granted just before the caller went away
+                    self.release((lane, time.monotonic()))
+                elif future in self._waiters[lane]:
+                    self._waiters[lane].remove(future)
+                    self._dispatch()
+                raise
+
+        started_at = time.monotonic()
+        wait = started_at - queued_at
+        stats.admitted += 1
+        stats.wait_total += wait
+        stats.wait_max = max(stats.wait_max, wait)
+        SCHEDULER_WAIT_SECONDS.labels(lane).observe(wait)
+        return lane, started_at
+
+    def release(self, ticket):
+        """
+        Frees the slot of a finished request and starts waiting requests, interactive first.
+
+        Args:
+            ticket (tuple): The value returned by `acquire`.
+        """
+        lane, started_at = ticket
+        stats = self._stats[lane]
+        stats.running -= 1
+        stats.service_avg = 0.8 * stats.service_avg + 0.2 * (time.monotonic() - started_at)
+        self._dispatch()
+
+    def _dispatch(self):
+        """Starts as many waiting requests as the free slots allow, interactive first unless bulk work is due."""
+        started = True
+        while started:
+            started = False
+            for next_lane in LANES:
+                waiters = self._waiters[next_lane]
+                while waiters and self._can_start(next_lane):
+                    future = waiters.popleft()
+                    self._queued_at.pop(future, None)
+                    if future.cancelled():
+                        continue
+                    self._start(next_lane)
+                    future.set_result(None)
+                    started = True
+
+    def stats(self) -> dict:
+        """
+        Returns running and queued requests, rejections and wait times per lane.
+        """
+        return {lane: self._stats[lane].as_dict(len(self._waiters[lane])) for lane in LANES}
@@ -1,16 +1,21 @@
 # stage_mapping.py
 
-from langchain_ollama import OllamaLLM
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db import Message, Team, Member
+from app.db import Message, MessageSummary, Team, Member
+from app.metrics import timed
 
 
 class StageMapper:
-    def __init__(self):
+    def __init__(self, llama_model=None):
         """
         Initializes the StageMapper with mappings from emotions to Tuckman's stages
         and sets up the LLaMA language model for generating feedback.
+
+        Args:
+            llama_model (OllamaLLM): Language model to share, e.g. the chatbot's.
+                                     A llama3.2 client is created if omitted.
         """
         self.stage_emotion_map = {
             "Forming": [
@@ -41,7 +46,11 @@ class StageMapper:
             ]
         }
 
-        self.llama_model = OllamaLLM(model="llama3.2")
+        if llama_model is None:
+            # Imported here so importing the app does not load langchain
+            from langchain_ollama import OllamaLLM
+            llama_model = OllamaLLM(model="llama3.2")
+        self.llama_model = llama_model
 
     # ========================================================
     #   STAGE DISTRIBUTION FUNCTIONS
@@ -101,6 +110,30 @@ class StageMapper:
     #   HELPERS
     # ========================================================
 
+    def _summary_preamble(self, summaries):
+        """
+        Describes compacted (archived) history in one line, so feedback prompts keep
+        the emotional context of old messages without including their text.
+
+        Args:
+            summaries (list): MessageSummary rows of the member or team.
+
+        Returns:
+            str: The preamble line, or an empty string if nothing was compacted.
+        """
+        num_messages = sum(summary.num_messages or 0 for summary in summaries)
+        if num_messages == 0:
+            return ""
+
+        totals = {}
+        for summary in summaries:
+            for label, value in summary.load_emotion_totals().items():
+                totals[label] = totals.get(label, 0.0) + value
+        total_sum = sum(totals.values()) or 1.0
+        ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:5]
+        emotions = ", ".join(f"{label} ({value / total_sum:.2f})" for label, value in ranked)
+        return f"(Earlier conversation of {num_messages} messages was archived. Dominant emotions: {emotions or 'none'}.)\n"
+
     def _which_stage(self, emotion_label):
         """
         Determines which Tuckman stage an emotion belongs to.
@@ -120,9 +153,9 @@ class StageMapper:
     #   FEEDBACK GENERATION FUNCTIONS
     # ========================================================
 
-    def get_team_feedback(self, db: Session, team_id: int, stage: str) -> str:
+    def build_team_feedback_prompt(self, db: Session, team_id: int, stage: str):
         """
-        Generates team-level feedback by analyzing messages from all team members.
+        Builds the team feedback prompt from the messages of all team members.
 
         Args:
             db (Session): The database session.
@@ -130,21 +163,24 @@ class StageMapper:
             stage (str): The current stage of the team.
 
         Returns:
-            str: The generated feedback.
+            str or None: The prompt, or None if the team does not exist.
         """
         team = db.query(Team).filter(Team.id == team_id).first()
         if not team:
-            return "Team not found."
+            return None
 
         messages = (
             db.query(Message)
-            .join(Member)
-            .filter(Member.team_id == team_id)
+            .filter(Message.team_id == team_id, Message.generation == team.generation)
             .order_by(Message.id)
             .all()
         )
+        summaries = db.query(MessageSummary).filter(
+            MessageSummary.team_id == team_id,
+            MessageSummary.generation == team.generation
+        ).all()
 
-        conversation_str = ""
+        conversation_str = self._summary_preamble(summaries)
         for msg in messages:
             role = msg.role.capitalize()
             conversation_str += f"{role}: {msg.text}\n"
@@ -166,17 +202,11 @@ class StageMapper:
         Based on this, the team's current stage is: {stage}.
         Provide feedback in the requested format. Avoid text in bold, bullet points or writing the feedback in an ordered list. Write it in paragraphs.
         """
+        return prompt
 
-        try:
-            response = self.llama_model.invoke(input=prompt).strip()
-            return response
-        except Exception as e:
-            print(f"[ERROR in get_team_feedback] {e}")
-            return "An error occurred while generating team feedback."
-
-    def get_personal_feedback(self, db: Session, member_id: int, stage: str) -> str:
+    def build_personal_feedback_prompt(self, db: Session, member_id: int, stage: str) -> str:
         """
-        Generates personal feedback for a specific team member by analyzing their messages.
+        Builds the personal feedback prompt from the messages of a team member.
 
         Args:
             db (Session): The database session.
@@ -184,16 +214,23 @@ class StageMapper:
             stage (str): The current stage of the member.
 
         Returns:
-            str: The generated personal feedback.
+            str: The prompt.
         """
         messages = (
             db.query(Message)
-            .filter(Message.member_id == member_id)
+            .join(Member)
+            .filter(Message.member_id == member_id, Message.generation == Member.generation)
             .order_by(Message.id)
             .all()
         )
+        summaries = (
+            db.query(MessageSummary)
+            .join(Member)
+            .filter(MessageSummary.member_id == member_id, MessageSummary.generation == Member.generation)
+            .all()
+        )
 
-        conversation_str = ""
+        conversation_str = self._summary_preamble(summaries)
         for msg in messages:
             role = msg.role.capitalize()
             conversation_str += f"{role}: {msg.text}\n"
@@ -215,6 +252,46 @@ class StageMapper:
         Based on this, the user's current stage is: {stage}.
         Provide feedback in the requested format. Avoid text in bold, bullet points or writing the feedback in an ordered list. Write it in paragraphs.
         """
+        return prompt
+
+    @timed("team_feedback")
+    def get_team_feedback(self, db: Session, team_id: int, stage: str) -> str:
+        """
+        Generates team-level feedback by analyzing messages from all team members.
+
+        Args:
+            db (Session): The database session.
+            team_id (int): The ID of the team.
+            stage (str): The current stage of the team.
+
+        Returns:
+            str: The generated feedback.
+        """
+        prompt = self.build_team_feedback_prompt(db, team_id, stage)
+        if prompt is None:
+            return "Team not found."
+
+        try:
+            response = self.llama_model.invoke(input=prompt).strip()
+            return response
+        except Exception as e:
+            print(f"[ERROR in get_team_feedback] {e}")
+            return "An error occurred while generating team feedback."
+
+    @timed("personal_feedback")
+    def get_personal_feedback(self, db: Session, member_id: int, stage: str) -> str:
+        """
+        Generates personal feedback for a specific team member by analyzing their messages.
+
+        Args:
+            db (Session): The database session.
+            member_id (int): The ID of the member.
+            stage (str): The current stage of the member.
+
+        Returns:
+            str: The generated personal feedback.
+        """
+        prompt = self.build_personal_feedback_prompt(db, member_id, stage)
 
         try:
             response = self.llama_model.invoke(input=prompt).strip()
@@ -222,3 +299,53 @@ class StageMapper:
         except Exception as e:
             print(f"[ERROR in get_personal_feedback] {e}")
             return "An error occurred while generating personal feedback."
+
+    # ========================================================
+    #   ASYNC FEEDBACK GENERATION FUNCTIONS
+    # ========================================================
+
+    @timed("team_feedback")
+    async def aget_team_feedback(self, db: AsyncSession, team_id: int, stage: str) -> str:
+        """
+        Async variant of `get_team_feedback`.
+
+        Args:
+            db (AsyncSession): The async database session.
+            team_id (int): The ID of the team.
+            stage (str): The current stage of the team.
+
+        Returns:
+            str: The generated feedback.
+        """
+        prompt = await db.run_sync(self.build_team_feedback_prompt, team_id, stage)
+        if prompt is None:
+            return "Team not found."
+
+        try:
+            response = (await self.llama_model.ainvoke(input=prompt)).strip()
+            return response
+        except Exception as e:
+            print(f"[ERROR in aget_team_feedback] {e}")
+            return "An error occurred while generating team feedback."
+
+    @timed("personal_feedback")
+    async def aget_personal_feedback(self, db: AsyncSession, member_id: int, stage: str) -> str:
+        """
+        Async variant of `get_personal_feedback`.
+
+        Args:
+            db (AsyncSession): The async database session.
+            member_id (int): The ID of the member.
+            stage (str): The current stage of the member.
+
+        Returns:
+            str: The generated personal feedback.
+        """
+        prompt = await db.run_sync(self.build_personal_feedback_prompt, member_id, stage)
+
+        try:
+            response = (await self.llama_model.ainvoke(input=prompt)).strip()
+            return response
+        except Exception as e:
+            print(f"[ERROR in aget_personal_feedback] {e}")
+            return "An error occurred while generating personal feedback."
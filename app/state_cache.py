@@ -0,0 +1,169 @@
+# state_cache.py
+
+import os
+import threading
+import time
+import weakref
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.db import Team, Member
+
+# Hot state may be written by other worker processes, so entries expire after a
+# short time even without a local write. Identities (ids) never change and do not expire.
+STATE_CACHE_TTL = float(os.environ.get("STATE_CACHE_TTL", 5.0))
+
+_caches = weakref.WeakSet()
+
+
+class StateCache:
+    def __init__(self, ttl: float = STATE_CACHE_TTL):
+        """
+        Initializes an in-process read-through cache of team and member identities
+        (name -> id) and of their hot state (stage, distribution, feedback).
+        Entries are invalidated whenever a session commits a change to the row.
+
+        Args:
+            ttl (float): Seconds a hot state snapshot stays valid.
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._team_ids = {}        # team_name -> team_id
+        self._member_ids = {}      # (team_id, member_name) -> member_id
+        self._team_members = {}    # team_id -> set of cached member ids
+        self._team_states = {}     # team_id -> (expires_at, state)
+        self._member_states = {}   # member_id -> (expires_at, state)
+        self.hits = 0
+        self.misses = 0
+        _caches.add(self)
+
+    # ========================================================
+    #   IDENTITY FUNCTIONS
+    # ========================================================
+
+    def get_team_id(self, team_name: str):
+        """Returns the cached id of a team, or None."""
+        return self._count(self._team_ids.get(team_name))
+
+    def set_team_id(self, team_name: str, team_id: int):
+        """Caches the id of a team."""
+        with self._lock:
+            self._team_ids[team_name] = team_id
+
+    def get_member_id(self, team_id: int, member_name: str):
+        """Returns the cached id of a member of a team, or None."""
+        return self._count(self._member_ids.get((team_id, member_name)))
+
+    def set_member_id(self, team_id: int, member_name: str, member_id: int):
+        """Caches the id of a member of a team."""
+        with self._lock:
+            self._member_ids[(team_id, member_name)] = member_id
+            self._team_members.setdefault(team_id, set()).add(member_id)
+
+    # ========================================================
+    #   HOT STATE FUNCTIONS
+    # ========================================================
+
+    def get_team_state(self, team_id: int):
+        """Returns the cached hot state of a team, or None if missing or expired."""
+        return self._count(self._get_fresh(self._team_states, team_id))
+
+    def set_team_state(self, team_id: int, state: dict):
+        """Caches the hot state of a team."""
+        with self._lock:
+            self._team_states[team_id] = (time.monotonic() + self.ttl, state)
+
+    def get_member_state(self, member_id: int):
+        """Returns the cached hot state of a member, or None if missing or expired."""
+        return self._count(self._get_fresh(self._member_states, member_id))
+
+    def set_member_state(self, member_id: int, state: dict):
+        """Caches the hot state of a member."""
+        with self._lock:
+            self._member_states[member_id] = (time.monotonic() + self.ttl, state)
+
+    # ========================================================
+    #   INVALIDATION FUNCTIONS
+    # ========================================================
+
+    def invalidate(self, team_ids=(), member_ids=()):
+        """
+        Drops the hot state of the given teams and members.
+        Invalidating a team also drops the state of its cached members.
+
+        Args:
+            team_ids (iterable): Ids of changed teams.
+            member_ids (iterable): Ids of changed members.
+        """
+        with self._lock:
+            for team_id in team_ids:
+                self._team_states.pop(team_id, None)
+                for member_id in self._team_members.get(team_id, ()):
+                    self._member_states.pop(member_id, None)
+            for member_id in member_ids:
+                self._member_states.pop(member_id, None)
+
+    def clear(self):
+        """Drops all cached identities and states."""
+        with self._lock:
+            self._team_ids.clear()
+            self._member_ids.clear()
+            self._team_members.clear()
+            self._team_states.clear()
+            self._member_states.clear()
+
+    # ========================================================
+    #   HELPERS
+    # ========================================================
+
+    def _get_fresh(self, entries: dict, key):
+        entry = entries.get(key)
+        if entry is None:
+            return None
+        expires_at, state = entry
+        if expires_at < time.monotonic():
+            return None
+        return state
+
+    def _count(self, value):
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+
+# ========================================================
+# SESSION HOOKS
+# ========================================================
+#
+# Changed teams and members are collected at flush time and invalidated in
+# every cache once the transaction commits, so readers never see state that
+# was written but rolled back. Bulk `query.update()` calls bypass these hooks
+# and must invalidate explicitly; the team version bumps of app/db.py leave the
+# ids of teams they update without loading them in session.info.
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    changes = session.info.setdefault("state_cache_changes", (set(), set()))
+    changes[0].update(session.info.pop("bumped_team_ids", ()))
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Team):
+            changes[0].add(obj.id)
+        elif isinstance(obj, Member):
+            changes[1].add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changes(session):
+    changes = session.info.pop("state_cache_changes", None)
+    if changes:
+        for cache in list(_caches):
+            cache.invalidate(team_ids=changes[0], member_ids=changes[1])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("state_cache_changes", None)
+    session.info.pop("bumped_team_ids", None)
@@ -0,0 +1,123 @@
+# stub_engines.py
+
+import asyncio
+import time
+import zlib
+
+# ========================================================
+# STUB ENGINES
+# ========================================================
+#
+# Deterministic stand-ins for llama3.2 (Ollama) and the bart-large-mnli
+# zero-shot pipeline. They answer from a hash of their input, so results are
+# reproducible across runs and processes, and can simulate model latency.
+# They let benchmarks and load tests measure the application code, the
+# database and the event loop without the models dominating the numbers.
+#
+# The real EmotionDetector and ChatbotGenerative are used on top of them, so
+# everything but the model calls runs as in production.
+
+# Words that make the stub classifier favour an emotion containing them
+_KEYWORDS = ("anger", "frustration", "trust", "calm", "excitement", "hope", "conflict",
+             "pride", "joy", "sadness", "relief", "nostalgia", "unity", "tension")
+
+
+def _stable_hash(text: str) -> int:
+    """CRC32 of the text: unlike hash(), identical in every process."""
+    return zlib.crc32(text.encode("utf-8"))
+
+
+class StubLLM:
+    def __init__(self, latency: float = 0.0, valuable_ratio: float = 0.8):
+        """
+        Stand-in for OllamaLLM.
+
+        Args:
+            latency (float): Seconds every call takes.
+            valuable_ratio (float): Share of relevance prompts answered with 'Valuable'.
+        """
+        self.latency = latency
+        self.valuable_ratio = valuable_ratio
+        self.calls = 0
+
+    def _answer(self, input: str) -> str:
+        self.calls += 1
+        if input.startswith("Classify the following user message"):
+            valuable = (_stable_hash(input) % 1000) < self.valuable_ratio * 1000
+            return "Valuable" if valuable else "Skip"
+        return f"Thanks for sharing. How does the team feel about that? (ref {_stable_hash(input) % 10000:04d})"
+
+    def invoke(self, input: str, **kwargs) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._answer(input)
+
+    async def ainvoke(self, input: str, **kwargs) -> str:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._answer(input)
+
+
+class StubZeroShotClassifier:
+    def __init__(self, latency: float = 0.0, latency_per_text: float = 0.0):
+        """
+        Stand-in for the zero-shot-classification pipeline, with the same call
+        signature and output format.
+
+        Args:
+            latency (float): Seconds every call takes.
+            latency_per_text (float): Additional seconds per classified text.
+        """
+        self.latency = latency
+        self.latency_per_text = latency_per_text
+        self.calls = 0
+
+    def _classify(self, text: str, candidate_labels: list) -> dict:
+        lowered = text.lower()
+        seed = _stable_hash(text)
+        weights = []
+        for i, label in enumerate(candidate_labels):
+            # Pseudo-random weight per (text, label), boosted if the text mentions the label
+            weight = ((seed ^ (i * 2654435761)) % 997 + 1) / 997.0
+            if any(word in label and word in lowered for word in _KEYWORDS):
+                weight += 5.0
+            weights.append(weight)
+        total = sum(weights)
+        ranked = sorted(zip(candidate_labels, weights), key=lambda pair: pair[1], reverse=True)
+        return {
+            "sequence": text,
+            "labels": [label for label, _ in ranked],
+            "scores": [weight / total for _, weight in ranked],
+        }
+
+    def __call__(self, sequences, candidate_labels, **kwargs):
+        single = isinstance(sequences, str)
+        texts = [sequences] if single else list(sequences)
+        self.calls += 1
+        delay = self.latency + self.latency_per_text * len(texts)
+        if delay:
+            time.sleep(delay)
+        outputs = [self._classify(text, candidate_labels) for text in texts]
+        return outputs[0] if single else outputs
+
+
+def create_stub_chatbot(state_cache=None, event_broker=None, llm_latency: float = 0.0,
+                        nli_latency: float = 0.0):
+    """
+    Returns a ChatbotGenerative running on stub engines.
+
+    Args:
+        state_cache (StateCache): Passed to ChatbotGenerative.
+        event_broker (TeamEventBroker): Passed to ChatbotGenerative.
+        llm_latency (float): Seconds per LLM call.
+        nli_latency (float): Seconds per zero-shot classifier call.
+    """
+    from app.chatbot_generative import ChatbotGenerative
+    from app.emotion_analysis import EmotionDetector
+
+    return ChatbotGenerative(
+        state_cache=state_cache,
+        event_broker=event_broker,
+        model=StubLLM(latency=llm_latency),
+        emotion_detector=EmotionDetector(classifier=StubZeroShotClassifier(latency=nli_latency)),
+    )
@@ -0,0 +1,239 @@
+# tracing.py
+
+import functools
+import inspect
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# ========================================================
+# REQUEST TRACING
+# ========================================================
+#
+# Every HTTP request gets a Trace (see the middleware in main.py). Code on the
+# request path opens nested spans with `span(...)` or `@traced(...)`; SQL
+# statements are recorded by the engine hooks in storage.py. The spans are
+# summed per name into the Server-Timing response header and, if
+# TRACE_EXPORT is set, exported in the OTLP JSON format:
+#
+#   TRACE_EXPORT=traces.jsonl                      - one line per request
+#   TRACE_EXPORT=http://localhost:4318/v1/traces   - OTLP/HTTP collector
+#
+# Outside a request (scripts, tests) no trace is active and spans cost one
+# context variable lookup.
+
+TRACING_ENABLED = os.environ.get("TRACING_ENABLED", "1") != "0"
+TRACE_EXPORT = os.environ.get("TRACE_EXPORT", "")
+SERVICE_NAME = os.environ.get("TRACE_SERVICE_NAME", "emotion-chatbot")
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+_current_trace = ContextVar("current_trace", default=None)
+_current_span_id = ContextVar("current_span_id", default=None)
+
+
+def _new_id(num_bytes: int) -> str:
+    return os.urandom(num_bytes).hex()
+
+
+class Span:
+    __slots__ = ("name", "span_id", "parent_id", "start_ns", "end_ns", "attributes")
+
+    def __init__(self, name: str, parent_id: str = None, start_ns: int = None, attributes: dict = None):
+        """One timed operation of a trace. Times are Unix epoch nanoseconds."""
+        self.name = name
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes or {}
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+
+class Trace:
+    def __init__(self, name: str, traceparent: str = None):
+        """
+        Collects the spans of one request.
+
+        Args:
+            name (str): Name of the root span, e.g. "POST /chat".
+            traceparent (str): Incoming W3C `traceparent` header, continued if valid.
+        """
+        match = _TRACEPARENT.match(traceparent or "")
+        self.trace_id = match.group(1) if match else _new_id(16)
+        self.root = Span(name, parent_id=match.group(2) if match else None)
+        self.spans = []
+        # SQL hooks may record spans from the threadpool
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def finish(self):
+        self.root.end_ns = time.time_ns()
+
+    @property
+    def traceparent(self) -> str:
+        """W3C `traceparent` header identifying this request's root span."""
+        return f"00-{self.trace_id}-{self.root.span_id}-01"
+
+    def server_timing(self) -> str:
+        """
+        Returns the Server-Timing header value: the total duration of each span
+        name in order of first start, then the whole request.
+        """
+        totals = {}
+        counts = {}
+        with self._lock:
+            for span in sorted(self.spans, key=lambda s: s.start_ns):
+                totals[span.name] = totals.get(span.name, 0.0) + span.duration_ms
+                counts[span.name] = counts.get(span.name, 0) + 1
+        entries = [
+            f'{name};dur={dur:.1f}' + (f';desc="{counts[name]}x"' if counts[name] > 1 else "")
+            for name, dur in totals.items()
+        ]
+        entries.append(f"total;dur={self.root.duration_ms:.1f}")
+        return ", ".join(entries)
+
+    def to_otlp(self) -> dict:
+        """Returns the trace as an OTLP/JSON ExportTraceServiceRequest."""
+        def encode(span):
+            encoded = {
+                "traceId": self.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 2 if span is self.root else 1,  # SERVER / INTERNAL
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns or span.start_ns),
+                "attributes": [
+                    {"key": key, "value": {"stringValue": str(value)}} for key, value in span.attributes.items()
+                ],
+            }
+            if span.parent_id:
+                encoded["parentSpanId"] = span.parent_id
+            return encoded
+
+        with self._lock:
+            spans = [encode(self.root)] + [encode(span) for span in self.spans]
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "app.tracing"}, "spans": spans}],
+        }]}
+
+
+def start_trace(name: str, traceparent: str = None):
+    """
+    Makes a new Trace current for the calling context.
+
+    Returns:
+        tuple: (Trace, token for `end_trace`), or (None, None) if tracing is disabled.
+    """
+    if not TRACING_ENABLED:
+        return None, None
+    trace = Trace(name, traceparent)
+    return trace, (_current_trace.set(trace), _current_span_id.set(trace.root.span_id))
+
+
+def end_trace(trace, token):
+    """Finishes a trace started with `start_trace` and restores the previous context."""
+    if trace is None:
+        return
+    trace.finish()
+    trace_token, span_token = token
+    _current_span_id.reset(span_token)
+    _current_trace.reset(trace_token)
+
+
+def current_trace():
+    """Returns the Trace of the current request, or None."""
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Records the enclosed block as a child of the current span, if a trace is active.
+
+    Args:
+        name (str): Span name; spans with the same name are summed in Server-Timing.
+        **attributes: Exported with the span.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    current = Span(name, parent_id=_current_span_id.get(), attributes=attributes)
+    token = _current_span_id.set(current.span_id)
+    try:
+        yield current
+    finally:
+        _current_span_id.reset(token)
+        current.end_ns = time.time_ns()
+        trace.add(current)
+
+
+def record_span(name: str, start_ns: int, end_ns: int, **attributes):
+    """Adds an already finished span, e.g. from SQLAlchemy cursor hooks, to the current trace."""
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    finished = Span(name, parent_id=_current_span_id.get(), start_ns=start_ns, attributes=attributes)
+    finished.end_ns = end_ns
+    trace.add(finished)
+
+
+def traced(name: str):
+    """Decorator running a sync or async function inside `span(name)`."""
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# ========================================================
+# EXPORT
+# ========================================================
+
+_export_lock = threading.Lock()
+
+
+def export_trace(trace: Trace, target: str = None):
+    """
+    Writes a finished trace to TRACE_EXPORT: appended as one JSON line to a
+    file, or posted to an OTLP/HTTP collector URL. Errors are printed, never raised.
+
+    Args:
+        trace (Trace): The finished trace.
+        target (str): File path or URL. Defaults to TRACE_EXPORT.
+    """
+    target = target or TRACE_EXPORT
+    if not target:
+        return
+    payload = trace.to_otlp()
+    try:
+        if target.startswith(("http://", "https://")):
+            import httpx
+            httpx.post(target, json=payload, timeout=5.0).raise_for_status()
+        else:
+            line = json.dumps(payload, separators=(",", ":"))
+            with _export_lock, open(target, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    except Exception as e:
+        print(f"[ERROR exporting trace {trace.trace_id}] {e}")
@@ -0,0 +1,143 @@
+# benchmarks/bench_db_writes.py
+#
+# Concurrent-write benchmark comparing storage profiles.
+# Every worker thread mimics the write pattern of one /chat request:
+# insert the user message, update the member's accumulated state and
+# insert the assistant message, committing after each step.
+#
+# Usage:
+#   python -m benchmarks.bench_db_writes --threads 16 --requests 50
+#   python -m benchmarks.bench_db_writes --scratch-url postgresql+psycopg2://.../bench_scratch
+#
+# The benchmark creates and finally drops its own tables, so it refuses to run
+# against a database that already has tables.
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import inspect
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base, Team, Member, Message
+from app.storage import build_engine
+
+
+def _setup(engine, num_members: int):
+    """Creates the schema and one team with `num_members` members in an empty database."""
+    existing = inspect(engine).get_table_names()
+    if existing:
+        raise RuntimeError(
+            f"Refusing to benchmark {engine.url.render_as_string(hide_password=True)}: it already has tables "
+            f"({', '.join(sorted(existing)[:5])}). Use an empty scratch database."
+        )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        team = Team(name="BenchTeam")
+        db.add(team)
+        db.commit()
+        member_ids = []
+        for i in range(num_members):
+            member = Member(name=f"Member{i}", team_id=team.id)
+            db.add(member)
+            db.commit()
+            member_ids.append(member.id)
+        return team.id, member_ids
+
+
+def _worker(Session, team_id, member_id, num_requests, latencies, errors):
+    """Runs `num_requests` chat-shaped write transactions for one member."""
+    for i in range(num_requests):
+        start = time.perf_counter()
+        db = Session()
+        try:
+            db.add(Message(member_id=member_id, team_id=team_id, role="User", text=f"message {i}"))
+            db.commit()
+            member = db.get(Member, member_id)
+            member.num_lines = (member.num_lines or 0) + 1
+            member.save_accum_emotions({"trust": 0.5, "calm": 0.5})
+            db.commit()
+            db.add(Message(member_id=member_id, team_id=team_id, role="Assistant", text=f"reply {i}"))
+            db.commit()
+            latencies.append(time.perf_counter() - start)
+        except OperationalError as e:
+            db.rollback()
+            errors.append(str(e.orig))
+        finally:
+            db.close()
+
+
+def run_profile(label: str, url: str, profile: str, threads: int, requests: int) -> dict:
+    """
+    Runs the benchmark against one database URL and storage profile.
+
+    Args:
+        label (str): Name printed in the results table.
+        url (str): Database URL.
+        profile (str): Storage profile passed to `build_engine`.
+        threads (int): Number of concurrent writer threads (one member each).
+        requests (int): Requests per thread.
+
+    Returns:
+        dict: Throughput, latency percentiles and error count.
+    """
+    engine = build_engine(url, profile=profile)
+    team_id, member_ids = _setup(engine, threads)
+    Session = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    latencies, errors = [], []
+    workers = [
+        threading.Thread(target=_worker, args=(Session, team_id, member_id, requests, latencies, errors))
+        for member_id in member_ids
+    ]
+    start = time.perf_counter()
+    try:
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        # The database was empty before _setup, so only the benchmark's tables are dropped
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else float("nan")
+    return {
+        "profile": label,
+        "ok": len(latencies),
+        "errors": len(errors),
+        "req_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": pct(0.50),
+        "p99_ms": pct(0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-write benchmark for storage profiles.")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--scratch-url",
+                        help="Also benchmark this empty server database, e.g. a PostgreSQL scratch database.")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile in ("default", "production"):
+            url = f"sqlite:///{os.path.join(tmp, profile + '.db')}"
+            results.append(run_profile(f"sqlite-{profile}", url, profile, args.threads, args.requests))
+    if args.scratch_url:
+        results.append(run_profile("scratch-url", args.scratch_url, "production", args.threads, args.requests))
+
+    print(f"{'profile':<20}{'ok':>8}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for r in results:
+        print(f"{r['profile']:<20}{r['ok']:>8}{r['errors']:>8}{r['req_per_s']:>10.1f}{r['p50_ms']:>10.1f}{r['p99_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# benchmarks/bench_model_load.py
+#
+# Cold-start benchmark for the emotion model. For each loader, N fresh
+# processes load the model and run a first forward pass. Once all of them
+# are up, each reports its load time and memory: RSS, its anonymous and
+# file-backed parts, and PSS, which splits shared pages between the
+# processes and so approximates the real cost per worker.
+#
+# Usage:
+#   python -m app.model_cache export
+#   python -m benchmarks.bench_model_load --processes 4
+#   python -m benchmarks.bench_model_load --baseline /path/to/pytorch_model_dir
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from app.model_cache import EMOTION_MODEL, EMOTION_MODEL_DIR
+
+
+def _memory_mb() -> dict:
+    """Returns the current process' RSS, its anonymous and file-backed parts, and its PSS (Linux)."""
+    fields = {}
+    for path, keys in (("/proc/self/status", ("VmRSS", "RssAnon", "RssFile")),
+                       ("/proc/self/smaps_rollup", ("Pss",))):
+        with open(path) as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in keys:
+                    fields[key] = round(int(value.split()[0]) / 1024, 1)
+    return fields
+
+
+def _child(loader: str, source: str):
+    """
+    Loads the model, runs one forward pass, then waits for the parent before
+    reporting, so the memory is measured while all processes are alive.
+    """
+    start = time.perf_counter()
+    import torch
+    from transformers import AutoModelForSequenceClassification
+    from app.model_cache import load_local_model
+    imported = time.perf_counter()
+
+    if loader == "local":
+        model = load_local_model(source)
+    else:
+        model = AutoModelForSequenceClassification.from_pretrained(source).eval()
+    loaded = time.perf_counter()
+
+    input_ids = torch.arange(4, 36).unsqueeze(0)
+    input_ids[0, -1] = model.config.eos_token_id
+    with torch.no_grad():
+        logits = model(input_ids=input_ids).logits
+    inferred = time.perf_counter()
+
+    print("ready", flush=True)
+    sys.stdin.readline()
+
+    memory = _memory_mb()
+    print(json.dumps({
+        "loader": loader,
+        "import_s": round(imported - start, 3),
+        "load_s": round(loaded - imported, 3),
+        "first_inference_s": round(inferred - loaded, 3),
+        "rss_mb": memory.get("VmRSS"),
+        "anon_mb": memory.get("RssAnon"),
+        "file_mb": memory.get("RssFile"),
+        "pss_mb": memory.get("Pss"),
+        "logits": [round(x, 4) for x in logits[0].tolist()]
+    }), flush=True)
+    # Stay alive until every process has measured its memory
+    sys.stdin.readline()
+
+
+def _run(loader: str, source: str, processes: int) -> list:
+    """Starts `processes` children for a loader and collects their reports."""
+    children = [
+        subprocess.Popen([sys.executable, "-m", "benchmarks.bench_model_load", "--child", loader, "--source", source],
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        for _ in range(processes)
+    ]
+    for child in children:
+        if child.stdout.readline().strip() != "ready":
+            raise RuntimeError(f"{loader} loader failed to start")
+    results = []
+    for child in children:
+        child.stdin.write("\n")
+        child.stdin.flush()
+        results.append(json.loads(child.stdout.readline()))
+    for child in children:
+        child.stdin.write("\n")
+        child.stdin.flush()
+        child.wait()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare cold start and memory of model loaders.")
+    parser.add_argument("--model-dir", default=EMOTION_MODEL_DIR, help="Directory written by app.model_cache.")
+    parser.add_argument("--baseline", default=EMOTION_MODEL, help="Model id or directory loaded the default way.")
+    parser.add_argument("--processes", type=int, default=2, help="Concurrent processes per loader.")
+    parser.add_argument("--child", choices=["baseline", "local"], help=argparse.SUPPRESS)
+    parser.add_argument("--source", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child, args.source)
+        return
+
+    print(f"{'loader':<10}{'load s':>8}{'1st inf s':>11}{'RSS MB':>9}{'anon MB':>9}{'file MB':>9}{'PSS MB':>9}")
+    logits = {}
+    for loader, source in (("baseline", args.baseline), ("local", args.model_dir)):
+        for result in _run(loader, source, args.processes):
+            logits[loader] = result["logits"]
+            print(f"{loader:<10}{result['load_s']:>8.2f}{result['first_inference_s']:>11.2f}{result['rss_mb']:>9.0f}"
+                  f"{result['anon_mb']:>9.0f}{result['file_mb']:>9.0f}{result['pss_mb']:>9.0f}")
+
+    if logits["baseline"] != logits["local"]:
+        print("Note: the loaders produced different logits (different weights?).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+# benchmarks/bench_pipeline.py
+#
+# Benchmark suite for the analysis pipeline. Every (benchmark, size) case
+# runs in a fresh process on a fresh SQLite database and reports throughput,
+# p50/p99 latency per operation and peak RSS:
+#
+#   detect         EmotionDetector.detect_emotion, one line per operation
+#   stage_mapping  StageMapper distributions and their aggregation per line
+#   process_line   ChatbotGenerative.process_line, one line per operation
+#   ingest         _process_chat_log, CHUNK_LINES lines per operation
+#   analyze        analyze_conversation_db over the whole log, per line
+#
+# "stub" engines (app/stub_engines.py) isolate the application code and the
+# database; "real" engines use llama3.2 through Ollama and bart-large-mnli.
+#
+# Usage:
+#   python -m benchmarks.bench_pipeline run --sizes 1000,10000 --output results.json
+#   python -m benchmarks.bench_pipeline run --engines real --sizes 100 --benchmarks detect,process_line
+#   python -m benchmarks.bench_pipeline compare baseline.json results.json
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.chat_log_generator import ChatLogConfig, generate_team_log
+
+BENCHMARKS = ("detect", "stage_mapping", "process_line", "ingest", "analyze")
+DEFAULT_SIZES = (1000, 10000, 100000)
+CHUNK_LINES = 1000
+TEAM_NAME = "BenchTeam"
+
+# Relative change beyond which `compare` reports a regression
+DEFAULT_THRESHOLD = 0.15
+
+# ========================================================
+# INPUT DATA
+# ========================================================
+
+def synthetic_chat_log(num_lines: int, seed: int = 0) -> list:
+    """Returns `num_lines` reproducible '[timestamp] Name: message' lines of one 8-member team."""
+    return list(generate_team_log(ChatLogConfig(members=8, lines=num_lines, seed=seed)))
+
+
+def _parse(line: str):
+    """Splits a log line into (member name, message)."""
+    name_and_text = line.split("] ", 1)[-1]
+    name, text = name_and_text.split(": ", 1)
+    return name, text
+
+# ========================================================
+# MEASUREMENT
+# ========================================================
+
+def _percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def peak_rss_mb():
+    """
+    Returns the peak resident memory of this process in MB, or None where it
+    cannot be measured. `resource` is Unix-only; on Windows the peak working
+    set from psutil is used when psutil is installed.
+    """
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / (1024 * 1024), 1)
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def format_mb(value, width: int = 13) -> str:
+    """Right-aligns a memory figure, or 'n/a' when it was not measured."""
+    return f"{value:>{width}.1f}" if value is not None else f"{'n/a':>{width}}"
+
+
+def _summarize(benchmark: str, size: int, engines: str, items: int, seconds: float, latencies: list) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "benchmark": benchmark,
+        "size": size,
+        "engines": engines,
+        "items": items,
+        "seconds": round(seconds, 3),
+        "throughput": round(items / seconds, 2) if seconds > 0 else 0.0,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+# ========================================================
+# BENCHMARK CASES
+# ========================================================
+
+def _build_chatbot(engines: str):
+    if engines == "stub":
+        from app.stub_engines import create_stub_chatbot
+        return create_stub_chatbot()
+    from app.chatbot_generative import ChatbotGenerative
+    return ChatbotGenerative()
+
+
+def _open_session(db_dir: str):
+    from sqlalchemy.orm import sessionmaker
+    from app.db import Base
+    from app.storage import build_engine
+
+    engine = build_engine(f"sqlite:///{os.path.join(db_dir, 'bench.db')}")
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(bind=engine, autoflush=False)()
+
+
+def _timed_calls(fn, args_list: list) -> tuple:
+    """Calls `fn(*args)` for every entry and returns (total seconds, per-call latencies)."""
+    latencies = []
+    start = time.perf_counter()
+    for args in args_list:
+        t0 = time.perf_counter()
+        fn(*args)
+        latencies.append(time.perf_counter() - t0)
+    return time.perf_counter() - start, latencies
+
+
+def run_case(benchmark: str, size: int, engines: str, mode: str, db_dir: str) -> dict:
+    """Runs one benchmark case in the current process and returns its summary."""
+    lines = synthetic_chat_log(size)
+    parsed = [_parse(line) for line in lines]
+
+    if benchmark == "detect":
+        detector = _build_chatbot(engines).emotion_detector
+        seconds, latencies = _timed_calls(detector.detect_emotion, [(text,) for _, text in parsed])
+        return _summarize(benchmark, size, engines, size, seconds, latencies)
+
+    if benchmark == "stage_mapping":
+        from app.emotion_analysis import EmotionDetector
+        from app.stub_engines import StubLLM, StubZeroShotClassifier
+        from app.stage_mapping import StageMapper
+
+        # Emotions come from the stub classifier; only the mapping is measured
+        detector = EmotionDetector(classifier=StubZeroShotClassifier())
+        top_emotions = [r["top_emotions"] for r in detector.detect_emotions([text for _, text in parsed])]
+        mapper = StageMapper(llama_model=StubLLM())
+        accumulated = {}
+
+        def map_line(top5):
+            mapper.get_stage_distribution(top5)
+            for emotion in top5:
+                accumulated[emotion["label"]] = accumulated.get(emotion["label"], 0.0) + emotion["score"]
+            mapper.get_stage_distribution_from_entire_emotions(accumulated)
+
+        seconds, latencies = _timed_calls(map_line, [(top5,) for top5 in top_emotions])
+        return _summarize(benchmark, size, engines, size, seconds, latencies)
+
+    chatbot = _build_chatbot(engines)
+    engine, db = _open_session(db_dir)
+    try:
+        if benchmark == "process_line":
+            seconds, latencies = _timed_calls(
+                lambda name, text: chatbot.process_line(db, TEAM_NAME, name, text, mode=mode), parsed
+            )
+        elif benchmark == "ingest":
+            chunks = [(db, TEAM_NAME, lines[i:i + CHUNK_LINES]) for i in range(0, size, CHUNK_LINES)]
+            seconds, latencies = _timed_calls(chatbot._process_chat_log, chunks)
+        elif benchmark == "analyze":
+            latencies = []
+            process_line = chatbot.process_line
+
+            def timed_process_line(*args, **kwargs):
+                t0 = time.perf_counter()
+                try:
+                    return process_line(*args, **kwargs)
+                finally:
+                    latencies.append(time.perf_counter() - t0)
+
+            chatbot.process_line = timed_process_line
+            start = time.perf_counter()
+            chatbot.analyze_conversation_db(db, TEAM_NAME, lines)
+            seconds = time.perf_counter() - start
+        else:
+            raise ValueError(f"Unknown benchmark '{benchmark}'.")
+    finally:
+        db.close()
+        engine.dispose()
+    return _summarize(benchmark, size, engines, size, seconds, latencies)
+
+
+def _run_child(benchmark: str, size: int, engines: str, mode: str) -> dict:
+    """Runs a case in a fresh process, so peak RSS and caches are per case."""
+    with tempfile.TemporaryDirectory() as db_dir:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_pipeline", "child", benchmark, str(size),
+             "--engines", engines, "--mode", mode, "--db-dir", db_dir],
+            check=True, stdout=subprocess.PIPE, text=True
+        ).stdout
+    return json.loads(output)
+
+
+def _metadata(engines: str, mode: str) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "engines": engines,
+        "mode": mode,
+    }
+
+# ========================================================
+# COMPARISON
+# ========================================================
+
+# Metric -> +1 if higher is better, -1 if lower is better
+METRICS = {"throughput": 1, "p50_ms": -1, "p99_ms": -1, "peak_rss_mb": -1}
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Compares two result files case by case.
+
+    Args:
+        baseline (dict): Stored results.
+        current (dict): New results.
+        threshold (float): Relative change counted as a regression, e.g. 0.15 for 15%.
+
+    Returns:
+        list: One row per (case, metric): (case, metric, baseline, current, change, regressed).
+    """
+    def key(result):
+        return result["benchmark"], result["size"], result["engines"]
+
+    stored = {key(result): result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        before = stored.get(key(result))
+        if before is None:
+            continue
+        for metric, direction in METRICS.items():
+            old, new = before[metric], result[metric]
+            if old is None or new is None:
+                continue  # Not measured on this platform
+            change = (new - old) / old if old else 0.0
+            rows.append((key(result), metric, old, new, change, change * direction < -threshold))
+    return rows
+
+# ========================================================
+# COMMAND LINE
+# ========================================================
+
+def _print_row(r: dict):
+    print(f"{r['benchmark']:<15}{r['size']:>8}{r['throughput']:>12.1f}{r['p50_ms']:>10.3f}"
+          f"{r['p99_ms']:>10.3f}{format_mb(r['peak_rss_mb'])}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analysis pipeline.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run benchmark cases and write their results.")
+    run.add_argument("--engines", choices=["stub", "real"], default="stub")
+    run.add_argument("--benchmarks", default=",".join(BENCHMARKS), help="Comma-separated subset of " + ", ".join(BENCHMARKS))
+    run.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES), help="Comma-separated line counts.")
+    run.add_argument("--mode", choices=["analysis", "conversation"], default="analysis",
+                     help="process_line mode; conversation also generates replies.")
+    run.add_argument("--output", help="JSON file for the results.")
+
+    compare = commands.add_parser("compare", help="Flag regressions of new results against a baseline.")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    child = commands.add_parser("child")
+    child.add_argument("benchmark", choices=BENCHMARKS)
+    child.add_argument("size", type=int)
+    child.add_argument("--engines", default="stub")
+    child.add_argument("--mode", default="analysis")
+    child.add_argument("--db-dir", required=True)
+
+    args = parser.parse_args()
+
+    if args.command == "child":
+        result = run_case(args.benchmark, args.size, args.engines, args.mode, args.db_dir)
+        print(json.dumps(result), flush=True)
+        return
+
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        rows = compare_results(baseline, current, args.threshold)
+        print(f"{'case':<30}{'metric':<13}{'baseline':>11}{'current':>11}{'change':>9}")
+        for (benchmark, size, engines), metric, old, new, change, regressed in rows:
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{f'{benchmark}/{size}/{engines}':<30}{metric:<13}{old:>11.3f}{new:>11.3f}{change:>+9.1%}{flag}")
+        regressions = sum(1 for row in rows if row[-1])
+        print(f"{regressions} regression(s) beyond {args.threshold:.0%}.")
+        sys.exit(1 if regressions else 0)
+
+    benchmarks = [b for b in args.benchmarks.split(",") if b]
+    unknown = set(benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    print(f"{'benchmark':<15}{'size':>8}{'items/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'peak RSS MB':>13}")
+    results = []
+    for benchmark in benchmarks:
+        for size in sizes:
+            result = _run_child(benchmark, size, args.engines, args.mode)
+            results.append(result)
+            _print_row(result)
+
+    report = {"meta": _metadata(args.engines, args.mode), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
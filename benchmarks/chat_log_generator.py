@@ -0,0 +1,330 @@
+# benchmarks/chat_log_generator.py
+#
+# Seeded generator of synthetic team chat logs in the
+# "[dd.mm.yy, HH:MM:SS] Name: message" format that
+# ChatbotGenerative._extract_members_and_messages parses.
+#
+# Every team's conversation moves through the Tuckman stages in order. The
+# stage mix sets the share of lines per stage (stages with weight 0 are
+# skipped, so the last one with weight > 0 is the expected final stage).
+# Messages mention emotions of their stage, with some lines borrowing from a
+# neighbouring stage and some off-topic chatter. Message lengths in words
+# follow a log-normal distribution; a few members write most of the lines.
+#
+# Lines are produced one at a time, so logs of millions of lines are written
+# in constant memory. The same seed and options always give the same logs.
+#
+# Usage:
+#   python -m benchmarks.chat_log_generator --lines 1000 > team.txt
+#   python -m benchmarks.chat_log_generator --teams 8 --members 12 --lines 1000000 --output-dir logs/
+#   python -m benchmarks.chat_log_generator --stage-mix Forming=1,Storming=3,Norming=0,Performing=0,Adjourning=0
+
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+
+STAGES = ("Forming", "Storming", "Norming", "Performing", "Adjourning")
+
+DEFAULT_STAGE_MIX = {"Forming": 0.2, "Storming": 0.25, "Norming": 0.2, "Performing": 0.25, "Adjourning": 0.1}
+
+# Emotion phrases per stage, taken from StageMapper.stage_emotion_map
+_STAGE_EMOTIONS = {
+    "Forming": [
+        "excitement", "anticipation", "curiosity", "interest", "hope",
+        "mild anxiety", "nervousness", "cautious optimism", "insecurity",
+    ],
+    "Storming": [
+        "anger", "frustration", "tension", "resentment", "disappointment",
+        "fear of conflict", "defensiveness", "uncertainty about direction",
+        "discouragement", "rivalry", "unfairness", "conflict",
+    ],
+    "Norming": [
+        "acceptance of roles", "cohesion", "trust", "renewed hope", "commitment",
+        "calm", "empathy", "camaraderie", "relief from resolved conflict", "unity",
+    ],
+    "Performing": [
+        "confidence in the team", "mutual respect", "enthusiasm about our goals",
+        "flow", "synergy", "empowerment", "self-confidence", "pride in our work",
+        "accomplishment", "joy in collaboration", "satisfaction with the outcomes",
+    ],
+    "Adjourning": [
+        "a sense of loss", "nostalgia for the group", "sadness about the closure",
+        "relief now that we are done", "thankfulness for the experience",
+        "disorientation", "uncertainty about next steps", "enthusiasm for the future",
+    ],
+}
+
+_STAGE_TOPICS = {
+    "Forming": ["the kickoff", "who takes which role", "the new repo", "our first meeting", "the project scope"],
+    "Storming": ["the deadline", "the code reviews", "the architecture decision", "the sprint plan", "the last merge"],
+    "Norming": ["our working agreement", "the standups", "the review rotation", "the shared board", "how we split tasks"],
+    "Performing": ["the release", "the demo", "the sprint results", "the customer feedback", "the new feature"],
+    "Adjourning": ["the handover", "the final report", "the retrospective", "the last week", "our farewell lunch"],
+}
+
+_TEMPLATES = [
+    "I feel {emotion} about {topic}.",
+    "Honestly there is a lot of {emotion} around {topic}.",
+    "Thinking of {topic} gives me {emotion}.",
+    "Not sure about the others, but {topic} fills me with {emotion}.",
+    "When I think about {topic} I mostly feel {emotion}.",
+    "There is real {emotion} in the team since {topic}.",
+]
+
+_SHORT_TEMPLATES = ["So much {emotion}.", "Feeling {emotion}.", "Just {emotion} here.", "{emotion_cap}, honestly."]
+
+_OFF_TOPIC = [
+    "Did anyone see the match yesterday?",
+    "Lunch at twelve?",
+    "I'll be ten minutes late.",
+    "Can someone share the meeting link?",
+    "Happy Friday everyone!",
+    "The coffee machine is broken again.",
+    "Who has the charger?",
+    "Ok",
+    "Thanks!",
+]
+
+# Clauses appended until a message reaches its drawn length
+_FILLERS = [
+    "to be fair", "at least for now", "if I am honest", "as far as I can tell",
+    "and I said so in the meeting", "which surprised me", "compared to last week",
+    "and I think the others see it too", "even if nobody says it out loud",
+    "especially after yesterday", "we should talk about it", "let's see how it goes",
+]
+
+_FIRST_NAMES = [
+    "Alice", "Bob", "Charlie", "Dana", "Emil", "Fatima", "Greta", "Hiro", "Ines", "Jonas",
+    "Kemal", "Lena", "Mateo", "Nora", "Omar", "Priya", "Quentin", "Rosa", "Sven", "Tara",
+    "Umut", "Vera", "Wen", "Xenia", "Yusuf", "Zoe",
+]
+
+
+def parse_stage_mix(text: str) -> dict:
+    """Parses 'Forming=1,Storming=2,...' into a stage -> weight mapping; missing stages get 0."""
+    mix = {stage: 0.0 for stage in STAGES}
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        stage, _, weight = part.partition("=")
+        stage = stage.strip().capitalize()
+        if stage not in mix:
+            raise ValueError(f"Unknown stage '{stage}', expected one of {', '.join(STAGES)}.")
+        mix[stage] = float(weight)
+    return mix
+
+
+class ChatLogConfig:
+    def __init__(self, teams: int = 1, members: int = 5, lines: int = 1000, stage_mix: dict = None,
+                 length_mean: float = 14.0, length_sigma: float = 0.6, off_topic: float = 0.15,
+                 stage_noise: float = 0.2, seconds_between: float = 90.0, seed: int = 0,
+                 start: float = 1_700_000_000):
+        """
+        Options of a synthetic log set.
+
+        Args:
+            teams (int): Number of teams, one log each.
+            members (int): Members per team.
+            lines (int): Lines per team.
+            stage_mix (dict): Relative share of lines per Tuckman stage.
+            length_mean (float): Mean message length in words.
+            length_sigma (float): Spread of the log-normal length distribution.
+            off_topic (float): Share of off-topic lines.
+            stage_noise (float): Share of on-topic lines using a neighbouring stage's emotions.
+            seconds_between (float): Mean gap between two lines.
+            seed (int): Seed; equal options and seeds give equal logs.
+            start (float): Unix time of the first line.
+        """
+        if teams < 1 or members < 1 or lines < 0:
+            raise ValueError("teams and members must be at least 1 and lines at least 0.")
+        self.stage_mix = dict(DEFAULT_STAGE_MIX if stage_mix is None else stage_mix)
+        unknown = set(self.stage_mix) - set(STAGES)
+        if unknown:
+            raise ValueError(f"Unknown stages: {', '.join(sorted(unknown))}.")
+        if any(weight < 0 for weight in self.stage_mix.values()) or sum(self.stage_mix.values()) <= 0:
+            raise ValueError("stage_mix weights must be non-negative and not all 0.")
+        self.teams = teams
+        self.members = members
+        self.lines = lines
+        self.length_mean = length_mean
+        self.length_sigma = length_sigma
+        self.off_topic = off_topic
+        self.stage_noise = stage_noise
+        self.seconds_between = seconds_between
+        self.seed = seed
+        self.start = start
+
+    def as_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+def team_name(index: int) -> str:
+    return f"Team{index + 1:03d}"
+
+
+def member_names(count: int, rng: random.Random) -> list:
+    """Returns `count` distinct member names in random order."""
+    names = list(_FIRST_NAMES)
+    rng.shuffle(names)
+    return [names[i % len(names)] + (f" {i // len(names) + 1}" if i >= len(names) else "")
+            for i in range(count)]
+
+
+def stage_schedule(config: ChatLogConfig) -> list:
+    """Returns (stage, number of lines) in Tuckman order for one team's log."""
+    total = sum(config.stage_mix.values())
+    stages = [stage for stage in STAGES if config.stage_mix.get(stage, 0) > 0]
+    schedule = []
+    assigned = 0
+    for i, stage in enumerate(stages):
+        if i == len(stages) - 1:
+            count = config.lines - assigned
+        else:
+            count = round(config.lines * config.stage_mix[stage] / total)
+        schedule.append((stage, count))
+        assigned += count
+    return schedule
+
+
+def expected_stage(config: ChatLogConfig) -> str:
+    """The stage a team ends in: the last stage of the schedule."""
+    return stage_schedule(config)[-1][0]
+
+
+class _MessageWriter:
+    def __init__(self, config: ChatLogConfig, rng: random.Random):
+        self.config = config
+        self.rng = rng
+        # Log-normal parameters giving the requested mean length
+        self.mu = math.log(max(config.length_mean, 1.0)) - config.length_sigma ** 2 / 2
+
+    def _length(self) -> int:
+        return max(1, min(200, round(self.rng.lognormvariate(self.mu, self.config.length_sigma))))
+
+    def _emotion_stage(self, stage: str) -> str:
+        if self.rng.random() >= self.config.stage_noise:
+            return stage
+        i = STAGES.index(stage) + self.rng.choice((-1, 1))
+        return STAGES[min(max(i, 0), len(STAGES) - 1)]
+
+    def message(self, stage: str) -> str:
+        rng = self.rng
+        length = self._length()
+        if rng.random() < self.config.off_topic:
+            return rng.choice(_OFF_TOPIC)
+        emotion = rng.choice(_STAGE_EMOTIONS[self._emotion_stage(stage)])
+        if length <= 4:
+            return rng.choice(_SHORT_TEMPLATES).format(emotion=emotion, emotion_cap=emotion[0].upper() + emotion[1:])
+        topic = rng.choice(_STAGE_TOPICS[stage])
+        text = rng.choice(_TEMPLATES).format(emotion=emotion, topic=topic)
+        # Clauses are added until the drawn length is reached; the sentence itself is kept whole
+        words = len(text.split())
+        clauses = []
+        while words < length:
+            clause = rng.choice(_FILLERS)
+            clauses.append(clause)
+            words += len(clause.split())
+        if not clauses:
+            return text
+        return text[:-1] + ", " + ", ".join(clauses) + text[-1]
+
+
+def generate_team_log(config: ChatLogConfig, team_index: int = 0):
+    """
+    Yields the lines of one team's log.
+
+    Args:
+        config (ChatLogConfig): Options of the log set.
+        team_index (int): Which team; every team has its own random stream.
+
+    Yields:
+        str: '[dd.mm.yy, HH:MM:SS] Name: message' lines without line break.
+    """
+    # String seeds hash the same in every process
+    rng = random.Random(f"{config.seed}:{team_index}")
+    names = member_names(config.members, rng)
+    # Zipf-like activity: the first members write most of the lines
+    activity = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(names))))
+    writer = _MessageWriter(config, rng)
+    timestamp = config.start
+    for stage, count in stage_schedule(config):
+        for _ in range(count):
+            timestamp += rng.expovariate(1.0 / config.seconds_between) if config.seconds_between > 0 else 0
+            name = rng.choices(names, cum_weights=activity)[0]
+            stamp = time.strftime("%d.%m.%y, %H:%M:%S", time.gmtime(timestamp))
+            yield f"[{stamp}] {name}: {writer.message(stage)}"
+
+
+def generate_logs(config: ChatLogConfig):
+    """Yields (team name, line iterator) for every team."""
+    for index in range(config.teams):
+        yield team_name(index), generate_team_log(config, index)
+
+
+def write_logs(config: ChatLogConfig, output_dir: str) -> dict:
+    """
+    Writes one '<team>.txt' file per team and a manifest.json with the options
+    and the expected final stage of every team.
+
+    Returns:
+        dict: The manifest.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    teams = {}
+    for name, lines in generate_logs(config):
+        path = os.path.join(output_dir, f"{name}.txt")
+        with open(path, "w", encoding="utf-8", buffering=1 << 20) as f:
+            for line in lines:
+                f.write(line)
+                f.write("\n")
+        teams[name] = {"file": os.path.basename(path), "lines": config.lines,
+                       "expected_stage": expected_stage(config)}
+    manifest = {"config": config.as_dict(), "teams": teams}
+    with open(os.path.join(output_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic team chat logs.")
+    parser.add_argument("--teams", type=int, default=1)
+    parser.add_argument("--members", type=int, default=5, help="Members per team.")
+    parser.add_argument("--lines", type=int, default=1000, help="Lines per team.")
+    parser.add_argument("--stage-mix", type=parse_stage_mix,
+                        default=DEFAULT_STAGE_MIX, help="e.g. Forming=1,Storming=2,Norming=1,Performing=0,Adjourning=0")
+    parser.add_argument("--length-mean", type=float, default=14.0, help="Mean message length in words.")
+    parser.add_argument("--length-sigma", type=float, default=0.6, help="Log-normal spread of message lengths.")
+    parser.add_argument("--off-topic", type=float, default=0.15, help="Share of off-topic lines.")
+    parser.add_argument("--stage-noise", type=float, default=0.2, help="Share of lines with a neighbouring stage's emotions.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output-dir", help="Directory for one file per team; stdout if omitted (single team only).")
+    args = parser.parse_args()
+
+    config = ChatLogConfig(
+        teams=args.teams, members=args.members, lines=args.lines, stage_mix=args.stage_mix,
+        length_mean=args.length_mean, length_sigma=args.length_sigma, off_topic=args.off_topic,
+        stage_noise=args.stage_noise, seed=args.seed,
+    )
+
+    if args.output_dir:
+        start = time.perf_counter()
+        manifest = write_logs(config, args.output_dir)
+        print(f"Wrote {len(manifest['teams'])} logs of {config.lines} lines to {args.output_dir} "
+              f"in {time.perf_counter() - start:.1f} s.", file=sys.stderr)
+        return
+
+    if config.teams > 1:
+        parser.error("--output-dir is required for more than one team.")
+    out = sys.stdout
+    for line in generate_team_log(config):
+        out.write(line)
+        out.write("\n")
+
+
+if __name__ == "__main__":
+    main()
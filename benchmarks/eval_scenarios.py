@@ -0,0 +1,331 @@
+# benchmarks/eval_scenarios.py
+#
+# Parallel evaluation of the Tuckman scenarios for one or more engine
+# configurations. Every configuration gets its own pool of worker processes;
+# each worker loads the models once and writes to its own SQLite database.
+# Every line is processed once: analyze_conversation_db gives the final stage,
+# and the per-line emotions are taken from its process_line calls.
+#
+# Model outputs are cached per configuration and scenario through the
+# record/replay layer (app/replay.py), so repeated runs only pay for calls
+# that changed. Configurations are compared in one table: stage accuracy,
+# emotion top-5 accuracy, lines per second and peak worker memory.
+#
+# A configuration is "name:key=value,...". Keys are `engines` (live or stub),
+# `llm` (Ollama model), `emotion_model` (Hugging Face id or local directory)
+# and environment variables such as EMOTION_PIPELINE_BATCH_SIZE, which are set
+# in the workers before the app is imported.
+#
+# Usage:
+#   python -m benchmarks.eval_scenarios --workers 4
+#   python -m benchmarks.eval_scenarios --config llama:llm=llama3.2 --config mistral:llm=mistral
+#   python -m benchmarks.eval_scenarios --config stub:engines=stub --logs-dir logs/ --output eval.json
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_pipeline import format_mb, peak_rss_mb
+
+DEFAULT_CACHE_DIR = "./eval_cache"
+
+_LINE_PATTERN = re.compile(r"(?:\[(.*?)\] )?(.*?): (.*)")
+
+
+class EngineConfig:
+    def __init__(self, name: str, engines: str = "live", llm: str = "llama3.2", emotion_model: str = None,
+                 env: dict = None):
+        """
+        One engine configuration to evaluate.
+
+        Args:
+            name (str): Label in the report.
+            engines (str): 'live' for Ollama and the zero-shot pipeline, 'stub' for app/stub_engines.py.
+            llm (str): Ollama model name.
+            emotion_model (str): Zero-shot model id or directory; the app's default if omitted.
+            env (dict): Environment variables set in the workers.
+        """
+        if engines not in ("live", "stub"):
+            raise ValueError(f"engines must be 'live' or 'stub', not '{engines}'.")
+        self.name = name
+        self.engines = engines
+        self.llm = llm
+        self.emotion_model = emotion_model
+        self.env = dict(env or {})
+
+    @classmethod
+    def parse(cls, spec: str) -> "EngineConfig":
+        """Parses 'name:engines=live,llm=mistral,EMOTION_PIPELINE_BATCH_SIZE=8'."""
+        name, _, options = spec.partition(":")
+        kwargs = {"env": {}}
+        for option in filter(None, options.split(",")):
+            key, sep, value = option.partition("=")
+            if not sep:
+                raise ValueError(f"Expected key=value in configuration '{spec}', got '{option}'.")
+            if key in ("engines", "llm", "emotion_model"):
+                kwargs[key] = value
+            elif key.isupper():
+                kwargs["env"][key] = value
+            else:
+                raise ValueError(f"Unknown option '{key}' in configuration '{spec}'.")
+        return cls(name or "default", **kwargs)
+
+    def cache_key(self) -> str:
+        """Name of the cache directory; changes whenever an option that affects model outputs changes."""
+        options = json.dumps([self.engines, self.llm, self.emotion_model, self.env], sort_keys=True)
+        return f"{re.sub(r'[^A-Za-z0-9_.-]', '_', self.name)}-{hashlib.sha256(options.encode()).hexdigest()[:10]}"
+
+    def as_dict(self) -> dict:
+        return dict(self.__dict__)
+
+# ========================================================
+# SCENARIOS
+# ========================================================
+
+def load_scenarios(scenario_file: str = None, logs_dir: str = None) -> list:
+    """
+    Returns the scenarios to evaluate: tests/scenario_data.py, a JSON file of the
+    same structure, and/or the logs and manifest written by chat_log_generator.
+
+    Lines of generated logs have no expected emotions and only count for stage accuracy.
+    """
+    scenarios = []
+    if scenario_file:
+        with open(scenario_file, encoding="utf-8") as f:
+            scenarios.extend(json.load(f))
+    if logs_dir:
+        with open(os.path.join(logs_dir, "manifest.json")) as f:
+            manifest = json.load(f)
+        for team_name, team in manifest["teams"].items():
+            with open(os.path.join(logs_dir, team["file"]), encoding="utf-8") as f:
+                lines = [{"text": line.rstrip("\n"), "expected_emotions": []} for line in f if line.strip()]
+            scenarios.append({"team_name": team_name, "expected_stage": team["expected_stage"], "lines": lines})
+    if not scenarios:
+        from tests.scenario_data import SCENARIOS
+        scenarios = SCENARIOS
+    return scenarios
+
+
+def score_scenario(scenario: dict, final_stage: str, line_emotions: dict) -> dict:
+    """
+    Scores one analyzed scenario.
+
+    Args:
+        scenario (dict): team_name, expected_stage and lines with their expected emotions.
+        final_stage (str): The stage returned by analyze_conversation_db.
+        line_emotions (dict): (member name, message) -> list of top-5 emotion labels of each occurrence.
+
+    Returns:
+        dict: stage_correct, emotion_correct and emotion_lines (lines with expected emotions).
+    """
+    remaining = {key: list(labels) for key, labels in line_emotions.items()}
+    emotion_correct = emotion_lines = 0
+    for line in scenario["lines"]:
+        expected = {e.lower().strip() for e in line.get("expected_emotions", [])}
+        if not expected:
+            continue
+        emotion_lines += 1
+        match = _LINE_PATTERN.match(line["text"].replace("\u200e", ""))
+        occurrences = remaining.get((match.group(2), match.group(3)), []) if match else []
+        top5 = occurrences.pop(0) if occurrences else []
+        if expected & {label.lower().strip() for label in top5}:
+            emotion_correct += 1
+    return {
+        "stage_correct": final_stage == scenario["expected_stage"],
+        "emotion_correct": emotion_correct,
+        "emotion_lines": emotion_lines,
+    }
+
+# ========================================================
+# WORKERS
+# ========================================================
+
+# State of the current worker process, set up once by _init_worker
+_worker = {}
+
+
+class _LazyClassifier:
+    def __init__(self, emotion_model: str = None):
+        """Zero-shot pipeline loaded on the first call, so fully cached runs never load it."""
+        self.emotion_model = emotion_model
+        self._classifier = None
+
+    def __call__(self, *args, **kwargs):
+        if self._classifier is None:
+            if self.emotion_model:
+                from transformers import pipeline
+                self._classifier = pipeline("zero-shot-classification", model=self.emotion_model)
+            else:
+                from app.emotion_analysis import _load_classifier
+                self._classifier = _load_classifier()
+        return self._classifier(*args, **kwargs)
+
+
+def _build_chatbot(config: EngineConfig, cached: bool):
+    from app.chatbot_generative import ChatbotGenerative
+    from app.emotion_analysis import EmotionDetector
+    from app.replay import ReplayClassifier, ReplayLLM
+
+    if config.engines == "stub":
+        from app.stub_engines import StubLLM, StubZeroShotClassifier
+        model, classifier = StubLLM(), StubZeroShotClassifier()
+    else:
+        from langchain_ollama import OllamaLLM
+        model, classifier = OllamaLLM(model=config.llm), _LazyClassifier(config.emotion_model)
+
+    if cached:
+        # The fixture is swapped per scenario in _run_scenario
+        model, classifier = ReplayLLM(None, model), ReplayClassifier(None, classifier)
+    return ChatbotGenerative(model=model, emotion_detector=EmotionDetector(classifier=classifier))
+
+
+def _init_worker(config: EngineConfig, db_dir: str, cache_dir: str):
+    os.environ.update(config.env)
+
+    from sqlalchemy.orm import sessionmaker
+    from app.db import Base
+    from app.storage import build_engine
+
+    engine = build_engine(f"sqlite:///{os.path.join(db_dir, f'worker-{os.getpid()}.db')}")
+    Base.metadata.create_all(bind=engine)
+    chatbot = _build_chatbot(config, cached=cache_dir is not None)
+
+    # Collects the emotions of every line analyze_conversation_db processes
+    line_emotions = {}
+    process_line = chatbot.process_line
+
+    def recording_process_line(db, team_name, member_name, text, mode="conversation"):
+        result = process_line(db, team_name, member_name, text, mode=mode)
+        top5 = sorted(result[4].items(), key=lambda item: item[1], reverse=True)[:5]
+        line_emotions.setdefault((member_name, text), []).append([label for label, _ in top5])
+        return result
+
+    chatbot.process_line = recording_process_line
+    _worker.update(config=config, cache_dir=cache_dir, chatbot=chatbot, line_emotions=line_emotions,
+                   session_factory=sessionmaker(bind=engine, autoflush=False))
+
+
+def _run_scenario(scenario: dict) -> dict:
+    from app.replay import ReplayStore
+
+    chatbot = _worker["chatbot"]
+    store = None
+    if _worker["cache_dir"]:
+        team_file = re.sub(r"[^A-Za-z0-9_.-]", "_", scenario["team_name"]) + ".json"
+        store = ReplayStore(os.path.join(_worker["cache_dir"], team_file), "record")
+        chatbot.model.store = store
+        chatbot.emotion_detector.zero_shot_classifier.store = store
+
+    _worker["line_emotions"].clear()
+    start = time.perf_counter()
+    with _worker["session_factory"]() as db:
+        final_stage, _, _ = chatbot.analyze_conversation_db(
+            db, scenario["team_name"], "\n".join(line["text"] for line in scenario["lines"])
+        )
+    seconds = time.perf_counter() - start
+    if store is not None:
+        store.save()
+
+    result = score_scenario(scenario, final_stage, _worker["line_emotions"])
+    result.update(
+        team_name=scenario["team_name"],
+        expected_stage=scenario["expected_stage"],
+        final_stage=final_stage or "Uncertain",
+        lines=len(scenario["lines"]),
+        seconds=round(seconds, 3),
+        cache_hits=store.hits if store else 0,
+        peak_rss_mb=peak_rss_mb(),
+    )
+    return result
+
+# ========================================================
+# EVALUATION
+# ========================================================
+
+def evaluate(config: EngineConfig, scenarios: list, workers: int = 2, cache_dir: str = DEFAULT_CACHE_DIR) -> dict:
+    """
+    Evaluates all scenarios with one configuration in a pool of worker processes.
+
+    Args:
+        config (EngineConfig): The configuration.
+        scenarios (list): Scenarios as returned by `load_scenarios`.
+        workers (int): Worker processes.
+        cache_dir (str): Root of the model output cache, None to call the models every time.
+
+    Returns:
+        dict: The configuration's summary and its per-scenario results.
+    """
+    config_cache = os.path.join(cache_dir, config.cache_key()) if cache_dir else None
+    # Fresh interpreters, so the configuration's environment is read when the app is imported
+    context = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as db_dir, context.Pool(
+        min(workers, len(scenarios)) or 1, initializer=_init_worker, initargs=(config, db_dir, config_cache)
+    ) as pool:
+        results = list(pool.imap_unordered(_run_scenario, scenarios))
+    seconds = time.perf_counter() - start
+
+    results.sort(key=lambda r: r["team_name"])
+    lines = sum(r["lines"] for r in results)
+    emotion_lines = sum(r["emotion_lines"] for r in results)
+    summary = {
+        "config": config.name,
+        "scenarios": len(results),
+        "stage_accuracy": round(100.0 * sum(r["stage_correct"] for r in results) / len(results), 1) if results else 0.0,
+        "emotion_accuracy": round(100.0 * sum(r["emotion_correct"] for r in results) / emotion_lines, 1)
+        if emotion_lines else None,
+        "lines": lines,
+        "seconds": round(seconds, 2),
+        "lines_per_second": round(lines / seconds, 1) if seconds else 0.0,
+        "ms_per_line": round(1000 * sum(r["seconds"] for r in results) / lines, 2) if lines else 0.0,
+        "peak_rss_mb": max((r["peak_rss_mb"] for r in results if r["peak_rss_mb"] is not None), default=None),
+        "cache_hits": sum(r["cache_hits"] for r in results),
+    }
+    return {"summary": summary, "options": config.as_dict(), "scenarios": results}
+
+
+def _print_table(summaries: list):
+    print(f"{'config':<20}{'scenarios':>10}{'stage %':>9}{'emotion %':>11}{'lines':>8}{'lines/s':>10}"
+          f"{'ms/line':>9}{'peak RSS MB':>13}{'cache hits':>12}")
+    for s in summaries:
+        emotion = "-" if s["emotion_accuracy"] is None else f"{s['emotion_accuracy']:.1f}"
+        print(f"{s['config']:<20}{s['scenarios']:>10}{s['stage_accuracy']:>9.1f}{emotion:>11}{s['lines']:>8}"
+              f"{s['lines_per_second']:>10.1f}{s['ms_per_line']:>9.2f}{format_mb(s['peak_rss_mb'])}{s['cache_hits']:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the Tuckman scenarios for engine configurations.")
+    parser.add_argument("--config", action="append", type=EngineConfig.parse, default=[],
+                        help="name:key=value,... (repeatable); keys: engines, llm, emotion_model, ENV_VARS.")
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes per configuration.")
+    parser.add_argument("--scenarios", help="JSON file of scenarios; tests/scenario_data.py if omitted.")
+    parser.add_argument("--logs-dir", help="Directory written by benchmarks.chat_log_generator.")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true", help="Call the models for every line.")
+    parser.add_argument("--output", help="JSON file for summaries and per-scenario results.")
+    args = parser.parse_args()
+
+    configs = args.config or [EngineConfig("default")]
+    scenarios = load_scenarios(args.scenarios, args.logs_dir)
+    cache_dir = None if args.no_cache else args.cache_dir
+
+    reports = []
+    for config in configs:
+        print(f"[eval] {config.name}: {len(scenarios)} scenarios on {args.workers} workers", file=sys.stderr)
+        reports.append(evaluate(config, scenarios, args.workers, cache_dir))
+
+    _print_table([report["summary"] for report in reports])
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(reports, f, indent=2)
+        print(f"Results written to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
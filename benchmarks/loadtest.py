@@ -0,0 +1,395 @@
+# benchmarks/loadtest.py
+#
+# HTTP load generator for the API. Simulated members of concurrent teams send
+# a configurable mix of /chat, /analyze, /analyze-file, /teaminfo and
+# /memberinfo requests; messages and uploaded logs come from
+# benchmarks/chat_log_generator.py. Reports requests per second, latency
+# percentiles and error rates per endpoint.
+#
+# Load is closed-loop by default (every user waits for its response, then
+# thinks for --think-ms). With --rate, requests arrive open-loop at that many
+# per second, at most --concurrency in flight; the server's own queueing then
+# shows in the latencies.
+#
+# --spawn-server starts uvicorn on a temporary database, with stub engines
+# unless --engines live, once per --server-workers value. This isolates the
+# server's overhead from the model cost and helps to size the worker count.
+#
+# Usage:
+#   python -m benchmarks.loadtest --spawn-server --server-workers 1,2,4 --duration 30
+#   python -m benchmarks.loadtest --url http://127.0.0.1:8000 --teams 20 --members 5 --concurrency 50
+#   python -m benchmarks.loadtest --spawn-server --stub-llm-latency-ms 300 --rate 20 --mix chat=1
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.chat_log_generator import ChatLogConfig, generate_team_log, team_name
+
+ENDPOINTS = ("chat", "analyze", "analyze_file", "teaminfo", "memberinfo")
+DEFAULT_MIX = "chat=60,teaminfo=20,memberinfo=15,analyze=4,analyze_file=1"
+READY_TIMEOUT = 120
+# Consecutive successful /readyz probes required per server worker. Every probe
+# opens a new connection, which the kernel hands to any worker, so a worker
+# still loading its models would most likely answer 503 within that many probes.
+READY_PROBES_PER_WORKER = 10
+
+
+def parse_mix(text: str) -> dict:
+    """Parses 'chat=60,teaminfo=20,...' into endpoint -> weight."""
+    mix = {}
+    for part in filter(None, text.split(",")):
+        endpoint, _, weight = part.partition("=")
+        endpoint = endpoint.strip().replace("-", "_")
+        if endpoint not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{endpoint}', expected one of {', '.join(ENDPOINTS)}.")
+        mix[endpoint] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("The mix needs at least one endpoint with a positive weight.")
+    return mix
+
+# ========================================================
+# WORKLOAD
+# ========================================================
+
+class Workload:
+    def __init__(self, teams: int, members: int, mix: dict, analyze_lines: int, seed: int = 0):
+        """
+        Produces the requests of the simulated teams.
+
+        Args:
+            teams (int): Concurrent teams.
+            members (int): Members per team.
+            mix (dict): Endpoint -> relative weight.
+            analyze_lines (int): Lines per /analyze and /analyze-file request.
+            seed (int): Seed of the request sequence.
+        """
+        self.rng = random.Random(seed)
+        self.endpoints = list(mix)
+        self.cum_weights = list(itertools.accumulate(mix.values()))
+        self.analyze_lines = analyze_lines
+        self.teams = []
+        for index in range(teams):
+            config = ChatLogConfig(members=members, lines=max(200, analyze_lines), seed=seed)
+            lines = list(generate_team_log(config, index))
+            parsed = [line.split("] ", 1)[1].split(": ", 1) for line in lines]
+            self.teams.append({
+                "name": f"Load{team_name(index)}",
+                "members": sorted({name for name, _ in parsed}),
+                "messages": parsed,
+                "lines": lines,
+            })
+
+    def next_request(self) -> tuple:
+        """Returns (endpoint, request kwargs for httpx)."""
+        rng = self.rng
+        endpoint = rng.choices(self.endpoints, cum_weights=self.cum_weights)[0]
+        team = rng.choice(self.teams)
+        if endpoint == "chat":
+            member_name, text = rng.choice(team["messages"])
+            return endpoint, {"method": "POST", "url": "/chat",
+                              "json": {"text": text, "team_name": team["name"], "member_name": member_name}}
+        if endpoint in ("analyze", "analyze_file"):
+            start = rng.randrange(len(team["lines"]) - self.analyze_lines + 1)
+            lines = team["lines"][start:start + self.analyze_lines]
+            if endpoint == "analyze":
+                return endpoint, {"method": "POST", "url": "/analyze",
+                                  "json": {"team_name": team["name"], "lines": lines}}
+            return endpoint, {"method": "POST", "url": "/analyze-file", "params": {"team_name": team["name"]},
+                              "files": {"file": ("chat.txt", "\n".join(lines).encode("utf-8"), "text/plain")}}
+        if endpoint == "teaminfo":
+            return endpoint, {"method": "GET", "url": "/teaminfo", "params": {"team_name": team["name"]}}
+        return endpoint, {"method": "GET", "url": "/memberinfo",
+                          "params": {"team_name": team["name"], "member_name": rng.choice(team["members"])}}
+
+# ========================================================
+# MEASUREMENT
+# ========================================================
+
+class Stats:
+    def __init__(self):
+        """Latencies and outcomes per endpoint."""
+        self.latencies = {}
+        self.statuses = {}
+        self.unfinished = {}   # Requests cancelled at the end of the run
+
+    def add(self, endpoint: str, status, seconds: float):
+        self.latencies.setdefault(endpoint, []).append(seconds)
+        per_status = self.statuses.setdefault(endpoint, {})
+        per_status[status] = per_status.get(status, 0) + 1
+
+    def report(self, seconds: float) -> dict:
+        """Returns the per-endpoint and total summary over a run of `seconds`."""
+        rows = {}
+        for endpoint in list(dict.fromkeys([*self.latencies, *self.unfinished])) + ["total"]:
+            if endpoint == "total":
+                latencies = [value for values in self.latencies.values() for value in values]
+                statuses = {}
+                for per_status in self.statuses.values():
+                    for status, count in per_status.items():
+                        statuses[status] = statuses.get(status, 0) + count
+            else:
+                latencies, statuses = self.latencies.get(endpoint, []), self.statuses.get(endpoint, {})
+            latencies = sorted(latencies)
+            errors = sum(count for status, count in statuses.items() if not (isinstance(status, int) and status < 400))
+            rows[endpoint] = {
+                "requests": len(latencies),
+                "rps": round(len(latencies) / seconds, 1) if seconds else 0.0,
+                "error_rate": round(errors / len(latencies), 4) if latencies else 0.0,
+                "p50_ms": _percentile_ms(latencies, 0.50),
+                "p90_ms": _percentile_ms(latencies, 0.90),
+                "p99_ms": _percentile_ms(latencies, 0.99),
+                "max_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+                "unfinished": sum(self.unfinished.values()) if endpoint == "total" else self.unfinished.get(endpoint, 0),
+                "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+            }
+        return rows
+
+
+def _percentile_ms(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return round(sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))] * 1000, 1)
+
+
+async def _send(client: httpx.AsyncClient, workload: Workload, stats: Stats, recording: bool):
+    endpoint, request = workload.next_request()
+    start = time.perf_counter()
+    try:
+        response = await client.request(**request)
+        status = response.status_code
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    except asyncio.CancelledError:
+        if recording:
+            stats.unfinished[endpoint] = stats.unfinished.get(endpoint, 0) + 1
+        raise
+    if recording:
+        stats.add(endpoint, status, time.perf_counter() - start)
+
+
+async def _seed_members(client: httpx.AsyncClient, workload: Workload, concurrency: int):
+    """Sends one /chat per member, so /teaminfo and /memberinfo find every team and member."""
+    slots = asyncio.Semaphore(concurrency)
+
+    async def introduce(team, member_name):
+        async with slots:
+            try:
+                await client.post("/chat", json={"text": "Hello everyone!", "team_name": team["name"],
+                                                 "member_name": member_name})
+            except httpx.HTTPError as e:
+                print(f"[ERROR seeding {team['name']}/{member_name}] {e}")
+
+    await asyncio.gather(*(introduce(team, name) for team in workload.teams for name in team["members"]))
+
+
+async def run_load(url: str, workload: Workload, duration: float, concurrency: int, rate: float = None,
+                   think_ms: float = 0.0, warmup: float = 0.0, timeout: float = 60.0) -> dict:
+    """
+    Introduces every member with one /chat, then drives the server for
+    `warmup + duration` seconds and measures the last `duration`.
+
+    Args:
+        url (str): Base URL of the API.
+        workload (Workload): Source of requests.
+        duration (float): Measured seconds.
+        concurrency (int): Closed loop: simulated users. Open loop: maximum requests in flight.
+        rate (float): Requests per second for an open loop; None for a closed loop.
+        think_ms (float): Closed loop: pause of every user between its requests.
+        warmup (float): Seconds of unmeasured load before the measurement.
+        timeout (float): Request timeout in seconds.
+
+    Returns:
+        dict: Per-endpoint summary, see `Stats.report`.
+    """
+    stats = Stats()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    loop = asyncio.get_running_loop()
+
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        await _seed_members(client, workload, concurrency)
+        measure_from = loop.time() + warmup
+        end = measure_from + duration
+        tasks = set()
+
+        def spawn(coroutine):
+            task = asyncio.create_task(coroutine)
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        async def user():
+            while True:
+                await _send(client, workload, stats, loop.time() >= measure_from)
+                if think_ms:
+                    await asyncio.sleep(think_ms / 1000)
+
+        async def arrival(recording):
+            try:
+                await _send(client, workload, stats, recording)
+            finally:
+                in_flight.release()
+
+        async def arrivals():
+            while True:
+                # Poisson arrivals; an arrival waits for a free slot if `concurrency` are in flight
+                await asyncio.sleep(workload.rng.expovariate(rate))
+                await in_flight.acquire()
+                spawn(arrival(loop.time() >= measure_from))
+
+        if rate is None:
+            for _ in range(concurrency):
+                spawn(user())
+        else:
+            in_flight = asyncio.Semaphore(concurrency)
+            spawn(arrivals())
+
+        # Requests still running at the end are cancelled and counted as unfinished
+        await asyncio.sleep(max(0.0, end - loop.time()))
+        for task in list(tasks):
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    return stats.report(duration)
+
+# ========================================================
+# LOCAL SERVER
+# ========================================================
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(url: str, process: subprocess.Popen, workers: int = 1):
+    """Waits until /readyz has succeeded often enough in a row to cover every worker."""
+    deadline = time.monotonic() + READY_TIMEOUT
+    successes = 0
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"The server exited with status {process.returncode}.")
+        try:
+            ready = httpx.get(f"{url}/readyz", timeout=2, headers={"Connection": "close"}).status_code == 200
+        except httpx.HTTPError:
+            ready = False
+        successes = successes + 1 if ready else 0
+        if successes >= workers * READY_PROBES_PER_WORKER:
+            return
+        if not ready:
+            time.sleep(0.5)
+    raise RuntimeError(f"The server was not ready within {READY_TIMEOUT} s.")
+
+
+def start_server(workers: int, engines: str, db_dir: str, env: dict = None) -> tuple:
+    """
+    Starts uvicorn with `workers` processes on a fresh SQLite database in `db_dir`
+    and waits until /readyz succeeds on all of them.
+
+    Returns:
+        tuple: (process, base URL).
+    """
+    port = _free_port()
+    server_env = dict(os.environ, ENGINES=engines, DATABASE_URL=f"sqlite:///{os.path.join(db_dir, 'load.db')}")
+    server_env.update(env or {})
+    # Create the schema up front; workers starting on an empty database would race to create it
+    subprocess.run([sys.executable, "-c", "from app.db import init_db; init_db()"], env=server_env,
+                   check=True, stdout=subprocess.DEVNULL)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--timeout-graceful-shutdown", "5"],
+        env=server_env, stdout=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_ready(url, process, workers)
+    except Exception:
+        process.terminate()
+        process.wait()
+        raise
+    return process, url
+
+
+def stop_server(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+# ========================================================
+# COMMAND LINE
+# ========================================================
+
+def _print_report(label: str, report: dict):
+    print(f"\n{label}")
+    print(f"{'endpoint':<14}{'requests':>9}{'rps':>9}{'errors':>8}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}{'unfinished':>12}  statuses")
+    for endpoint, row in report.items():
+        statuses = " ".join(f"{status}:{count}" for status, count in row["statuses"].items())
+        print(f"{endpoint:<14}{row['requests']:>9}{row['rps']:>9.1f}{row['error_rate']:>8.1%}{row['p50_ms']:>9.1f}"
+              f"{row['p90_ms']:>9.1f}{row['p99_ms']:>9.1f}{row['max_ms']:>9.1f}{row['unfinished']:>12}  {statuses}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the chatbot API.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="API to test, unless --spawn-server.")
+    parser.add_argument("--spawn-server", action="store_true", help="Start uvicorn on a temporary database.")
+    parser.add_argument("--server-workers", default="1", help="Comma-separated uvicorn worker counts to compare.")
+    parser.add_argument("--engines", choices=["stub", "live"], default="stub", help="Engines of a spawned server.")
+    parser.add_argument("--stub-llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--stub-nli-latency-ms", type=float, default=0.0)
+    parser.add_argument("--teams", type=int, default=10)
+    parser.add_argument("--members", type=int, default=5, help="Members per team.")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"Default: {DEFAULT_MIX}")
+    parser.add_argument("--analyze-lines", type=int, default=50, help="Lines per /analyze and /analyze-file request.")
+    parser.add_argument("--concurrency", type=int, default=20, help="Users (closed loop) or requests in flight (--rate).")
+    parser.add_argument("--rate", type=float, help="Open-loop arrivals per second.")
+    parser.add_argument("--think-ms", type=float, default=0.0)
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds.")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds before the measurement.")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Request timeout in seconds.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON file for the results.")
+    args = parser.parse_args()
+
+    def run(url):
+        workload = Workload(args.teams, args.members, args.mix, args.analyze_lines, args.seed)
+        return asyncio.run(run_load(url, workload, args.duration, args.concurrency, args.rate,
+                                    args.think_ms, args.warmup, args.timeout))
+
+    results = []
+    if not args.spawn_server:
+        report = run(args.url)
+        _print_report(args.url, report)
+        results.append({"url": args.url, "report": report})
+    else:
+        env = {"STUB_LLM_LATENCY_MS": str(args.stub_llm_latency_ms), "STUB_NLI_LATENCY_MS": str(args.stub_nli_latency_ms)}
+        for workers in [int(w) for w in args.server_workers.split(",") if w]:
+            with tempfile.TemporaryDirectory() as db_dir:
+                process, url = start_server(workers, args.engines, db_dir, env)
+                try:
+                    report = run(url)
+                finally:
+                    stop_server(process)
+            _print_report(f"{workers} server worker(s), {args.engines} engines", report)
+            results.append({"server_workers": workers, "engines": args.engines, "report": report})
+
+    if args.output:
+        options = {k: v for k, v in vars(args).items() if k != "output"}
+        with open(args.output, "w") as f:
+            json.dump({"options": options, "results": results}, f, indent=2)
+        print(f"Results written to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
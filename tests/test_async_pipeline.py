@@ -0,0 +1,93 @@
+# tests/test_async_pipeline.py
+
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.chatbot_generative import ChatbotGenerative
+from app.db import Base
+
+
+TOP_EMOTIONS = {
+    "angry": [{"label": "anger", "score": 0.6}, {"label": "frustration", "score": 0.3}],
+    "trust": [{"label": "trust", "score": 0.7}, {"label": "calm", "score": 0.2}],
+}
+
+
+def fake_detect_emotion(text, top_n=5):
+    top = TOP_EMOTIONS["angry"] if "angry" in text else TOP_EMOTIONS["trust"]
+    return {"label": top[0]["label"], "score": top[0]["score"], "top_emotions": top}
+
+
+def fake_llm(input):
+    return "Valuable" if "Classify" in input else "Generated text"
+
+
+def make_chatbot():
+    model = MagicMock()
+    model.invoke.side_effect = fake_llm
+    model.ainvoke = AsyncMock(side_effect=fake_llm)
+    emotion_detector = MagicMock()
+    emotion_detector.detect_emotion.side_effect = fake_detect_emotion
+    emotion_detector.adetect_emotion = AsyncMock(side_effect=fake_detect_emotion)
+    return ChatbotGenerative(model=model, emotion_detector=emotion_detector)
+
+
+class TestAsyncPipeline(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.chatbot = make_chatbot()
+
+    def run_sync_pipeline(self, lines):
+        engine = create_engine("sqlite:///:memory:", echo=False)
+        Base.metadata.create_all(engine)
+        with sessionmaker(bind=engine)() as db:
+            results = [self.chatbot.process_line(db, "TeamA", "Alice", line) for line in lines]
+        engine.dispose()
+        return results
+
+    async def run_async_pipeline(self, lines):
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:", echo=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with async_sessionmaker(bind=engine, expire_on_commit=False)() as db:
+            results = [await self.chatbot.aprocess_line(db, "TeamA", "Alice", line) for line in lines]
+        await engine.dispose()
+        return results
+
+    def test_async_matches_sync(self):
+        lines = ["I am angry", "I am angry again", "still angry", "I trust you", "angry"]
+
+        sync_results = self.run_sync_pipeline(lines)
+        async_results = asyncio.run(self.run_async_pipeline(lines))
+
+        self.assertEqual(sync_results, async_results)
+        self.assertEqual(async_results[-1][1], "Storming")
+        self.assertEqual(async_results[-1][0], "Generated text")
+
+    def test_feedback_counter_shared_across_workers(self):
+        # Two chatbots stand in for two worker processes sharing the database
+        workers = [self.chatbot, make_chatbot()]
+        lines = ["I am angry", "I am angry again", "still angry", "angry", "so angry", "angry!"]
+
+        engine = create_engine("sqlite:///:memory:", echo=False)
+        Base.metadata.create_all(engine)
+        feedback_lines = []
+        with sessionmaker(bind=engine)() as db:
+            for i, line in enumerate(lines):
+                worker = workers[i % 2]
+                with patch.object(worker, "_save_feedback", wraps=worker._save_feedback) as save_feedback:
+                    worker.process_line(db, "TeamA", "Alice", line)
+                if save_feedback.called:
+                    feedback_lines.append(i)
+        engine.dispose()
+
+        self.assertEqual(feedback_lines, [2, 5])
+
+
+if __name__ == "__main__":
+    unittest.main()
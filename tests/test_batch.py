@@ -0,0 +1,160 @@
+# tests/test_batch.py
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+import app.batch as batch
+from app.batch import Checkpoint, read_chunks, run_batch
+from app.chatbot_generative import ChatbotGenerative
+from app.db import Base, Member, Message, Team
+from app.stub_engines import create_stub_chatbot
+from benchmarks.chat_log_generator import ChatLogConfig, generate_team_log
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.logs = os.path.join(self.tmp.name, "logs")
+        self.state = os.path.join(self.tmp.name, "state")
+        self.database_url = f"sqlite:///{os.path.join(self.tmp.name, 'batch.sqlite')}"
+        os.makedirs(self.logs)
+        patcher = patch("builtins.print")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.lines = list(generate_team_log(ChatLogConfig(teams=1, members=4, lines=120, seed=7), 0))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_log(self, name, lines, mode="w"):
+        path = os.path.join(self.logs, f"{name}.txt")
+        with open(path, mode, encoding="utf-8") as f:
+            f.write("".join(line + "\n" for line in lines))
+        return path
+
+    def count_messages(self, team_name, database_url=None):
+        engine = create_engine(database_url or self.database_url)
+        with sessionmaker(bind=engine)() as db:
+            team = db.scalar(select(Team).where(Team.name == team_name))
+            count = db.scalar(select(func.count(Message.id)).where(Message.team_id == team.id))
+            stage = team.current_stage
+        engine.dispose()
+        return count, stage
+
+    def test_read_chunks_resumes_at_byte_offsets(self):
+        path = self.write_log("TeamA", ["\ufeffAlice: héllo", "Bob: hi", "Alice: bye"])
+        chunks = list(read_chunks(path, chunk_lines=2))
+        self.assertEqual([lines for lines, _ in chunks], [["Alice: héllo", "Bob: hi"], ["Alice: bye"]])
+        self.assertEqual(list(read_chunks(path, offset=chunks[0][1])), [(["Alice: bye"], os.path.getsize(path))])
+        self.assertEqual(list(read_chunks(path, offset=os.path.getsize(path))), [])
+
+    def test_only_the_leading_byte_order_mark_is_stripped(self):
+        path = self.write_log("TeamA", ["\ufeffAlice: hi", "Bob: yo", "\ufeffCarol: hey"])
+        chunks = list(read_chunks(path, chunk_lines=2))
+        self.assertEqual([lines for lines, _ in chunks], [["Alice: hi", "Bob: yo"], ["\ufeffCarol: hey"]])
+
+    def test_batch_matches_analyze_file(self):
+        self.write_log("TeamA", self.lines)
+        [result] = run_batch([self.logs], engines="stub", database_url=self.database_url,
+                             state_dir=self.state, chunk_lines=len(self.lines))
+        self.assertIsNone(result["error"])
+        self.assertEqual(result["lines"], len(self.lines))
+
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        with sessionmaker(bind=engine)() as db:
+            expected_stage, _, _ = create_stub_chatbot().analyze_conversation_db(db, "TeamA", self.lines)
+            expected_count = db.scalar(select(func.count(Message.id)))
+        engine.dispose()
+        self.assertEqual(self.count_messages("TeamA"), (expected_count, expected_stage))
+
+    def test_interrupted_and_grown_files_resume_without_duplicates(self):
+        path = self.write_log("TeamA", self.lines[:80])
+        calls = {"n": 0}
+        original = batch.analyze_chunk
+
+        def fail_on_third_chunk(*args):
+            calls["n"] += 1
+            if calls["n"] == 3:
+                raise RuntimeError("interrupted")
+            return original(*args)
+
+        with patch("app.batch.analyze_chunk", side_effect=fail_on_third_chunk):
+            [failed] = run_batch([self.logs], engines="stub", database_url=self.database_url,
+                                 state_dir=self.state, chunk_lines=20)
+        self.assertEqual((failed["error"], failed["lines"]), ("interrupted", 40))
+        self.assertEqual(Checkpoint(self.state, path).state["lines"], 40)
+
+        [resumed] = run_batch([self.logs], engines="stub", database_url=self.database_url,
+                              state_dir=self.state, chunk_lines=20)
+        self.assertEqual((resumed["lines"], resumed["resumed"]), (40, True))
+
+        self.write_log("TeamA", self.lines[80:], mode="a")
+        [grown] = run_batch([path], engines="stub", database_url=self.database_url,
+                            state_dir=self.state, chunk_lines=20)
+        self.assertEqual((grown["lines"], grown["total_lines"]), (40, 120))
+        [done] = run_batch([path], engines="stub", database_url=self.database_url, state_dir=self.state)
+        self.assertEqual(done["lines"], 0)
+
+        with open(Checkpoint(self.state, path).file) as f:
+            self.assertEqual(json.load(f)["offset"], os.path.getsize(path))
+        # Same number of stored messages as analyzing the whole file in one run
+        single_url = f"sqlite:///{os.path.join(self.tmp.name, 'single.sqlite')}"
+        run_batch([self.write_log("TeamB", self.lines)], engines="stub", database_url=single_url, state_dir=self.state)
+        self.assertEqual(self.count_messages("TeamA")[0], self.count_messages("TeamB", single_url)[0])
+
+    def test_chunk_interrupted_midway_is_not_stored_twice(self):
+        path = self.write_log("TeamA", self.lines[:60])
+        calls = {"n": 0}
+        original = ChatbotGenerative.process_line
+
+        def fail_in_second_chunk(chatbot, *args, **kwargs):
+            calls["n"] += 1
+            if calls["n"] == 30:
+                raise RuntimeError("interrupted")
+            return original(chatbot, *args, **kwargs)
+
+        with patch.object(ChatbotGenerative, "process_line", fail_in_second_chunk):
+            [failed] = run_batch([path], engines="stub", database_url=self.database_url,
+                                 state_dir=self.state, chunk_lines=20)
+        self.assertEqual((failed["error"], failed["lines"]), ("interrupted", 20))
+        run_batch([path], engines="stub", database_url=self.database_url, state_dir=self.state, chunk_lines=20)
+
+        single_url = f"sqlite:///{os.path.join(self.tmp.name, 'single.sqlite')}"
+        run_batch([self.write_log("TeamB", self.lines[:60])], engines="stub", database_url=single_url,
+                  state_dir=self.state, chunk_lines=20)
+        self.assertEqual(self.count_messages("TeamA"), self.count_messages("TeamB", single_url))
+        self.assertEqual(self.count_lines(self.database_url), self.count_lines(single_url))
+
+    def count_lines(self, database_url):
+        engine = create_engine(database_url)
+        with sessionmaker(bind=engine)() as db:
+            lines = sorted(db.execute(select(Member.name, Member.num_lines)).all())
+        engine.dispose()
+        return lines
+
+    def test_shrunken_file_is_reported(self):
+        path = self.write_log("TeamA", self.lines[:20])
+        run_batch([path], engines="stub", database_url=self.database_url, state_dir=self.state)
+        self.write_log("TeamA", self.lines[:5])
+        [result] = run_batch([path], engines="stub", database_url=self.database_url, state_dir=self.state)
+        self.assertIn("shrank", result["error"])
+
+    def test_files_with_the_same_team_name_are_rejected(self):
+        self.write_log("TeamA", self.lines[:5])
+        os.makedirs(os.path.join(self.logs, "other"))
+        with open(os.path.join(self.logs, "other", "TeamA.txt"), "w") as f:
+            f.write("Bob: hi\n")
+        with self.assertRaisesRegex(ValueError, "TeamA"):
+            run_batch([self.logs], engines="stub", database_url=self.database_url, state_dir=self.state)
+        self.assertFalse(os.path.exists(self.state))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+# tests/test_batching.py
+
+import asyncio
+import threading
+import unittest
+
+from app.batching import MicroBatcher
+from app.emotion_analysis import EmotionDetector
+
+
+def fake_classifier(texts, labels, **kwargs):
+    if isinstance(texts, str):
+        return fake_classifier([texts], labels)[0]
+    fake_classifier.calls.append(list(texts))
+    return [{"sequence": text, "labels": [text] + labels, "scores": [0.9] + [0.1] * len(labels)} for text in texts]
+
+
+class TestMicroBatcher(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_submits_share_a_batch(self):
+        calls = []
+
+        def double(items):
+            calls.append(items)
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(double, window_ms=50, max_batch_size=32)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        batcher.close()
+
+        self.assertEqual(results, [0, 2, 4, 6, 8])
+        self.assertEqual(calls, [[0, 1, 2, 3, 4]])
+
+    async def test_max_batch_size_closes_batch(self):
+        calls = []
+
+        def identity(items):
+            calls.append(items)
+            return items
+
+        batcher = MicroBatcher(identity, window_ms=1000, max_batch_size=2)
+        await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(4))), 1)
+        batcher.close()
+
+        self.assertEqual(calls, [[0, 1], [2, 3]])
+
+    async def test_errors_reach_every_caller(self):
+        def fail(items):
+            raise RuntimeError("model failed")
+
+        batcher = MicroBatcher(fail, window_ms=10)
+        results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+        batcher.close()
+
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+    async def test_close_cancels_running_and_queued_callers(self):
+        release = threading.Event()
+
+        def blocked(items):
+            release.wait(5)
+            return items
+
+        batcher = MicroBatcher(blocked, window_ms=10, max_batch_size=1)
+        callers = [asyncio.ensure_future(batcher.submit(i)) for i in range(3)]
+        await asyncio.sleep(0.05)
+        batcher.close()
+        results = await asyncio.wait_for(asyncio.gather(*callers, return_exceptions=True), 1)
+        release.set()
+
+        self.assertTrue(all(isinstance(result, asyncio.CancelledError) for result in results))
+        self.assertEqual(batcher.pending, 0)
+
+
+class TestBatchedEmotionDetector(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_detections_run_as_one_pipeline_call(self):
+        fake_classifier.calls = []
+        detector = EmotionDetector(classifier=fake_classifier)
+
+        results = await asyncio.gather(*(detector.adetect_emotion(f"text {i}", top_n=i + 1) for i in range(4)))
+        empty = await detector.adetect_emotion("   ")
+        detector.batcher.close()
+
+        self.assertEqual(fake_classifier.calls, [["text 0", "text 1", "text 2", "text 3"]])
+        for i, result in enumerate(results):
+            self.assertEqual(result, detector.detect_emotion(f"text {i}", top_n=i + 1))
+        self.assertEqual(empty["label"], "uncertainty")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+# tests/test_bench_pipeline.py
+
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from app.stub_engines import StubLLM, StubZeroShotClassifier
+from benchmarks.bench_pipeline import compare_results, format_mb, peak_rss_mb, run_case, synthetic_chat_log
+
+
+def result(benchmark, throughput, p99_ms):
+    return {"benchmark": benchmark, "size": 100, "engines": "stub",
+            "throughput": throughput, "p50_ms": 1.0, "p99_ms": p99_ms, "peak_rss_mb": 50.0}
+
+
+class TestStubEngines(unittest.TestCase):
+    def test_classifier_matches_pipeline_output_format(self):
+        classifier = StubZeroShotClassifier()
+        labels = ["anger and frustration", "trust and calm", "joy"]
+        single = classifier("I feel so much anger", candidate_labels=labels)
+        batch = classifier(["I feel so much anger", "hello"], candidate_labels=labels)
+
+        self.assertEqual(sorted(single["labels"]), sorted(labels))
+        self.assertEqual(single["labels"][0], "anger and frustration")
+        self.assertAlmostEqual(sum(single["scores"]), 1.0)
+        self.assertEqual(batch[0], single)
+        self.assertEqual(classifier.calls, 2)
+
+    def test_llm_answers_are_deterministic(self):
+        prompt = "Classify the following user message as Valuable or Skip: hi"
+        answers = {StubLLM().invoke(prompt) for _ in range(3)}
+        self.assertEqual(len(answers), 1)
+        self.assertIn(answers.pop(), ("Valuable", "Skip"))
+        self.assertEqual(StubLLM(valuable_ratio=0.0).invoke(prompt), "Skip")
+
+
+class TestBenchPipeline(unittest.TestCase):
+    def test_process_line_case_reports_all_metrics(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            report = run_case("process_line", 20, "stub", "analysis", tmp)
+
+        self.assertEqual(report["items"], 20)
+        self.assertGreater(report["throughput"], 0)
+        self.assertLessEqual(report["p50_ms"], report["p99_ms"])
+
+    def test_synthetic_log_is_reproducible(self):
+        self.assertEqual(synthetic_chat_log(50, seed=3), synthetic_chat_log(50, seed=3))
+
+    def test_compare_flags_only_changes_beyond_threshold(self):
+        baseline = {"results": [result("detect", 1000.0, 2.0), result("ingest", 500.0, 10.0)]}
+        current = {"results": [result("detect", 700.0, 2.1), result("ingest", 480.0, 10.5)]}
+        regressions = {(case[0], metric) for case, metric, *_, regressed
+                       in compare_results(baseline, current, threshold=0.15) if regressed}
+        self.assertEqual(regressions, {("detect", "throughput")})
+
+    def test_memory_is_optional_without_resource_module(self):
+        # As on Windows without psutil
+        with patch.dict("sys.modules", {"resource": None, "psutil": None}):
+            self.assertIsNone(peak_rss_mb())
+        self.assertEqual(format_mb(None).strip(), "n/a")
+
+        unmeasured = dict(result("detect", 1000.0, 2.0), peak_rss_mb=None)
+        rows = compare_results({"results": [result("detect", 1000.0, 2.0)]}, {"results": [unmeasured]})
+        self.assertNotIn("peak_rss_mb", {metric for _, metric, *_ in rows})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+# tests/test_chat_log_generator.py
+
+import json
+import os
+import tempfile
+import unittest
+from itertools import islice
+
+from benchmarks.chat_log_generator import (ChatLogConfig, generate_team_log, parse_stage_mix, stage_schedule,
+                                           write_logs)
+from tests.test_async_pipeline import make_chatbot
+
+
+class TestChatLogGenerator(unittest.TestCase):
+    def test_same_seed_gives_same_log(self):
+        config = ChatLogConfig(lines=200, seed=7)
+        self.assertEqual(list(generate_team_log(config)), list(generate_team_log(config)))
+        self.assertNotEqual(list(generate_team_log(config)), list(generate_team_log(ChatLogConfig(lines=200, seed=8))))
+        self.assertNotEqual(list(generate_team_log(config, 0)), list(generate_team_log(config, 1)))
+
+    def test_lines_are_parsed_by_the_chatbot(self):
+        config = ChatLogConfig(members=30, lines=500)
+        members = make_chatbot()._extract_members_and_messages("\n".join(generate_team_log(config)))
+        self.assertLessEqual(len(members), 30)
+        self.assertEqual(sum(len(messages) for messages in members.values()), 500)
+
+    def test_stage_mix_sets_the_schedule(self):
+        config = ChatLogConfig(lines=100, stage_mix=parse_stage_mix("Forming=1,Storming=3"))
+        self.assertEqual(stage_schedule(config), [("Forming", 25), ("Storming", 75)])
+        with self.assertRaises(ValueError):
+            parse_stage_mix("Chaos=1")
+
+    def test_length_distribution_follows_the_mean(self):
+        config = ChatLogConfig(lines=2000, length_mean=25, off_topic=0.0)
+        lengths = [len(line.split(": ", 1)[1].split()) for line in generate_team_log(config)]
+        self.assertAlmostEqual(sum(lengths) / len(lengths), 25, delta=5)
+
+    def test_generator_streams_lines(self):
+        config = ChatLogConfig(lines=10_000_000)
+        self.assertEqual(len(list(islice(generate_team_log(config), 3))), 3)
+
+    def test_write_logs_writes_files_and_manifest(self):
+        config = ChatLogConfig(teams=2, lines=50, stage_mix={"Forming": 1, "Norming": 1})
+        with tempfile.TemporaryDirectory() as tmp:
+            write_logs(config, tmp)
+            with open(os.path.join(tmp, "manifest.json")) as f:
+                manifest = json.load(f)
+            with open(os.path.join(tmp, "Team002.txt")) as f:
+                lines = f.read().splitlines()
+
+        self.assertEqual(sorted(manifest["teams"]), ["Team001", "Team002"])
+        self.assertEqual(manifest["teams"]["Team001"]["expected_stage"], "Norming")
+        self.assertEqual(lines, list(generate_team_log(config, 1)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+# tests/test_eval_scenarios.py
+
+import tempfile
+import unittest
+
+from benchmarks.eval_scenarios import EngineConfig, evaluate, score_scenario
+from tests.scenario_data import SCENARIOS
+
+SCENARIO = {
+    "team_name": "TeamA",
+    "expected_stage": "Storming",
+    "lines": [
+        {"text": "Alice: I am angry", "expected_emotions": ["anger"]},
+        {"text": "Bob: I am angry", "expected_emotions": ["Frustration"]},
+        {"text": "Alice: I am angry", "expected_emotions": ["tension"]},
+    ],
+}
+
+
+class TestEngineConfig(unittest.TestCase):
+    def test_parse_splits_options_and_environment(self):
+        config = EngineConfig.parse("small:llm=mistral,EMOTION_PIPELINE_BATCH_SIZE=8")
+        self.assertEqual((config.name, config.engines, config.llm), ("small", "live", "mistral"))
+        self.assertEqual(config.env, {"EMOTION_PIPELINE_BATCH_SIZE": "8"})
+        with self.assertRaises(ValueError):
+            EngineConfig.parse("bad:model=x")
+
+    def test_cache_key_changes_with_options(self):
+        self.assertNotEqual(EngineConfig.parse("a:llm=x").cache_key(), EngineConfig.parse("a:llm=y").cache_key())
+        self.assertEqual(EngineConfig.parse("a:llm=x").cache_key(), EngineConfig.parse("a:llm=x").cache_key())
+
+
+class TestScoring(unittest.TestCase):
+    def test_repeated_lines_are_scored_in_order(self):
+        line_emotions = {
+            ("Alice", "I am angry"): [["anger", "calm"], ["joy", "calm"]],
+            ("Bob", "I am angry"): [["frustration"]],
+        }
+        score = score_scenario(SCENARIO, "Storming", line_emotions)
+        self.assertEqual(score, {"stage_correct": True, "emotion_correct": 2, "emotion_lines": 3})
+
+
+class TestEvaluate(unittest.TestCase):
+    def test_stub_evaluation_reports_metrics_and_uses_the_cache(self):
+        config = EngineConfig("stub", engines="stub")
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first = evaluate(config, SCENARIOS[:2], workers=2, cache_dir=cache_dir)
+            second = evaluate(config, SCENARIOS[:2], workers=2, cache_dir=cache_dir)
+
+        summary = first["summary"]
+        self.assertEqual((summary["scenarios"], summary["lines"]), (2, 40))
+        self.assertGreater(summary["lines_per_second"], 0)
+        self.assertGreater(summary["peak_rss_mb"], 0)
+        self.assertEqual(summary["cache_hits"], 0)
+        self.assertGreater(second["summary"]["cache_hits"], 0)
+        self.assertEqual([r["final_stage"] for r in first["scenarios"]],
+                         [r["final_stage"] for r in second["scenarios"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
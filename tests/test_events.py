@@ -0,0 +1,89 @@
+# tests/test_events.py
+
+import asyncio
+import json
+import threading
+import unittest
+
+from app.events import TeamEventBroker, SUBSCRIBER_QUEUE_SIZE
+
+
+def team_state(stage, feedback=""):
+    return {"distribution": {stage: 100.0}, "final_stage": stage, "feedback": feedback, "version": 1}
+
+
+class TestTeamEventBroker(unittest.IsolatedAsyncioTestCase):
+    async def test_fan_out_to_team_subscribers(self):
+        broker = TeamEventBroker()
+        first = broker.subscribe("TeamA")
+        second = broker.subscribe("TeamA")
+        other = broker.subscribe("TeamB")
+
+        self.assertTrue(broker.publish("TeamA", team_state("Forming")))
+        event_a = json.loads(await asyncio.wait_for(first.get(), 1))
+        event_b = json.loads(await asyncio.wait_for(second.get(), 1))
+
+        self.assertEqual(event_a, event_b)
+        self.assertEqual(event_a["final_stage"], "Forming")
+        self.assertNotIn("version", event_a)
+        self.assertTrue(other.empty())
+
+    async def test_unchanged_state_is_not_published(self):
+        broker = TeamEventBroker()
+        queue = broker.subscribe("TeamA")
+
+        self.assertTrue(broker.publish("TeamA", team_state("Forming")))
+        # A new version with the same stage, distribution and feedback is not an event
+        self.assertFalse(broker.publish("TeamA", dict(team_state("Forming"), version=2)))
+        self.assertTrue(broker.publish("TeamA", team_state("Forming", "Keep going")))
+
+        await asyncio.sleep(0)
+        self.assertEqual(queue.qsize(), 2)
+
+    async def test_publish_from_worker_thread(self):
+        broker = TeamEventBroker()
+        queue = broker.subscribe("TeamA")
+
+        thread = threading.Thread(target=broker.publish, args=("TeamA", team_state("Storming")))
+        thread.start()
+        thread.join()
+
+        event = json.loads(await asyncio.wait_for(queue.get(), 1))
+        self.assertEqual(event["final_stage"], "Storming")
+
+    async def test_slow_subscriber_keeps_latest_events(self):
+        broker = TeamEventBroker()
+        queue = broker.subscribe("TeamA")
+
+        for i in range(SUBSCRIBER_QUEUE_SIZE + 5):
+            broker.publish("TeamA", team_state("Norming", f"feedback {i}"))
+        await asyncio.sleep(0)
+
+        self.assertEqual(queue.qsize(), SUBSCRIBER_QUEUE_SIZE)
+        events = [json.loads(queue.get_nowait()) for _ in range(SUBSCRIBER_QUEUE_SIZE)]
+        self.assertEqual(events[-1]["feedback"], f"feedback {SUBSCRIBER_QUEUE_SIZE + 4}")
+
+    async def test_unsubscribe(self):
+        broker = TeamEventBroker()
+        queue = broker.subscribe("TeamA")
+        broker.unsubscribe("TeamA", queue)
+
+        broker.publish("TeamA", team_state("Performing"))
+        await asyncio.sleep(0)
+
+        self.assertTrue(queue.empty())
+        self.assertEqual(broker.subscriber_count(), 0)
+
+    async def test_no_state_is_kept_for_teams_without_subscribers(self):
+        broker = TeamEventBroker()
+        for i in range(100):
+            self.assertFalse(broker.publish(f"Team{i}", team_state("Forming")))
+
+        queue = broker.subscribe("TeamA")
+        self.assertTrue(broker.publish("TeamA", team_state("Forming")))
+        broker.unsubscribe("TeamA", queue)
+        self.assertEqual(broker._last_events, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+# tests/test_history.py
+
+import unittest
+from datetime import timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base, Team, Member, Message, utcnow
+from app.history import message_page_query, page_to_response
+
+
+class TestMessageHistory(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:", echo=False)
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+
+        self.team = Team(name="TeamA", generation=1)
+        self.db.add(self.team)
+        self.db.commit()
+        self.alice = Member(name="Alice", team_id=self.team.id, generation=1)
+        self.bob = Member(name="Bob", team_id=self.team.id, generation=1)
+        self.db.add_all([self.alice, self.bob])
+        self.db.commit()
+
+        self.start = utcnow() - timedelta(hours=1)
+        # One message from the previous generation must never be returned
+        self.db.add(Message(member_id=self.alice.id, team_id=self.team.id, generation=0, role="User", text="old"))
+        for i in range(10):
+            member = self.alice if i % 2 == 0 else self.bob
+            role = "User" if i % 3 else "Assistant"
+            msg = Message(member_id=member.id, team_id=self.team.id, generation=1, role=role,
+                          text=f"message {i}", created_at=self.start + timedelta(minutes=i))
+            msg.save_top_emotion_distribution({"trust": 0.1 * i})
+            self.db.add(msg)
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def read_all(self, limit, **filters):
+        pages, cursor = [], 0
+        while cursor is not None:
+            rows = self.db.execute(message_page_query(self.team.id, 1, after_id=cursor, limit=limit, **filters)).all()
+            page = page_to_response(rows, limit)
+            pages.append(page)
+            cursor = page["next_after_id"]
+        return pages
+
+    def test_pages_cover_history_once_in_order(self):
+        pages = self.read_all(limit=3)
+
+        texts = [m["text"] for page in pages for m in page["messages"]]
+        self.assertEqual(texts, [f"message {i}" for i in range(10)])
+        self.assertEqual([len(page["messages"]) for page in pages], [3, 3, 3, 1])
+        self.assertAlmostEqual(pages[0]["messages"][2]["emotion_distribution"]["trust"], 0.2)
+
+    def test_filters(self):
+        member_texts = [m["text"] for p in self.read_all(limit=10, member_id=self.bob.id) for m in p["messages"]]
+        self.assertEqual(member_texts, ["message 1", "message 3", "message 5", "message 7", "message 9"])
+
+        assistant = [m["text"] for p in self.read_all(limit=10, role="assistant") for m in p["messages"]]
+        self.assertEqual(assistant, ["message 0", "message 3", "message 6", "message 9"])
+
+        window = self.read_all(limit=10, since=self.start + timedelta(minutes=2),
+                               until=self.start + timedelta(minutes=5))
+        self.assertEqual([m["text"] for m in window[0]["messages"]], ["message 2", "message 3", "message 4"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+# tests/test_inference_server.py
+
+import unittest
+
+from fastapi.testclient import TestClient
+
+from app import inference_server
+from app.emotion_analysis import EmotionDetector
+from app.inference_client import RemoteEmotionDetector
+
+
+def fake_classifier(texts, labels, **kwargs):
+    return [{"sequence": text, "labels": labels, "scores": [1.0 / (i + 1) for i in range(len(labels))]}
+            for text in texts]
+
+
+class TestInferenceServer(unittest.TestCase):
+    def setUp(self):
+        self.detector = EmotionDetector(classifier=fake_classifier)
+        inference_server.app.state.detector = self.detector
+
+    def tearDown(self):
+        inference_server.app.state.detector = None
+
+    def test_remote_detector_matches_local(self):
+        with TestClient(inference_server.app) as client:
+            remote = RemoteEmotionDetector("http://testserver")
+            remote._client = client
+
+            self.assertEqual(remote.detect_emotion("hello", top_n=3), self.detector.detect_emotion("hello", top_n=3))
+            self.assertEqual(remote.detect_emotions(["", "we did it"], top_n=2),
+                             self.detector.detect_emotions(["", "we did it"], top_n=2))
+            self.assertEqual(client.get("/health").json()["texts"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
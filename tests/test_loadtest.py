@@ -0,0 +1,62 @@
+# tests/test_loadtest.py
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from benchmarks.loadtest import READY_PROBES_PER_WORKER, Stats, Workload, _wait_ready, parse_mix
+
+
+class TestWorkload(unittest.TestCase):
+    def test_mix_selects_only_weighted_endpoints(self):
+        workload = Workload(teams=2, members=3, mix=parse_mix("chat=1,memberinfo=1"), analyze_lines=10)
+        endpoints = {workload.next_request()[0] for _ in range(200)}
+        self.assertEqual(endpoints, {"chat", "memberinfo"})
+        with self.assertRaises(ValueError):
+            parse_mix("upload=1")
+
+    def test_requests_are_reproducible(self):
+        mix = parse_mix("chat=5,analyze=1,analyze_file=1,teaminfo=2")
+        first, again = Workload(3, 4, mix, 20, seed=1), Workload(3, 4, mix, 20, seed=1)
+        self.assertEqual([first.next_request() for _ in range(20)], [again.next_request() for _ in range(20)])
+
+    def test_analyze_requests_carry_the_configured_lines(self):
+        workload = Workload(teams=1, members=3, mix=parse_mix("analyze=1"), analyze_lines=25)
+        _, request = workload.next_request()
+        self.assertEqual(len(request["json"]["lines"]), 25)
+        self.assertEqual(request["json"]["team_name"], "LoadTeam001")
+
+
+class TestStats(unittest.TestCase):
+    def test_report_counts_errors_and_unfinished_requests(self):
+        stats = Stats()
+        for ms in range(1, 101):
+            stats.add("chat", 200, ms / 1000)
+        stats.add("analyze", 429, 0.005)
+        stats.add("analyze", "ReadTimeout", 60.0)
+        stats.unfinished["analyze"] = 2
+
+        report = stats.report(seconds=10)
+        self.assertEqual(report["chat"]["rps"], 10.0)
+        self.assertEqual(report["chat"]["p50_ms"], 51.0)
+        self.assertEqual(report["chat"]["error_rate"], 0.0)
+        self.assertEqual(report["analyze"]["error_rate"], 1.0)
+        self.assertEqual(report["total"]["requests"], 102)
+        self.assertEqual(report["total"]["unfinished"], 2)
+        self.assertEqual(report["total"]["statuses"], {"200": 100, "429": 1, "ReadTimeout": 1})
+
+
+class TestWaitReady(unittest.TestCase):
+    def test_a_loading_worker_restarts_the_count(self):
+        # Worker 1 is ready at once; worker 2 answers 503 until its models are loaded
+        statuses = [200, 503, 200, 503] + [200] * (2 * READY_PROBES_PER_WORKER) + [503]
+        responses = [MagicMock(status_code=status) for status in statuses]
+        process = MagicMock()
+        process.poll.return_value = None
+        with patch("benchmarks.loadtest.httpx.get", side_effect=responses) as get, \
+                patch("benchmarks.loadtest.time.sleep"):
+            _wait_ready("http://server", process, workers=2)
+        self.assertEqual(get.call_count, 4 + 2 * READY_PROBES_PER_WORKER)
+
+
+if __name__ == "__main__":
+    unittest.main()
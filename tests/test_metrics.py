@@ -0,0 +1,82 @@
+# tests/test_metrics.py
+
+import asyncio
+import unittest
+
+from prometheus_client import CollectorRegistry, REGISTRY, generate_latest
+
+from app.metrics import RuntimeCollector, Stopwatch, timed
+from app.scheduler import INTERACTIVE, AdmissionScheduler
+from app.state_cache import StateCache
+
+
+def step_count(step: str) -> float:
+    return REGISTRY.get_sample_value("chatbot_step_seconds_count", {"step": step}) or 0.0
+
+
+class TestTimed(unittest.TestCase):
+    def test_sync_function_is_observed(self):
+        @timed("test_sync")
+        def work(x):
+            return x * 2
+
+        before = step_count("test_sync")
+        self.assertEqual(work(21), 42)
+        self.assertEqual(step_count("test_sync"), before + 1)
+
+    def test_async_function_is_observed_even_when_it_raises(self):
+        @timed("test_async")
+        async def fail():
+            raise ValueError("boom")
+
+        before = step_count("test_async")
+        with self.assertRaises(ValueError):
+            asyncio.run(fail())
+        self.assertEqual(step_count("test_async"), before + 1)
+
+    def test_stopwatch_accumulates(self):
+        watch = Stopwatch()
+        with watch:
+            pass
+        first = watch.total
+        with watch:
+            pass
+        self.assertGreaterEqual(watch.total, first)
+        self.assertGreater(watch.total, 0)
+
+
+class FakeBatcher:
+    pending = 3
+
+
+class TestRuntimeCollector(unittest.IsolatedAsyncioTestCase):
+    async def test_exposes_cache_scheduler_and_batcher_state(self):
+        cache = StateCache()
+        cache.set_team_id("alpha", 1)
+        cache.get_team_id("alpha")
+        cache.get_team_id("beta")
+
+        scheduler = AdmissionScheduler(max_concurrency=1, interactive_queue=4)
+        ticket = await scheduler.acquire(INTERACTIVE)
+        waiter = asyncio.create_task(scheduler.acquire(INTERACTIVE))
+        await asyncio.sleep(0)
+
+        registry = CollectorRegistry()
+        registry.register(RuntimeCollector(cache, scheduler, emotion_batcher=lambda: FakeBatcher()))
+        self.assertEqual(registry.get_sample_value("state_cache_requests_total", {"result": "hit"}), 1)
+        self.assertEqual(registry.get_sample_value("state_cache_requests_total", {"result": "miss"}), 1)
+        self.assertEqual(registry.get_sample_value("scheduler_running_requests", {"lane": INTERACTIVE}), 1)
+        self.assertEqual(registry.get_sample_value("scheduler_queued_requests", {"lane": INTERACTIVE}), 1)
+        self.assertEqual(registry.get_sample_value("emotion_batcher_queued_texts"), 3)
+
+        scheduler.release(ticket)
+        scheduler.release(await waiter)
+
+    def test_batcher_gauge_is_skipped_before_models_load(self):
+        registry = CollectorRegistry()
+        registry.register(RuntimeCollector(StateCache(), AdmissionScheduler(), emotion_batcher=lambda: None))
+        self.assertNotIn(b"emotion_batcher_queued_texts", generate_latest(registry))
+
+
+if __name__ == "__main__":
+    unittest.main()
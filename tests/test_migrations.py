@@ -0,0 +1,101 @@
+# tests/test_migrations.py
+
+import json
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import create_engine, inspect, text
+
+from app.db import Base
+from app.migrations import MIGRATIONS, current_version, run_migrations
+
+
+LEGACY_SCHEMA = [
+    "CREATE TABLE teams (id INTEGER PRIMARY KEY, name VARCHAR UNIQUE, current_stage VARCHAR, "
+    "stage_distribution VARCHAR, feedback VARCHAR)",
+    "CREATE TABLE members (id INTEGER PRIMARY KEY, name VARCHAR, team_id INTEGER REFERENCES teams(id), "
+    "current_stage VARCHAR, accum_distribution VARCHAR, accum_emotions VARCHAR, num_lines INTEGER, "
+    "personal_feedback VARCHAR)",
+    "CREATE INDEX ix_members_name ON members (name)",
+    "CREATE TABLE messages (id INTEGER PRIMARY KEY, member_id INTEGER REFERENCES members(id), role VARCHAR, "
+    "text VARCHAR, detected_emotion VARCHAR, stage_at_time VARCHAR, top_emotion_distribution VARCHAR)",
+]
+
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        """
+        Each test gets its own SQLite file so ALTER TABLE behaves as on a real database.
+        """
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.engine = create_engine(f"sqlite:///{self.path}", echo=False)
+
+    def tearDown(self):
+        self.engine.dispose()
+        os.remove(self.path)
+
+    def test_legacy_database_is_upgraded(self):
+        with self.engine.begin() as conn:
+            for stmt in LEGACY_SCHEMA:
+                conn.execute(text(stmt))
+            conn.execute(text("INSERT INTO teams (id, name) VALUES (1, 'TeamA')"))
+            conn.execute(text("INSERT INTO members (id, name, team_id) VALUES (1, 'Alice', 1), (2, 'Alice', 1), (3, 'Bob', 1)"))
+            conn.execute(text("INSERT INTO messages (id, member_id, role, text) VALUES "
+                              "(1, 1, 'User', 'hi'), (2, 2, 'User', 'hello'), (3, 3, 'User', 'hey')"))
+
+        Base.metadata.create_all(bind=self.engine)
+        applied = run_migrations(self.engine)
+
+        self.assertEqual(applied, [m[0] for m in MIGRATIONS])
+        self.assertEqual(current_version(self.engine), MIGRATIONS[-1][0])
+
+        inspector = inspect(self.engine)
+        member_indexes = {idx["name"]: idx for idx in inspector.get_indexes("members")}
+        self.assertTrue(member_indexes["ix_members_team_id_name"]["unique"])
+        message_indexes = {idx["name"] for idx in inspector.get_indexes("messages")}
+        self.assertIn("ix_messages_member_id_id", message_indexes)
+        self.assertIn("ix_messages_team_id_id", message_indexes)
+
+        with self.engine.connect() as conn:
+            members = conn.execute(text("SELECT id FROM members ORDER BY id")).scalars().all()
+            self.assertEqual(members, [1, 3])
+            rows = conn.execute(text("SELECT id, member_id, team_id FROM messages ORDER BY id")).all()
+            self.assertEqual([tuple(r) for r in rows], [(1, 1, 1), (2, 1, 1), (3, 3, 1)])
+
+    def test_duplicate_members_keep_their_combined_state(self):
+        with self.engine.begin() as conn:
+            for stmt in LEGACY_SCHEMA:
+                conn.execute(text(stmt))
+            conn.execute(text("INSERT INTO teams (id, name) VALUES (1, 'TeamA')"))
+            conn.execute(
+                text("INSERT INTO members (id, name, team_id, current_stage, accum_emotions, accum_distribution, "
+                     "num_lines, personal_feedback) VALUES (:id, 'Alice', 1, :stage, :emotions, :dist, :lines, :feedback)"),
+                [
+                    {"id": 1, "stage": "Uncertain", "emotions": json.dumps({"trust": 1.0}),
+                     "dist": json.dumps({"Norming": 1.0}), "lines": 1, "feedback": ""},
+                    {"id": 2, "stage": "Storming", "emotions": json.dumps({"anger": 1.0}),
+                     "dist": json.dumps({"Storming": 1.0}), "lines": 3, "feedback": "Talk it through."},
+                ],
+            )
+
+        Base.metadata.create_all(bind=self.engine)
+        run_migrations(self.engine)
+
+        with self.engine.connect() as conn:
+            row = conn.execute(text("SELECT num_lines, accum_emotions, accum_distribution, current_stage, "
+                                    "personal_feedback FROM members")).one()
+        self.assertEqual(row.num_lines, 4)
+        self.assertEqual(json.loads(row.accum_emotions), {"trust": 0.25, "anger": 0.75})
+        self.assertEqual(json.loads(row.accum_distribution), {"Norming": 0.25, "Storming": 0.75})
+        self.assertEqual((row.current_stage, row.personal_feedback), ("Storming", "Talk it through."))
+
+    def test_fresh_database_runs_migrations_once(self):
+        Base.metadata.create_all(bind=self.engine)
+        self.assertEqual(len(run_migrations(self.engine)), len(MIGRATIONS))
+        self.assertEqual(run_migrations(self.engine), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
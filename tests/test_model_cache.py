@@ -0,0 +1,87 @@
+# tests/test_model_cache.py
+
+import os
+import tempfile
+import unittest
+
+from app.model_cache import WEIGHTS_FILE, export_model, has_local_model, load_local_model, load_zero_shot_pipeline
+
+try:
+    import torch
+    from tokenizers import Tokenizer, models, pre_tokenizers, processors
+    from transformers import BartConfig, BartForSequenceClassification, PreTrainedTokenizerFast
+except ImportError:
+    torch = None
+
+
+def save_tiny_model(model_dir):
+    """Saves a tiny randomly initialised BART NLI model with pickled weights and a word-level tokenizer."""
+    words = ["<s>", "</s>", "<pad>", "<unk>", "this", "example", "is", "joy", "anger", "we", "are", "happy"]
+    tokenizer = Tokenizer(models.WordLevel({w: i for i, w in enumerate(words)}, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    # BART classifies from the final </s> of premise/hypothesis pairs
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="<s> $A </s>", pair="<s> $A </s> </s> $B </s>", special_tokens=[("<s>", 0), ("</s>", 1)])
+    PreTrainedTokenizerFast(tokenizer_object=tokenizer, bos_token="<s>", eos_token="</s>", pad_token="<pad>",
+                            unk_token="<unk>", sep_token="</s>", cls_token="<s>").save_pretrained(model_dir)
+
+    config = BartConfig(vocab_size=len(words), d_model=16, encoder_layers=1, decoder_layers=1,
+                        encoder_attention_heads=2, decoder_attention_heads=2, encoder_ffn_dim=32,
+                        decoder_ffn_dim=32, max_position_embeddings=64, pad_token_id=2, bos_token_id=0,
+                        eos_token_id=1, decoder_start_token_id=1, num_labels=3,
+                        id2label={0: "contradiction", 1: "neutral", 2: "entailment"},
+                        label2id={"contradiction": 0, "neutral": 1, "entailment": 2})
+    model = BartForSequenceClassification(config)
+    model.save_pretrained(model_dir, safe_serialization=False)
+    return model
+
+
+class TestModelCache(unittest.TestCase):
+    def test_local_model_needs_config_and_single_file_weights(self):
+        with tempfile.TemporaryDirectory() as model_dir:
+            self.assertFalse(has_local_model(model_dir))
+
+            open(os.path.join(model_dir, "config.json"), "w").close()
+            self.assertFalse(has_local_model(model_dir))
+
+            # Sharded or pickled weights are not loaded
+            open(os.path.join(model_dir, "pytorch_model.bin"), "w").close()
+            self.assertFalse(has_local_model(model_dir))
+
+            open(os.path.join(model_dir, WEIGHTS_FILE), "w").close()
+            self.assertTrue(has_local_model(model_dir))
+
+    def test_missing_directory(self):
+        self.assertFalse(has_local_model(os.path.join(tempfile.gettempdir(), "no-such-model-dir")))
+
+    @unittest.skipIf(torch is None, "needs torch and transformers")
+    def test_export_converts_pickled_weights_and_loads_offline(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source_dir, model_dir = os.path.join(tmp, "source"), os.path.join(tmp, "local")
+            original = save_tiny_model(source_dir)
+
+            export_model(source_dir, model_dir)
+            self.assertTrue(has_local_model(model_dir))
+            self.assertFalse(os.path.exists(os.path.join(model_dir, "pytorch_model.bin")))
+
+            loaded = load_local_model(model_dir)
+            self.assertFalse(loaded.training)
+            expected = original.state_dict()
+            for name, tensor in loaded.state_dict().items():
+                self.assertTrue(torch.equal(tensor, expected[name]), name)
+
+            # The parameters live in the mapped weights file, not in memory of their own
+            weights = os.path.realpath(os.path.join(model_dir, WEIGHTS_FILE))
+            if os.path.exists("/proc/self/maps"):
+                with open("/proc/self/maps") as f:
+                    ranges = [tuple(int(x, 16) for x in line.split()[0].split("-"))
+                              for line in f if line.rstrip().endswith(weights)]
+                for name, param in loaded.named_parameters():
+                    self.assertTrue(any(lo <= param.data_ptr() < hi for lo, hi in ranges), name)
+
+            result = load_zero_shot_pipeline(model_dir)("we are happy", candidate_labels=["joy", "anger"])
+            self.assertEqual(sorted(result["labels"]), ["anger", "joy"])
+
+
+if __name__ == "__main__":
+    unittest.main()
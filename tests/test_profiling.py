@@ -0,0 +1,74 @@
+# tests/test_profiling.py
+
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+
+from app.profiling import ProfilingSettings, SamplingProfiler, torch_profiled, settings
+
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+async def slow_model_call():
+    await asyncio.sleep(0.1)
+
+
+class TestProfilingSettings(unittest.TestCase):
+    def test_next_requests_are_consumed_for_selected_paths_only(self):
+        profiling = ProfilingSettings()
+        profiling.update(next_requests=1, sample_rate=0.0, paths=["/chat"])
+        self.assertFalse(profiling.should_profile("/teaminfo"))
+        self.assertTrue(profiling.should_profile("/chat"))
+        self.assertFalse(profiling.should_profile("/chat"))
+
+    def test_sample_rate_one_profiles_every_request(self):
+        profiling = ProfilingSettings()
+        profiling.update(sample_rate=1.0, paths=["/analyze"])
+        self.assertTrue(all(profiling.should_profile("/analyze") for _ in range(10)))
+
+    def test_torch_profiler_is_skipped_unless_requested(self):
+        self.assertEqual(settings.torch_batches, 0)
+        with torch_profiled("emotion"):
+            pass
+        self.assertEqual(settings.torch_batches, 0)
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_thread_profile_is_written_as_folded_stacks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            profiler = SamplingProfiler("sync-run", interval_ms=1, output_dir=tmp).start()
+            busy_wait(0.1)
+            path = profiler.stop()
+
+            self.assertEqual(path, os.path.join(tmp, "sync-run.folded"))
+            with open(path) as f:
+                lines = f.read().splitlines()
+
+        self.assertTrue(lines)
+        stack, count = lines[0].rsplit(" ", 1)
+        self.assertIn("busy_wait", stack)
+        self.assertGreater(int(count), 0)
+
+    def test_task_profile_shows_where_the_request_awaits(self):
+        async def request(tmp):
+            profiler = SamplingProfiler("request", interval_ms=1, output_dir=tmp).start()
+            await slow_model_call()
+            profiler.stop()
+            return profiler.samples
+
+        with tempfile.TemporaryDirectory() as tmp:
+            samples = asyncio.run(request(tmp))
+
+        waiting = [stack for stack in samples if stack.endswith("(await)")]
+        self.assertTrue(waiting)
+        self.assertIn("slow_model_call", waiting[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
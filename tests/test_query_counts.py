@@ -0,0 +1,165 @@
+# tests/test_query_counts.py
+#
+# Query budgets for process_line and the API endpoints. A change that adds
+# queries per line or per request (e.g. an N+1 lazy load) fails here; raise a
+# budget only together with the change that needs the extra queries.
+
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.main as main
+from app.db import Base
+from app.query_log import assert_max_queries, count_queries
+from app.state_cache import StateCache
+from tests.test_async_pipeline import make_chatbot
+
+LINES = [
+    ("Alice", "I am angry about the deadline"),
+    ("Bob", "I trust the team"),
+    ("Alice", "Still angry about the plan"),
+    ("Alice", "angry again"),
+    ("Bob", "I trust everyone here"),
+    ("Bob", "I trust our plan"),  # Bob's third line triggers feedback
+]
+
+
+class TestProcessLineQueries(unittest.TestCase):
+    def test_async_line_budget(self):
+        async def run():
+            engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            chatbot = make_chatbot()
+            async with async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)() as db:
+                for member_name, text in LINES:
+                    await chatbot.aprocess_line(db, "TeamA", member_name, text)
+                # A line of a known member without feedback, with and without a reply
+                with assert_max_queries(12):
+                    await chatbot.aprocess_line(db, "TeamA", "Bob", "I trust you")
+                with assert_max_queries(10):
+                    await chatbot.aprocess_line(db, "TeamA", "Bob", "I trust you", mode="analysis")
+            await engine.dispose()
+
+        asyncio.run(run())
+
+    def test_sync_line_budget(self):
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        chatbot = make_chatbot()
+        with sessionmaker(bind=engine, autoflush=False)() as db:
+            for member_name, text in LINES:
+                chatbot.process_line(db, "TeamA", member_name, text)
+            with assert_max_queries(16):
+                chatbot.process_line(db, "TeamA", "Bob", "I trust you")
+        engine.dispose()
+
+    def test_history_query_does_not_grow_with_messages(self):
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        chatbot = make_chatbot()
+        with sessionmaker(bind=engine, autoflush=False)() as db:
+            state = chatbot._begin_line(db, "TeamA", "Alice", "first")
+            for i in range(20):
+                chatbot._begin_line(db, "TeamA", "Alice", f"line {i}")
+            db.expire_all()
+            with count_queries() as stats:
+                history = chatbot._build_conversation_history(db, state.member)
+        engine.dispose()
+        self.assertEqual(history.count("User (Alice)"), 21)
+        self.assertLessEqual(stats.count, 2)
+
+    def test_assert_max_queries_lists_statements(self):
+        engine = create_engine("sqlite:///:memory:")
+        with self.assertRaises(AssertionError) as raised:
+            with assert_max_queries(1), engine.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+                conn.exec_driver_sql("SELECT 2")
+        engine.dispose()
+        self.assertIn("2 queries run, at most 1 expected", str(raised.exception))
+        self.assertIn("SELECT 2", str(raised.exception))
+
+
+class TestEndpointQueries(unittest.TestCase):
+    # Maximum SQL statements per request, read from the X-DB-Queries header
+    BUDGETS = {
+        "chat": 12,
+        "analyze": 43,
+        "teaminfo_cold": 1,
+        "teaminfo_cached": 0,
+        "memberinfo": 1,
+        "teams_summary": 1,
+        "messages": 3,
+        "reset": 3,
+    }
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(self.tmp.name, 'test.db')}")
+        self.engine = engine
+
+        async def create():
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+        asyncio.run(create())
+
+        session_factory = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+        async def get_db():
+            async with session_factory() as session:
+                yield session
+
+        state_cache = StateCache()
+        chatbot = make_chatbot()
+        chatbot.state_cache = state_cache
+        main.app.dependency_overrides[main.get_db] = get_db
+        # The background purge queued by /reset must use the test database too
+        main.app.dependency_overrides[main.get_session_factory] = lambda: session_factory
+        self.patches = [patch.object(main, "chatbot", chatbot), patch.object(main, "state_cache", state_cache)]
+        for p in self.patches:
+            p.start()
+        self.client = TestClient(main.app)
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        main.app.dependency_overrides.clear()
+        asyncio.run(self.engine.dispose())
+        self.tmp.cleanup()
+
+    def assert_budget(self, name, response):
+        self.assertLess(response.status_code, 400, response.text)
+        count = int(response.headers["X-DB-Queries"])
+        self.assertLessEqual(count, self.BUDGETS[name], f"{name} ran {count} queries")
+
+    def test_endpoint_budgets(self):
+        for member_name, text in LINES:
+            self.client.post("/chat", json={"text": text, "team_name": "TeamA", "member_name": member_name})
+
+        self.assert_budget("chat", self.client.post(
+            "/chat", json={"text": "I trust you", "team_name": "TeamA", "member_name": "Bob"}))
+        self.assert_budget("analyze", self.client.post(
+            "/analyze", json={"team_name": "TeamB", "lines": ["Carol: I am angry", "Dave: I trust you"]}))
+
+        with patch.object(main, "state_cache", StateCache()):
+            self.assert_budget("teaminfo_cold", self.client.get("/teaminfo", params={"team_name": "TeamA"}))
+        self.assert_budget("teaminfo_cached", self.client.get("/teaminfo", params={"team_name": "TeamA"}))
+        self.assert_budget("memberinfo", self.client.get(
+            "/memberinfo", params={"team_name": "TeamA", "member_name": "Alice"}))
+        self.assert_budget("teams_summary", self.client.get(
+            "/teams/summary", params={"team_names": ["TeamA", "TeamB"]}))
+        self.assert_budget("messages", self.client.get(
+            "/messages", params={"team_name": "TeamA", "member_name": "Alice"}))
+        self.assert_budget("reset", self.client.post(
+            "/reset", json={"text": "", "team_name": "TeamA", "member_name": "Alice"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+# tests/test_readiness.py
+
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.main as main
+from app.db import Base, Team
+from app.stub_engines import StubLLM
+
+
+class TestReadiness(unittest.TestCase):
+    def setUp(self):
+        # Without the context manager the startup events, and model loading, do not run
+        self.client = TestClient(main.app)
+
+    def test_not_ready_while_models_load(self):
+        with patch.object(main, "chatbot", None):
+            self.assertEqual(self.client.get("/healthz").status_code, 200)
+            self.assertEqual(self.client.get("/readyz").json(), {"status": "loading"})
+
+            response = self.client.post("/chat", json={"text": "hi", "team_name": "TeamA", "member_name": "Alice"})
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.headers["retry-after"], "5")
+
+    def test_reset_does_not_wait_for_models(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "reset.db")
+            engine = create_engine(f"sqlite:///{path}")
+            Base.metadata.create_all(engine)
+            with sessionmaker(bind=engine)() as db:
+                db.add(Team(name="TeamA", current_stage="Norming"))
+                db.commit()
+
+            async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+            session_factory = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+            async def get_db():
+                async with session_factory() as session:
+                    yield session
+
+            main.app.dependency_overrides[main.get_db] = get_db
+            main.app.dependency_overrides[main.get_session_factory] = lambda: session_factory
+            try:
+                with patch.object(main, "chatbot", None):
+                    response = self.client.post("/reset", json={"text": "", "team_name": "TeamA", "member_name": "Alice"})
+            finally:
+                main.app.dependency_overrides.clear()
+                asyncio.run(async_engine.dispose())
+
+            self.assertEqual(response.status_code, 200)
+            with sessionmaker(bind=engine)() as db:
+                team = db.query(Team).one()
+                self.assertEqual((team.current_stage, team.generation), ("Uncertain", 1))
+            engine.dispose()
+
+    def test_failed_loading_is_reported(self):
+        with patch.object(main, "chatbot", None), patch.object(main.app.state, "model_error", "connection refused"):
+            response = self.client.get("/readyz")
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.json()["status"], "failed")
+
+    def test_ready_once_chatbot_is_built(self):
+        with patch.object(main, "chatbot", object()):
+            response = self.client.get("/readyz")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), {"status": "ready"})
+
+    def test_stub_engines_are_loaded_when_configured(self):
+        with patch.object(main, "chatbot", None), patch.object(main, "ENGINES", "stub"):
+            asyncio.run(main._load_models())
+            self.assertIsInstance(main.chatbot.model, StubLLM)
+            self.assertEqual(self.client.get("/readyz").json(), {"status": "ready"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+# tests/test_replay.py
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.replay import MissingRecordingError, ReplayClassifier, ReplayLLM, ReplayStore, create_replay_chatbot
+from app.stub_engines import StubLLM, StubZeroShotClassifier
+
+LINES = [
+    "Alice: I am excited about the kickoff",
+    "Bob: Honestly the deadline makes me angry",
+    "Alice: I trust the team now",
+    "Bob: Did anyone see the match?",
+]
+
+
+def run_analysis(chatbot):
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        result = chatbot.analyze_conversation_db(db, "TeamA", LINES)
+        line = chatbot.process_line(db, "TeamA", "Alice", "We are proud of the release")
+    engine.dispose()
+    return result, line
+
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.fixture = os.path.join(self.tmp.name, "fixtures", "calls.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_replay_reproduces_the_recorded_run_without_models(self):
+        llm, classifier = StubLLM(), StubZeroShotClassifier()
+        recorder = create_replay_chatbot(self.fixture, "record", model=llm, classifier=classifier)
+        recorded = run_analysis(recorder)
+        recorder.model.store.save()
+
+        replayer = create_replay_chatbot(self.fixture, "replay")
+        self.assertIsNone(replayer.model.model)
+        self.assertEqual(run_analysis(replayer), recorded)
+
+        # A second recording run is served entirely from the fixture
+        llm_calls, classifier_calls = llm.calls, classifier.calls
+        run_analysis(create_replay_chatbot(self.fixture, "record", model=llm, classifier=classifier))
+        self.assertEqual((llm.calls, classifier.calls), (llm_calls, classifier_calls))
+
+    def test_unrecorded_call_fails_in_replay_mode(self):
+        store = ReplayStore(self.fixture, "record")
+        ReplayLLM(store, StubLLM()).invoke("known prompt")
+        store.save()
+
+        llm = ReplayLLM(ReplayStore(self.fixture, "replay"))
+        self.assertEqual(asyncio.run(llm.ainvoke("known prompt")), StubLLM().invoke("known prompt"))
+        with self.assertRaises(MissingRecordingError):
+            llm.invoke("new prompt")
+
+    def test_classifier_entries_do_not_depend_on_batching(self):
+        store = ReplayStore(self.fixture, "record")
+        ReplayClassifier(store, StubZeroShotClassifier())(["one", "two"], ["joy", "anger"], batch_size=32)
+        store.save()
+        with open(self.fixture) as f:
+            self.assertEqual(len(json.load(f)["entries"]), 2)
+
+        classifier = ReplayClassifier(ReplayStore(self.fixture, "replay"))
+        single = classifier("two", ["joy", "anger"], batch_size=1)
+        self.assertEqual(single, StubZeroShotClassifier()("two", ["joy", "anger"]))
+
+    def test_missing_fixture_fails_in_replay_mode(self):
+        with self.assertRaises(FileNotFoundError):
+            ReplayStore(self.fixture, "replay")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+# tests/test_reset_generation.py
+
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.chatbot_generative import ChatbotGenerative
+from app.db import Base, Team, Member, Message
+from app.purge import apurge_stale_generations, find_stale_generations, purge_old_generations
+
+
+def fake_detect_emotion(text, top_n=5):
+    top = [{"label": "trust", "score": 0.7}, {"label": "calm", "score": 0.2}]
+    return {"label": "trust", "score": 0.7, "top_emotions": top}
+
+
+class TestResetGeneration(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        model = MagicMock()
+        model.invoke.side_effect = lambda input: "Valuable" if "Classify" in input else "Reply"
+        emotion_detector = MagicMock()
+        emotion_detector.detect_emotion.side_effect = fake_detect_emotion
+        cls.chatbot = ChatbotGenerative(model=model, emotion_detector=emotion_detector)
+
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:", echo=False)
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.chatbot.state_cache.clear()
+
+        for i in range(3):
+            self.chatbot.process_line(self.db, "TeamA", "Alice", f"I trust you {i}")
+            self.chatbot.process_line(self.db, "TeamA", "Bob", f"We are calm {i}")
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def test_reset_only_bumps_generation(self):
+        team_id, generation = self.chatbot.reset_team(self.db, "TeamA")
+
+        team = self.db.get(Team, team_id)
+        self.assertEqual(generation, 1)
+        self.assertEqual(team.current_stage, "Uncertain")
+        self.assertEqual(team.load_team_distribution(), {})
+        # Nothing deleted yet; members are cleared lazily
+        self.assertEqual(self.db.query(Message).count(), 12)
+        self.assertEqual(self.db.query(Member).filter(Member.num_lines > 0).count(), 2)
+        self.assertEqual(find_stale_generations(self.db), [(team_id, 1)])
+
+    def test_new_generation_ignores_old_state(self):
+        self.chatbot.reset_team(self.db, "TeamA")
+        self.chatbot.process_line(self.db, "TeamA", "Alice", "I trust you again")
+
+        alice = self.db.query(Member).filter(Member.name == "Alice").one()
+        bob = self.db.query(Member).filter(Member.name == "Bob").one()
+        self.assertEqual((alice.generation, alice.num_lines), (1, 1))
+        self.assertEqual(bob.generation, 0)
+        self.assertEqual(bob.snapshot_state(team_generation=1)["final_stage"], "Uncertain")
+
+        history = self.chatbot._build_conversation_history(self.db, alice)
+        self.assertEqual(history.count("User (Alice)"), 1)
+
+    def test_purge_deletes_old_generations_in_batches(self):
+        team_id, generation = self.chatbot.reset_team(self.db, "TeamA")
+        self.chatbot.process_line(self.db, "TeamA", "Alice", "I trust you again")
+
+        deleted = purge_old_generations(self.db, team_id, generation, batch_size=5)
+
+        self.assertEqual(deleted, 12)
+        self.assertEqual(self.db.query(Message).count(), 2)
+        self.assertEqual(find_stale_generations(self.db), [])
+
+    def test_background_purge_uses_the_given_sessions(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "purge.db")
+            engine = create_engine(f"sqlite:///{path}")
+            Base.metadata.create_all(engine)
+            with sessionmaker(bind=engine)() as db:
+                for i in range(3):
+                    self.chatbot.process_line(db, "TeamB", "Alice", f"I trust you {i}")
+                self.chatbot.reset_team(db, "TeamB")
+
+            async def purge():
+                async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+                session_factory = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+                deleted = await apurge_stale_generations(batch_size=2, session_factory=session_factory)
+                await async_engine.dispose()
+                return deleted
+
+            self.assertEqual(asyncio.run(purge()), 6)
+            with sessionmaker(bind=engine)() as db:
+                self.assertEqual(db.query(Message).count(), 0)
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+# tests/test_retention.py
+
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from datetime import timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base, Team, Member, Message, MessageSummary, utcnow
+from app.retention import RetentionPolicy, run_retention
+
+
+class TestRetention(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:", echo=False)
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.archive_dir = tempfile.mkdtemp()
+
+        team = Team(name="TeamA")
+        self.db.add(team)
+        self.db.commit()
+        self.member = Member(name="Alice", team_id=team.id)
+        self.db.add(self.member)
+        self.db.commit()
+
+        now = utcnow()
+        for i in range(10):
+            msg = Message(member_id=self.member.id, team_id=team.id, role="User", text=f"message {i}",
+                          created_at=now - timedelta(days=10 - i))
+            msg.save_top_emotion_distribution({"trust": 0.5, "calm": 0.25} if i % 2 == 0 else {})
+            self.db.add(msg)
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def archived_rows(self):
+        rows = []
+        for root, _, files in os.walk(self.archive_dir):
+            for name in files:
+                with gzip.open(os.path.join(root, name), "rt", encoding="utf-8") as f:
+                    rows.extend(json.loads(line) for line in f)
+        return rows
+
+    def test_keep_last_compacts_older_messages(self):
+        policy = RetentionPolicy(keep_last=4, archive_dir=self.archive_dir, batch_size=4)
+
+        stats = run_retention(self.db, policy)
+
+        self.assertEqual(stats["messages"], 6)
+        remaining = [m.text for m in self.db.query(Message).order_by(Message.id)]
+        self.assertEqual(remaining, [f"message {i}" for i in range(6, 10)])
+
+        summary = self.db.query(MessageSummary).one()
+        self.assertEqual((summary.num_messages, summary.num_valuable), (6, 3))
+        self.assertEqual(summary.load_emotion_totals(), {"trust": 1.5, "calm": 0.75})
+        self.assertEqual(summary.top_emotions(1)[0][0], "trust")
+        self.assertEqual(sorted(r["id"] for r in self.archived_rows()), list(range(1, 7)))
+
+    def test_max_age_compacts_old_messages(self):
+        policy = RetentionPolicy(max_age_days=5.5, archive_dir=self.archive_dir)
+
+        self.assertEqual(run_retention(self.db, policy, dry_run=True)["messages"], 5)
+        self.assertEqual(self.db.query(Message).count(), 10)
+
+        run_retention(self.db, policy)
+        self.assertEqual(self.db.query(Message).count(), 5)
+        self.assertEqual(self.db.query(MessageSummary).one().num_messages, 5)
+
+    def test_disabled_policy_does_nothing(self):
+        self.assertEqual(run_retention(self.db, RetentionPolicy(archive_dir=self.archive_dir))["messages"], 0)
+        self.assertEqual(self.db.query(Message).count(), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+# tests/test_scheduler.py
+
+import asyncio
+import unittest
+
+from app.scheduler import BULK, INTERACTIVE, AdmissionScheduler, Overloaded
+
+
+class TestAdmissionScheduler(unittest.IsolatedAsyncioTestCase):
+    async def run_job(self, scheduler, lane, name, order, release_event):
+        ticket = await scheduler.acquire(lane)
+        order.append(name)
+        await release_event.wait()
+        scheduler.release(ticket)
+
+    async def test_interactive_work_overtakes_queued_bulk_work(self):
+        scheduler = AdmissionScheduler(max_concurrency=1, bulk_concurrency=1)
+        order = []
+        first_done = asyncio.Event()
+        rest_done = asyncio.Event()
+        rest_done.set()
+
+        first = asyncio.create_task(self.run_job(scheduler, BULK, "bulk-1", order, first_done))
+        await asyncio.sleep(0)
+        queued = [
+            asyncio.create_task(self.run_job(scheduler, BULK, "bulk-2", order, rest_done)),
+            asyncio.create_task(self.run_job(scheduler, INTERACTIVE, "chat", order, rest_done)),
+        ]
+        await asyncio.sleep(0)
+        self.assertEqual(scheduler.stats()[BULK]["queued"], 1)
+        self.assertEqual(scheduler.stats()[INTERACTIVE]["queued"], 1)
+
+        first_done.set()
+        await asyncio.gather(first, *queued)
+        self.assertEqual(order, ["bulk-1", "chat", "bulk-2"])
+
+    async def test_bulk_concurrency_is_capped(self):
+        scheduler = AdmissionScheduler(max_concurrency=4, bulk_concurrency=1)
+        ticket = await scheduler.acquire(BULK)
+
+        waiting = asyncio.create_task(scheduler.acquire(BULK))
+        chat = await asyncio.wait_for(scheduler.acquire(INTERACTIVE), 1)
+        await asyncio.sleep(0)
+        self.assertFalse(waiting.done())
+        self.assertEqual(scheduler.stats()[BULK]["running"], 1)
+
+        scheduler.release(ticket)
+        scheduler.release(await asyncio.wait_for(waiting, 1))
+        scheduler.release(chat)
+        self.assertEqual(scheduler.stats()[BULK]["admitted"], 2)
+
+    async def test_full_queue_is_rejected_with_retry_after(self):
+        scheduler = AdmissionScheduler(max_concurrency=1, bulk_concurrency=1, bulk_queue=1)
+        ticket = await scheduler.acquire(BULK)
+        waiting = asyncio.create_task(scheduler.acquire(BULK))
+        await asyncio.sleep(0)
+
+        with self.assertRaises(Overloaded) as ctx:
+            await scheduler.acquire(BULK)
+        self.assertGreaterEqual(ctx.exception.retry_after, 1)
+        self.assertEqual(scheduler.stats()[BULK]["rejected"], 1)
+
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        scheduler.release(ticket)
+        self.assertEqual(scheduler.stats()[BULK]["queued"], 0)
+        self.assertEqual(scheduler.stats()[BULK]["running"], 0)
+
+    async def test_bulk_work_progresses_under_steady_interactive_load(self):
+        scheduler = AdmissionScheduler(max_concurrency=2, bulk_concurrency=1, bulk_max_skips=4, bulk_max_wait=60)
+        order = []
+        stop = asyncio.Event()
+
+        async def chat_user():
+            while not stop.is_set():
+                ticket = await scheduler.acquire(INTERACTIVE)
+                order.append("chat")
+                await asyncio.sleep(0.001)
+                scheduler.release(ticket)
+
+        async def analysis(name):
+            ticket = await scheduler.acquire(BULK)
+            order.append(name)
+            await asyncio.sleep(0.001)
+            scheduler.release(ticket)
+
+        users = [asyncio.create_task(chat_user()) for _ in range(6)]
+        await asyncio.sleep(0.01)
+        self.assertGreater(scheduler.stats()[INTERACTIVE]["queued"], 0)
+        await asyncio.wait_for(asyncio.gather(*(analysis(f"bulk-{i}") for i in range(3))), 2)
+        stop.set()
+        await asyncio.gather(*users)
+
+        self.assertEqual(scheduler.stats()[BULK]["admitted"], 3)
+        # Chats keep running around the analyses, and each analysis waits at most its skip budget
+        bulk_positions = [i for i, name in enumerate(order) if name.startswith("bulk")]
+        self.assertGreater(len(order), bulk_positions[-1] + 1)
+        gaps = [b - a for a, b in zip(bulk_positions, bulk_positions[1:])]
+        self.assertTrue(all(gap <= 4 + 2 for gap in gaps), gaps)
+
+    async def test_bulk_request_waiting_too_long_goes_first(self):
+        scheduler = AdmissionScheduler(max_concurrency=1, bulk_concurrency=1, bulk_max_skips=100, bulk_max_wait=0)
+        running = await scheduler.acquire(INTERACTIVE)
+        chat = asyncio.create_task(scheduler.acquire(INTERACTIVE))
+        bulk = asyncio.create_task(scheduler.acquire(BULK))
+        await asyncio.sleep(0)
+
+        # The chat queued first, but the bulk request is over its wait budget
+        scheduler.release(running)
+        await asyncio.sleep(0)
+        self.assertTrue(bulk.done())
+        self.assertFalse(chat.done())
+
+        scheduler.release(bulk.result())
+        scheduler.release(await asyncio.wait_for(chat, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+# tests/test_state_cache.py
+
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base, Team, Member, Message
+from app.state_cache import StateCache
+
+
+class TestStateCache(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:", echo=False)
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.cache = StateCache(ttl=60)
+
+        self.team = Team(name="TeamA")
+        self.db.add(self.team)
+        self.db.commit()
+        self.member = Member(name="Alice", team_id=self.team.id)
+        self.db.add(self.member)
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def test_commit_invalidates_changed_rows(self):
+        self.cache.set_team_state(self.team.id, self.team.snapshot_state())
+        self.cache.set_member_state(self.member.id, self.member.snapshot_state())
+
+        self.db.add(Message(member_id=self.member.id, team_id=self.team.id, role="User", text="hi"))
+        self.db.commit()
+
+        self.assertIsNotNone(self.cache.get_member_state(self.member.id))
+        self.assertIsNotNone(self.cache.get_team_state(self.team.id))
+
+        self.member.current_stage = "Storming"
+        self.db.commit()
+
+        # The member change also bumps the team's version
+        self.assertIsNone(self.cache.get_member_state(self.member.id))
+        self.assertIsNone(self.cache.get_team_state(self.team.id))
+
+    def test_member_change_invalidates_team_that_is_not_loaded(self):
+        self.cache.set_team_state(self.team.id, self.team.snapshot_state())
+        team_id, member_id = self.team.id, self.member.id
+        self.db.expunge_all()
+
+        self.db.get(Member, member_id).current_stage = "Norming"
+        self.db.commit()
+
+        self.assertIsNone(self.cache.get_team_state(team_id))
+
+    def test_rollback_keeps_entries(self):
+        self.cache.set_team_state(self.team.id, self.team.snapshot_state())
+
+        self.team.current_stage = "Norming"
+        self.db.flush()
+        self.db.rollback()
+
+        self.assertEqual(self.cache.get_team_state(self.team.id)["final_stage"], "Uncertain")
+
+    def test_team_invalidation_drops_member_states(self):
+        self.cache.set_member_id(self.team.id, "Alice", self.member.id)
+        self.cache.set_member_state(self.member.id, self.member.snapshot_state())
+
+        self.cache.invalidate(team_ids=[self.team.id])
+
+        self.assertIsNone(self.cache.get_member_state(self.member.id))
+        self.assertEqual(self.cache.get_member_id(self.team.id, "Alice"), self.member.id)
+
+    def test_expired_state_is_a_miss(self):
+        cache = StateCache(ttl=-1)
+        cache.set_team_state(self.team.id, {"final_stage": "Norming"})
+        self.assertIsNone(cache.get_team_state(self.team.id))
+        self.assertEqual(cache.misses, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
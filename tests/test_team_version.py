@@ -0,0 +1,62 @@
+# tests/test_team_version.py
+
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base, Team, Member, Message
+
+
+class TestTeamVersion(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:", echo=False)
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.db = self.Session()
+
+        self.team = Team(name="TeamA")
+        self.db.add(self.team)
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def test_team_and_member_changes_bump_version(self):
+        self.assertEqual(self.team.version, 0)
+
+        member = Member(name="Alice", team_id=self.team.id)
+        self.db.add(member)
+        self.db.commit()
+        self.assertEqual(self.team.version, 1)
+
+        member.current_stage = "Storming"
+        self.db.commit()
+        self.assertEqual(self.team.version, 2)
+
+        self.team.feedback = "Keep going."
+        self.db.commit()
+        self.assertEqual(self.team.version, 3)
+
+    def test_messages_do_not_bump_version(self):
+        self.db.add(Message(team_id=self.team.id, role="User", text="hello"))
+        self.db.commit()
+        self.assertEqual(self.team.version, 0)
+
+    def test_member_change_without_loaded_team(self):
+        member = Member(name="Alice", team_id=self.team.id)
+        self.db.add(member)
+        self.db.commit()
+
+        with self.Session() as other:
+            loaded = other.get(Member, member.id)
+            loaded.num_lines = 5
+            other.commit()
+
+        self.db.refresh(self.team)
+        self.assertEqual(self.team.version, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+# tests/test_tracing.py
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.db import Base
+from app.storage import build_async_engine
+from app.tracing import Trace, end_trace, export_trace, span, start_trace, traced
+from tests.test_async_pipeline import make_chatbot
+
+
+class TestSpans(unittest.TestCase):
+    def test_spans_nest_and_sum_into_server_timing(self):
+        trace, token = start_trace("GET /test")
+        try:
+            with span("outer") as outer:
+                with span("inner") as first:
+                    pass
+                with span("inner"):
+                    pass
+        finally:
+            end_trace(trace, token)
+
+        self.assertEqual(first.parent_id, outer.span_id)
+        self.assertEqual(outer.parent_id, trace.root.span_id)
+        header = trace.server_timing()
+        self.assertTrue(header.startswith("outer;dur="))
+        self.assertIn('inner;dur=', header)
+        self.assertIn(';desc="2x"', header)
+        self.assertIn("total;dur=", header)
+
+    def test_spans_are_noops_without_a_trace(self):
+        @traced("free")
+        def work():
+            return 1
+
+        with span("free") as current:
+            self.assertIsNone(current)
+        self.assertEqual(work(), 1)
+
+    def test_incoming_traceparent_is_continued(self):
+        incoming = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+        trace = Trace("POST /chat", incoming)
+        self.assertEqual(trace.trace_id, "0af7651916cd43dd8448eb211c80319c")
+        self.assertEqual(trace.root.parent_id, "b7ad6b7169203331")
+        self.assertTrue(trace.traceparent.startswith("00-0af7651916cd43dd8448eb211c80319c-"))
+
+        self.assertNotEqual(Trace("POST /chat", "garbage").trace_id, trace.trace_id)
+
+    def test_export_appends_otlp_json_lines(self):
+        trace, token = start_trace("POST /chat")
+        with span("relevance", model="llama"):
+            pass
+        end_trace(trace, token)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "traces.jsonl")
+            export_trace(trace, path)
+            export_trace(trace, path)
+            with open(path) as f:
+                lines = [json.loads(line) for line in f]
+
+        self.assertEqual(len(lines), 2)
+        spans = lines[0]["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        self.assertEqual([s["name"] for s in spans], ["POST /chat", "relevance"])
+        self.assertEqual(spans[1]["parentSpanId"], spans[0]["spanId"])
+        self.assertEqual(spans[1]["attributes"], [{"key": "model", "value": {"stringValue": "llama"}}])
+
+
+class TestPipelineTrace(unittest.TestCase):
+    async def run_traced_line(self):
+        engine = build_async_engine("sqlite+aiosqlite:///:memory:", profile="default")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        trace, token = start_trace("POST /chat")
+        try:
+            async with async_sessionmaker(bind=engine, expire_on_commit=False)() as db:
+                await make_chatbot().aprocess_line(db, "TeamA", "Alice", "I am angry about the deadline")
+        finally:
+            end_trace(trace, token)
+            await engine.dispose()
+        return trace
+
+    def test_process_line_phases_and_sql_are_traced(self):
+        trace = asyncio.run(self.run_traced_line())
+        names = {s.name for s in trace.spans}
+        for phase in ("process_line", "relevance", "emotion_inference", "history", "chat_generation", "sql"):
+            self.assertIn(phase, names)
+
+        by_id = {s.span_id: s for s in trace.spans}
+        history = next(s for s in trace.spans if s.name == "history")
+        sql_under_history = [s for s in trace.spans if s.name == "sql" and s.parent_id == history.span_id]
+        self.assertTrue(sql_under_history)
+        self.assertEqual(by_id[history.parent_id].name, "process_line")
+
+
+if __name__ == "__main__":
+    unittest.main()